@@ -6,7 +6,6 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[
-	('_internal\\Calc.ui', '.'), 
 	('_internal\\Help.files\\*.*', '.\\Help.files'),
 	('_internal\\Help.htm', '.'),
 	('customtextedit.py', '.'),
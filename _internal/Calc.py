@@ -1,6 +1,6 @@
 # Form implementation generated from reading ui file 'Calc.ui'
 #
-# Created by: PyQt6 UI code generator 6.8.0
+# Created by: PyQt6 UI code generator 6.11.0
 #
 # WARNING: Any manual changes made to this file will be lost when pyuic6 is
 # run again.  Do not edit this file unless you know what you are doing.
@@ -290,9 +290,16 @@ class Ui_MainWindow(object):
         font = QtGui.QFont()
         font.setPointSize(14)
         self.txtResult.setFont(font)
+        self.txtResult.setTextInteractionFlags(QtCore.Qt.TextInteractionFlag.LinksAccessibleByKeyboard|QtCore.Qt.TextInteractionFlag.LinksAccessibleByMouse|QtCore.Qt.TextInteractionFlag.TextBrowserInteraction|QtCore.Qt.TextInteractionFlag.TextSelectableByKeyboard|QtCore.Qt.TextInteractionFlag.TextSelectableByMouse)
         self.txtResult.setPlaceholderText("")
         self.txtResult.setObjectName("txtResult")
         self.verticalLayout.addWidget(self.txtResult)
+        self.chkLivePreview = QtWidgets.QCheckBox(parent=self.centralwidget)
+        self.chkLivePreview.setObjectName("chkLivePreview")
+        self.verticalLayout.addWidget(self.chkLivePreview)
+        self.chkWorksheet = QtWidgets.QCheckBox(parent=self.centralwidget)
+        self.chkWorksheet.setObjectName("chkWorksheet")
+        self.verticalLayout.addWidget(self.chkWorksheet)
         self.label_4 = QtWidgets.QLabel(parent=self.centralwidget)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Maximum, QtWidgets.QSizePolicy.Policy.Preferred)
         sizePolicy.setHorizontalStretch(0)
@@ -312,7 +319,17 @@ class Ui_MainWindow(object):
         self.label_4.setPalette(palette)
         self.label_4.setObjectName("label_4")
         self.verticalLayout.addWidget(self.label_4)
-        self.tblResults = QtWidgets.QTableWidget(parent=self.centralwidget)
+        self.horizontalLayoutSearch = QtWidgets.QHBoxLayout()
+        self.horizontalLayoutSearch.setObjectName("horizontalLayoutSearch")
+        self.lineSearch = QtWidgets.QLineEdit(parent=self.centralwidget)
+        self.lineSearch.setClearButtonEnabled(True)
+        self.lineSearch.setObjectName("lineSearch")
+        self.horizontalLayoutSearch.addWidget(self.lineSearch)
+        self.btnExport = QtWidgets.QPushButton(parent=self.centralwidget)
+        self.btnExport.setObjectName("btnExport")
+        self.horizontalLayoutSearch.addWidget(self.btnExport)
+        self.verticalLayout.addLayout(self.horizontalLayoutSearch)
+        self.tblResults = QtWidgets.QTableView(parent=self.centralwidget)
         palette = QtGui.QPalette()
         brush = QtGui.QBrush(QtGui.QColor(151, 189, 141))
         brush.setStyle(QtCore.Qt.BrushStyle.SolidPattern)
@@ -337,8 +354,6 @@ class Ui_MainWindow(object):
         font.setPointSize(12)
         self.tblResults.setFont(font)
         self.tblResults.setObjectName("tblResults")
-        self.tblResults.setColumnCount(0)
-        self.tblResults.setRowCount(0)
         self.verticalLayout.addWidget(self.tblResults)
         self.lblInf2 = QtWidgets.QLabel(parent=self.centralwidget)
         palette = QtGui.QPalette()
@@ -381,8 +396,11 @@ class Ui_MainWindow(object):
 "Запомнить"))
         self.btnExit.setText(_translate("MainWindow", "В&ыйти"))
         self.label_3.setText(_translate("MainWindow", "Здесь надо вводить формулу. Например, 2.74**3*(17,3-4.87)"))
+        self.chkLivePreview.setText(_translate("MainWindow", "Показывать результат по ходу ввода формулы"))
+        self.chkWorksheet.setText(_translate("MainWindow", "Лист вычислений: формула в каждой строке, ссылки по имени или #номеру"))
         self.label_4.setText(_translate("MainWindow", "Нажатие буквы \"С\", слева от строчки истории,\n"
 "копирует формулу в буфер обмена"))
-        self.lblInf2.setText(_translate("MainWindow", "История формул и результатов, по окончанию работы программы,\n"
-"будет записана в файл #"))
+        self.btnExport.setText(_translate("MainWindow", "Выгрузить в CSV"))
+        self.lblInf2.setText(_translate("MainWindow", "История формул и результатов по ходу работы программы\n"
+"записывается в файл #"))
 from customtextedit import CustomTextEdit
@@ -1 +1 @@
-C:\PycharmProjects\Calc\.venv\Scripts\pyuic6.exe Calc.ui -o Calc.py
\ No newline at end of file
+python -m PyQt6.uic.pyuic Calc.ui -o Calc.py
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""Параллельное вычисление большого числа формул в пуле процессов.
+
+Формулы (например, колонка csv файла) делятся на блоки, и блоки
+вычисляются в рабочих процессах — по одному процессу на ядро. Формулы
+вычисляются так же, как в окне калькулятора и в консольном режиме
+(core.evaluate_formula), а результаты выдаются в порядке формул.
+
+Пограничные по оценке стоимости формулы блок не вычисляет: их, как и окно
+калькулятора, вычисляет пул sandbox.EvaluationSandbox с ограничением
+времени, поэтому формула вроде 7**10**6 // 3**10**6 не задерживает
+вычисление дольше Const.SANDBOX_TIME_LIMIT_S. Пул запускается при первой
+пограничной формуле — и при вычислении без рабочих процессов.
+
+Входные формулы читаются по мере освобождения процессов: в работе
+находится не больше Const.BATCH_CHUNKS_PER_WORKER блоков на процесс,
+поэтому расход памяти не зависит от объёма входных данных.
+Блок передаётся в процесс и обратно одним сообщением, поэтому
+затраты на передачу малы по сравнению с вычислением блока."""
+
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+from constants import Const
+from lexer import validate_formula
+from sandbox import EvaluationSandbox, evaluate_without_worker
+from sandboxworker import limit_memory
+
+
+def evaluate_chunk(formulas: list[str]) -> list[str | None]:
+    """Результаты блока формул (выполняется в рабочем процессе).
+
+    Вместо результата пограничной формулы — None"""
+
+    results = []
+    for formula in formulas:
+        text = validate_formula(formula)
+        if text is None:
+            results.append(Const.ERROR_INVALID_SYMBOL)
+        else:
+            results.append(evaluate_without_worker(text))
+    return results
+
+
+def evaluate_in_pool(
+    chunks: Iterable[list[str]], jobs: int
+) -> Iterator[tuple[list[str], list[str | None]]]:
+    """Вычисление блоков в пуле из jobs процессов. Блоки выдаются по порядку"""
+
+    # Метод spawn одинаково работает в Windows, Linux и в собранном exe файле
+    executor = ProcessPoolExecutor(
+        jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=limit_memory,
+        initargs=(Const.SANDBOX_MEMORY_LIMIT,),
+    )
+    pending: deque[tuple[list[str], Future]] = deque()  # Блоки в работе, по порядку
+    try:
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(evaluate_chunk, chunk)))
+            # Следующий блок читается только после получения самого старого
+            if len(pending) == jobs * Const.BATCH_CHUNKS_PER_WORKER:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+    finally:
+        # Если результаты больше не нужны, невыполненные блоки отменяются
+        executor.shutdown(cancel_futures=True)
+
+
+def evaluate_chunks(
+    formulas: Iterable[str],
+    jobs: int | None = None,
+    chunk_size: int = Const.BATCH_CHUNK_SIZE,
+    progress: Callable[[int], None] | None = None,
+) -> Iterator[tuple[list[str], list[str]]]:
+    """Выдаёт пары (блок формул, блок результатов) в порядке формул.
+
+    jobs — число рабочих процессов (None — по числу ядер, 1 — без процессов).
+    progress вызывается после каждого блока с числом вычисленных формул."""
+
+    jobs = jobs or os.cpu_count() or 1
+    formulas = iter(formulas)
+    chunks = iter(lambda: list(islice(formulas, chunk_size)), [])
+    if jobs == 1:
+        ordered = ((chunk, evaluate_chunk(chunk)) for chunk in chunks)
+    else:
+        ordered = evaluate_in_pool(chunks, jobs)
+
+    # Пул для пограничных формул и потоки, ожидающие его результатов
+    sandbox: EvaluationSandbox | None = None
+    threads: ThreadPoolExecutor | None = None
+    done = 0
+    try:
+        for chunk, results in ordered:
+            borderline = [i for i, result in enumerate(results) if result is None]
+            if borderline:
+                if sandbox is None:
+                    sandbox = EvaluationSandbox(workers=jobs)
+                    threads = ThreadPoolExecutor(jobs)
+                evaluated = threads.map(
+                    sandbox.evaluate, (chunk[i] for i in borderline)
+                )
+                for i, result in zip(borderline, evaluated):
+                    results[i] = result
+            done += len(chunk)
+            if progress is not None:
+                progress(done)
+            yield chunk, results
+    finally:
+        if sandbox is not None:
+            threads.shutdown()
+            sandbox.close()
+
+
+def evaluate_many(
+    formulas: Iterable[str],
+    jobs: int | None = None,
+    chunk_size: int = Const.BATCH_CHUNK_SIZE,
+    progress: Callable[[int], None] | None = None,
+) -> Iterator[str]:
+    """Результаты формул в порядке формул. Параметры — как у evaluate_chunks"""
+
+    for _, results in evaluate_chunks(formulas, jobs, chunk_size, progress):
+        yield from results
@@ -0,0 +1,313 @@
+"""Замеры производительности калькулятора.
+
+Для каждой операции измеряется время вызова (перцентили p50, p95, p99)
+и пропускная способность. Результаты сравниваются с базовыми замерами
+из файла benchmark_baseline.json: если p50 или p95 выросли больше, чем
+в допустимое число раз (threshold), замер считается регрессией и программа
+завершается с кодом 1.
+
+    python benchmark.py            # замер и сравнение с базой
+    python benchmark.py --save     # замер и запись новой базы
+    python benchmark.py --quick    # быстрый замер с меньшим числом повторов
+
+Базу нужно обновлять (--save) на той машине, на которой выполняется сравнение."""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+
+from constants import Const
+from engine import compile_formula
+from core import calculate_and_validate_formula, evaluate_formula
+from core import no_virus, normalize_characters
+from historyindex import TrigramIndex
+from historyarchive import RetentionPolicy
+from historystore import HistoryStore
+from legacyhistory import LegacyHistory
+from lexer import scan_formula, validate_formula
+from pastesanitizer import sanitize_chunks
+
+FORMULA = "sin(1)^2 + cos(1)^2 – sqrt(16) х 2,5 : (1 + 2)"  # Типичная формула
+FORMULA_STANDARD = normalize_characters(FORMULA)
+LONG_FORMULA = "sin(pi)+" * 12_500  # Формула длиной 100 КБ
+SEARCH_QUERIES = ("7", "+ 99", "12345")  # Строки поиска в истории
+CLIPBOARD_TEXT = "12345,67;abc def\t" * 60_000  # Около 1 МБ из таблицы MS EXCEL
+HISTORY_SIZES = (1_000, 10_000, 100_000)  # Число записей истории в замерах
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """Результат замера одной операции"""
+
+    p50_us: float  # Медиана времени вызова, мкс
+    p95_us: float  # 95-й перцентиль времени вызова, мкс
+    p99_us: float  # 99-й перцентиль времени вызова, мкс
+    throughput: float  # Вызовов в секунду
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """Замеряемая операция"""
+
+    name: str
+    function: Callable[[], object]
+    repeat: int  # Число замеров
+    number: int = 1  # Число вызовов в одном замере (для очень быстрых операций)
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Перцентиль отсортированной выборки"""
+
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def measure(benchmark: Benchmark, scale: float = 1.0) -> Measurement:
+    """Замер времени вызова операции"""
+
+    repeat = max(5, int(benchmark.repeat * scale))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(benchmark.number):
+            benchmark.function()
+        samples.append((time.perf_counter_ns() - start) / benchmark.number / 1000)
+    samples.sort()
+    return Measurement(
+        p50_us=round(percentile(samples, 0.50), 3),
+        p95_us=round(percentile(samples, 0.95), 3),
+        p99_us=round(percentile(samples, 0.99), 3),
+        throughput=round(1_000_000 * len(samples) / sum(samples), 1),
+    )
+
+
+def history_rows(size: int) -> list[tuple[str, str]]:
+    """История заданного размера"""
+
+    return [(f"{i} + {i}", str(2 * i)) for i in range(size)]
+
+
+def formula_benchmarks() -> Iterator[Benchmark]:
+    """Замеры обработки формулы"""
+
+    def calculate_without_cache():
+        compile_formula.cache_clear()
+        return calculate_and_validate_formula(FORMULA_STANDARD)
+
+    yield Benchmark(
+        "normalize_characters", lambda: normalize_characters(FORMULA), 2000, 100
+    )
+    yield Benchmark("no_virus", lambda: no_virus(FORMULA_STANDARD), 2000, 100)
+    yield Benchmark("scan_formula", lambda: scan_formula(FORMULA), 2000, 100)
+    yield Benchmark("scan_formula 100 КБ", lambda: scan_formula(LONG_FORMULA), 50)
+    yield Benchmark("validate_formula", lambda: validate_formula(FORMULA), 2000, 100)
+    yield Benchmark(
+        "validate_formula 100 КБ", lambda: validate_formula(LONG_FORMULA), 50
+    )
+    yield Benchmark(
+        "calculate_and_validate_formula",
+        lambda: calculate_and_validate_formula(FORMULA_STANDARD),
+        2000,
+        100,
+    )
+    yield Benchmark(
+        "calculate_and_validate_formula без кэша", calculate_without_cache, 2000
+    )
+    yield Benchmark("evaluate_formula", lambda: evaluate_formula(FORMULA), 2000, 100)
+    yield Benchmark(
+        "sanitize_chunks 1 МБ", lambda: "".join(sanitize_chunks(CLIPBOARD_TEXT)), 20
+    )
+
+
+def create_store(path: Path, size: int) -> HistoryStore:
+    """База истории заданного размера"""
+
+    legacy = LegacyHistory(path.with_suffix(".csv"))
+    store = HistoryStore(path, legacy, RetentionPolicy())  # Как в окне
+    store.open()
+    # noinspection PyProtectedMember
+    HistoryStore.add_rows(store._connection, history_rows(size))
+    store.close()
+    return store
+
+
+def history_benchmarks(directory: Path) -> Iterator[Benchmark]:
+    """Замеры работы с базой истории: время не должно зависеть от её размера"""
+
+    for size in HISTORY_SIZES:
+        store = create_store(directory / f"results{size}.sqlite3", size)
+        yield Benchmark(
+            f"открытие истории {size}", lambda s=store: (s.open(), s.close()), 200
+        )
+        yield Benchmark(
+            f"первая страница истории {size}", lambda s=store: next(s.pages()), 200
+        )
+        yield Benchmark(
+            f"экспорт истории {size}",
+            lambda s=store, p=directory / f"results{size}.csv": s.export_csv(p),
+            max(5, 200_000 // size),
+        )
+
+
+def search_benchmarks() -> Iterator[Benchmark]:
+    """Замеры поиска первой страницы записей истории по индексу"""
+
+    for size in HISTORY_SIZES:
+        index = TrigramIndex()
+        index.extend(history_rows(size))
+        for query in SEARCH_QUERIES:
+            yield Benchmark(
+                f"поиск в истории {size} '{query}'",
+                lambda i=index, q=query: list(
+                    islice(i.search(q, newest_first=True), Const.HISTORY_SEARCH_PAGE)
+                ),
+                200,
+                10,
+            )
+
+
+def insert_benchmarks(directory: Path) -> Iterator[Benchmark]:
+    """Замеры добавления строки в историю окна калькулятора"""
+
+    from PyQt6.QtWidgets import QApplication
+
+    from calculatorapp import CalculatorApp
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    for size in (0,) + HISTORY_SIZES:
+        work_dir = directory / f"gui{size}"
+        work_dir.mkdir()
+        os.chdir(work_dir)
+        create_store(Path(Const.HISTORY_DB_FILE_NAME), size)  # История окна
+        calculator = CalculatorApp()
+        calculator.history_loader.wait()  # История загружается полностью
+        app.processEvents()
+        yield Benchmark(
+            f"insert_new_row_in_results {size}",
+            lambda c=calculator: c.insert_new_row_in_results(FORMULA, "1.0"),
+            Const.HISTORY_WRITE_BATCH * 8,  # Несколько пакетов записи в базу
+        )
+        calculator.close()
+
+
+def run_benchmarks(scale: float = 1.0) -> dict[str, Measurement]:
+    """Выполнение всех замеров"""
+
+    results = {}
+    old_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        directory = Path(work_dir)
+        try:
+            for benchmarks in (
+                formula_benchmarks(),
+                history_benchmarks(directory),
+                search_benchmarks(),
+                insert_benchmarks(directory),
+            ):
+                for benchmark in benchmarks:
+                    results[benchmark.name] = measure(benchmark, scale)
+                    print(format_row(benchmark.name, results[benchmark.name]))
+        finally:
+            os.chdir(old_dir)
+    return results
+
+
+def format_row(name: str, measurement: Measurement) -> str:
+    """Строка таблицы результатов"""
+
+    return (
+        f"{name:<45} {measurement.p50_us:>12.1f} {measurement.p95_us:>12.1f} "
+        f"{measurement.p99_us:>12.1f} {measurement.throughput:>12.1f}"
+    )
+
+
+def load_baseline(path: Path) -> dict:
+    """Чтение базовых замеров (пустой словарь, если их нет)"""
+
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path: Path, results: dict[str, Measurement], baseline: dict) -> None:
+    """Запись базовых замеров. Заданные вручную пороги сохраняются"""
+
+    data = {}
+    for name, measurement in results.items():
+        threshold = baseline.get(name, {}).get("threshold", Const.BENCHMARK_THRESHOLD)
+        data[name] = asdict(measurement) | {"threshold": threshold}
+    with open(path, mode="w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+        file.write("\n")
+
+
+def compare(results: dict[str, Measurement], baseline: dict) -> list[str]:
+    """Сравнение с базой. Возвращает названия операций с регрессией"""
+
+    regressions = []
+    for name, measurement in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        threshold = base.get("threshold", Const.BENCHMARK_THRESHOLD)
+        if (
+            measurement.p50_us > base["p50_us"] * threshold
+            or measurement.p95_us > base["p95_us"] * threshold
+        ):
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Замеры производительности")
+    parser.add_argument("--save", action="store_true", help="записать новую базу")
+    parser.add_argument(
+        "--quick", action="store_true", help="меньше повторов (менее точно)"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=Path(__file__).parent / Const.BENCHMARK_BASELINE_FILE_NAME,
+        help="файл базовых замеров",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'Операция':<45} {'p50, мкс':>12} {'p95, мкс':>12} {'p99, мкс':>12} {'в секунду':>12}"
+    )
+    results = run_benchmarks(0.1 if args.quick else 1.0)
+    baseline = load_baseline(args.baseline)
+
+    if args.save:
+        save_baseline(args.baseline, results, baseline)
+        print(f"\nБаза записана в {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline)
+    missing = [name for name in results if name not in baseline]
+    if missing:
+        print("\nНет в базе:", ", ".join(missing))
+    if regressions:
+        print("\nРегрессия производительности:")
+        for name in regressions:
+            base = baseline[name]
+            print(
+                f"  {name}: p50 {results[name].p50_us:.1f} мкс "
+                f"(база {base['p50_us']:.1f}), p95 {results[name].p95_us:.1f} мкс "
+                f"(база {base['p95_us']:.1f}), порог x{base.get('threshold')}"
+            )
+        return 1
+    print("\nРегрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
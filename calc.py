@@ -0,0 +1,307 @@
+"""Консольный запуск Калькулятора без графического интерфейса.
+
+Пример:
+    python -m calc eval formulas.txt > results.csv
+    python -m calc eval --jobs 0 formulas.txt > results.csv
+    type formulas.txt | python -m calc eval
+    python -m calc sweep "sin(t)/t | t = 1 .. 10 .. 0.5"
+    python -m calc serve --port 8765
+    python -m calc export results.csv
+    python -m calc search "sin("
+    python -m calc search --exact "2 + 2"
+    python -m calc archive --entries 10000
+
+Формулы читаются построчно, вычисляются так же, как в окне калькулятора,
+и сразу выводятся строками 'формула;результат' в формате файла истории.
+Обработка идёт конвейером генераторов, поэтому расход памяти
+не зависит от объёма входных данных. С параметром --jobs формулы
+вычисляются блоками в нескольких процессах (см. модуль batch)."""
+
+import argparse
+import csv
+import os
+import sys
+from collections.abc import Iterable, Iterator
+from typing import TextIO
+
+from batch import evaluate_chunks
+from constants import Const
+from sweep import SweepError, evaluate_sweep, format_sweep_rows, parse_sweep
+
+
+def read_formulas(lines: Iterable[str]) -> Iterator[str]:
+    """Выдаёт формулы из строк входного потока, пропуская пустые строки"""
+
+    for line in lines:
+        formula = line.rstrip("\r\n")
+        if formula.strip():
+            yield formula
+
+
+def evaluate_formulas(
+    formulas: Iterable[str], jobs: int = 1
+) -> Iterator[tuple[str, str]]:
+    """Выдаёт пары (формула, результат). jobs — число процессов вычисления.
+
+    Если stderr выводится на экран, туда выводится число вычисленных формул."""
+
+    progress = show_progress if jobs != 1 and sys.stderr.isatty() else None
+    # Один процесс вычисляет формулы по одной: результат выводится сразу
+    chunk_size = 1 if jobs == 1 else Const.BATCH_CHUNK_SIZE
+    for chunk, results in evaluate_chunks(formulas, jobs or None, chunk_size, progress):
+        yield from zip(chunk, results)
+    if progress is not None:
+        print(file=sys.stderr)  # Завершение строки хода вычисления
+
+
+def show_progress(done: int) -> None:
+    """Вывод числа вычисленных формул в stderr"""
+
+    print(Const.CLI_PROGRESS_TEXT.format(done), end="", file=sys.stderr, flush=True)
+
+
+def write_rows(
+    rows: Iterable[tuple[str, str]],
+    output: TextIO,
+    headers: tuple[str, str],
+    header: bool,
+) -> None:
+    """Построчно записывает пары значений в выходной поток"""
+
+    writer = csv.writer(
+        output, delimiter=Const.EXCEL_LIST_SEPARATOR, lineterminator="\n"
+    )
+    if header:
+        writer.writerow(headers)
+    for row in rows:
+        writer.writerow(row)
+
+
+def command_eval(args: argparse.Namespace) -> int:
+    """Команда eval — вычисление потока формул"""
+
+    if args.file == "-":
+        source = sys.stdin
+    else:
+        try:
+            source = open(args.file, mode="r", encoding="utf-8-sig")
+        except OSError as e:
+            print(f"{Const.CLI_READ_ERROR} {e}", file=sys.stderr)
+            return 2
+
+    with source:
+        rows = evaluate_formulas(read_formulas(source), args.jobs)
+        write_rows(rows, sys.stdout, Const.CSV_HEADERS, args.header)
+    return 0
+
+
+def command_sweep(args: argparse.Namespace) -> int:
+    """Команда sweep — табулирование формулы по диапазону значений переменной"""
+
+    try:
+        sweep = parse_sweep(args.formula)
+        arguments, values = evaluate_sweep(sweep)
+    except SweepError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    rows = format_sweep_rows(arguments, values)
+    write_rows(rows, sys.stdout, (Const.SWEEP_VARIABLE, sweep.formula), args.header)
+    return 0
+
+
+def command_serve(args: argparse.Namespace) -> int:
+    """Команда serve — локальный HTTP сервер вычисления формул"""
+
+    import asyncio
+
+    from server import run_server
+
+    try:
+        asyncio.run(run_server(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass  # Штатная остановка сервера
+    return 0
+
+
+def command_export(args: argparse.Namespace) -> int:
+    """Команда export — выгрузка истории вычислений в csv файл для MS EXCEL"""
+
+    import sqlite3
+
+    from historystore import HistoryStore
+
+    store = HistoryStore(args.database)
+    try:
+        store.open()
+        count = store.export_csv(args.file, not args.no_archive)
+    except (OSError, sqlite3.Error) as e:
+        print(f"{Const.HISTORY_EXPORT_ERROR} {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    print(Const.HISTORY_EXPORT_DONE_TEXT.format(args.file, count), file=sys.stderr)
+    return 0
+
+
+def command_search(args: argparse.Namespace) -> int:
+    """Команда search — поиск в истории вычислений и её архиве"""
+
+    import sqlite3
+
+    from historystore import HistoryStore
+
+    store = HistoryStore(args.database)
+    try:
+        store.open()
+        search = store.find_formula if args.exact else store.search
+        rows = search(args.query, not args.no_archive)
+        write_rows(rows, sys.stdout, Const.CSV_HEADERS, args.header)
+    except (OSError, sqlite3.Error) as e:
+        print(f"{Const.CLI_HISTORY_ERROR} {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    return 0
+
+
+def command_archive(args: argparse.Namespace) -> int:
+    """Команда archive — перенос старой истории в архив по политике хранения"""
+
+    import sqlite3
+
+    from historyarchive import RetentionPolicy
+    from historystore import HistoryStore
+
+    policy = RetentionPolicy(args.entries, args.bytes, args.days)
+    store = HistoryStore(args.database, retention=policy)
+    try:
+        store.open()
+    except sqlite3.Error as e:
+        print(f"{Const.CLI_HISTORY_ERROR} {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    if store.error is not None:
+        print(f"{Const.CLI_HISTORY_ERROR} {store.error}", file=sys.stderr)
+        return 1
+    print(Const.CLI_ARCHIVE_DONE_TEXT.format(store.archived), file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Создание разборщика аргументов командной строки"""
+
+    parser = argparse.ArgumentParser(prog="calc", description=Const.CLI_DESCRIPTION)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_eval = commands.add_parser("eval", help=Const.CLI_EVAL_HELP)
+    parser_eval.add_argument(
+        "file", nargs="?", default="-", help=Const.CLI_EVAL_FILE_HELP
+    )
+    parser_eval.add_argument(
+        "--header", action="store_true", help=Const.CLI_EVAL_HEADER_HELP
+    )
+    parser_eval.add_argument(
+        "--jobs", type=int, default=1, help=Const.CLI_EVAL_JOBS_HELP
+    )
+    parser_eval.set_defaults(handler=command_eval)
+
+    parser_sweep = commands.add_parser("sweep", help=Const.CLI_SWEEP_HELP)
+    parser_sweep.add_argument("formula", help=Const.CLI_SWEEP_FORMULA_HELP)
+    parser_sweep.add_argument(
+        "--header", action="store_true", help=Const.CLI_EVAL_HEADER_HELP
+    )
+    parser_sweep.set_defaults(handler=command_sweep)
+
+    parser_serve = commands.add_parser("serve", help=Const.CLI_SERVE_HELP)
+    parser_serve.add_argument(
+        "--host", default=Const.SERVER_HOST, help=Const.CLI_SERVE_HOST_HELP
+    )
+    parser_serve.add_argument(
+        "--port", type=int, default=Const.SERVER_PORT, help=Const.CLI_SERVE_PORT_HELP
+    )
+    parser_serve.add_argument("--unix", help=Const.CLI_SERVE_UNIX_HELP)
+    parser_serve.set_defaults(handler=command_serve)
+
+    parser_export = commands.add_parser("export", help=Const.CLI_EXPORT_HELP)
+    parser_export.add_argument(
+        "file",
+        nargs="?",
+        default=Const.HISTORY_FILE_NAME,
+        help=Const.CLI_EXPORT_FILE_HELP,
+    )
+    parser_export.add_argument(
+        "--database",
+        default=Const.HISTORY_DB_FILE_NAME,
+        help=Const.CLI_EXPORT_DATABASE_HELP,
+    )
+    parser_export.add_argument(
+        "--no-archive", action="store_true", help=Const.CLI_NO_ARCHIVE_HELP
+    )
+    parser_export.set_defaults(handler=command_export)
+
+    parser_search = commands.add_parser("search", help=Const.CLI_SEARCH_HELP)
+    parser_search.add_argument("query", help=Const.CLI_SEARCH_QUERY_HELP)
+    parser_search.add_argument(
+        "--database",
+        default=Const.HISTORY_DB_FILE_NAME,
+        help=Const.CLI_EXPORT_DATABASE_HELP,
+    )
+    parser_search.add_argument(
+        "--header", action="store_true", help=Const.CLI_EVAL_HEADER_HELP
+    )
+    parser_search.add_argument(
+        "--exact", action="store_true", help=Const.CLI_SEARCH_EXACT_HELP
+    )
+    parser_search.add_argument(
+        "--no-archive", action="store_true", help=Const.CLI_NO_ARCHIVE_HELP
+    )
+    parser_search.set_defaults(handler=command_search)
+
+    # Без параметров политики действует политика окна калькулятора
+    parser_archive = commands.add_parser("archive", help=Const.CLI_ARCHIVE_HELP)
+    parser_archive.add_argument(
+        "--database",
+        default=Const.HISTORY_DB_FILE_NAME,
+        help=Const.CLI_EXPORT_DATABASE_HELP,
+    )
+    parser_archive.add_argument(
+        "--entries",
+        type=int,
+        default=Const.HISTORY_RETAIN_ENTRIES,
+        help=Const.CLI_ARCHIVE_ENTRIES_HELP,
+    )
+    parser_archive.add_argument(
+        "--bytes",
+        type=int,
+        default=Const.HISTORY_RETAIN_BYTES,
+        help=Const.CLI_ARCHIVE_BYTES_HELP,
+    )
+    parser_archive.add_argument(
+        "--days",
+        type=float,
+        default=Const.HISTORY_RETAIN_DAYS,
+        help=Const.CLI_ARCHIVE_DAYS_HELP,
+    )
+    parser_archive.set_defaults(handler=command_archive)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Точка входа консольного режима"""
+
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Получатель вывода закрыл поток (например, head) — это не ошибка.
+        # Остаток буфера перенаправляется в никуда, чтобы не было сообщения при выходе
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
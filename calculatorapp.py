@@ -0,0 +1,486 @@
+"""Окно приложения Калькулятор.
+
+Программа запускается из main.py, который загружает этот модуль
+(и PyQt6) только в главном процессе программы."""
+
+from startuptrace import startup_trace  # Импортируется первым — до PyQt6
+
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+from PyQt6 import QtWidgets
+from PyQt6.QtCore import Qt, QUrl
+from PyQt6.QtGui import QDesktopServices
+from PyQt6.QtWidgets import QHeaderView, QMainWindow, QProgressBar
+
+from _internal.Calc import Ui_MainWindow
+from copybuttondelegate import CopyButtonDelegate
+from customtextedit import CustomTextEdit
+from constants import Const
+from formulas import F
+from historyarchive import RetentionPolicy
+from historyloader import HistoryLoader
+from historymodel import HistoryModel
+from historystore import HistoryStore
+from livepreview import LivePreview
+from resultcache import ResultCache
+from sandbox import EvaluationSandbox
+from message import ask_for_continuation, show_error_message
+from functions import bold_font
+from worksheet import Worksheet
+
+startup_trace.mark("Импорт модулей")
+
+
+class CalculatorApp(QMainWindow, Ui_MainWindow):
+    """Главный класс приложения калькулятора, наследующий от QMainWindow."""
+
+    # Определение кнопок и текстовых полей формы
+    btnClear: QtWidgets.QPushButton
+    btnCopy: QtWidgets.QPushButton
+    btnExport: QtWidgets.QPushButton
+    btnExit: QtWidgets.QPushButton
+    btnHelp: QtWidgets.QPushButton
+    btnPasteCopy: QtWidgets.QPushButton
+    btnRound: QtWidgets.QPushButton
+    btnRun: QtWidgets.QPushButton
+    chkLivePreview: QtWidgets.QCheckBox
+    chkWorksheet: QtWidgets.QCheckBox
+    lblInf2: QtWidgets.QLabel
+    lineRoundDigit: QtWidgets.QLineEdit
+    lineSearch: QtWidgets.QLineEdit
+    txtFormula: CustomTextEdit
+    txtResult: QtWidgets.QTextBrowser
+    tblResults: QtWidgets.QTableView
+
+    # Определение метода класса
+    f: F
+    history_model: HistoryModel  # Модель таблицы истории вычислений
+    copy_button_delegate: CopyButtonDelegate  # Кнопки копирования в таблице истории
+    history_store: HistoryStore  # История вычислений на диске
+    history_loader: HistoryLoader  # Фоновая загрузка истории при запуске
+    history_progress: QProgressBar  # Индикатор загрузки истории
+    live_preview: LivePreview  # Вычисление формулы по ходу ввода
+    result_cache: ResultCache  # Результаты уже вычислявшихся формул
+    sandbox: EvaluationSandbox  # Рабочие процессы для вычисления формул
+    worksheet: Worksheet  # Лист вычислений
+
+    def __init__(self) -> None:
+        """Инициализация приложения"""
+        super().__init__()
+
+        self.exe_directory = ""  # Директория, из которой была загружена программа
+        self.init_vars()  # Инициализация атрибутов класса
+        self.setup_interface()  # Настройка элементов интерфейса
+        self.setup_connections()  # Установка соединений сигналов и слотов
+
+    def init_vars(self):
+        """Присвоение значений переменным"""
+
+        self.f = F(self)  # Методы работы с формулой
+        # История вычислений на диске; старые записи переносятся в архив
+        self.history_store = HistoryStore(retention=RetentionPolicy())
+        self.history_loaded = False  # История прошлых сеансов загружена полностью
+        self.history_load_failed = False  # При загрузке истории была ошибка
+        self.paste_copy_pending = False  # Ожидается окончание вставки и расчёт
+        # Рабочие процессы запускаются сразу, чтобы не ждать их при вычислении
+        with startup_trace.phase("Запуск рабочих процессов"):
+            self.sandbox = EvaluationSandbox()
+        self.result_cache = ResultCache()
+        with startup_trace.phase("Чтение кэша результатов"):
+            self.result_cache.load()
+        self.live_preview = LivePreview(self.evaluate_formula, self)
+        self.worksheet = Worksheet(self.evaluate_formula)
+
+        # Загрузка UI и переменных в объект класса
+        self.exe_directory = (  # Директория, из которой был запущен файл
+            Path(sys.argv[0]).parent
+            if hasattr(sys, "frozen")  # exe файл, получен с помощью PyInstaller
+            else Path(__file__).parent  # Если файл запущен как обычный Python-скрипт
+        )
+
+        if os.environ.get(Const.UI_DEVELOPMENT_ENV) and not hasattr(sys, "frozen"):
+            # Разработка формы: изменения Calc.ui видны без генерации Calc.py
+            from PyQt6 import uic
+
+            with startup_trace.phase("Загрузка формы из Calc.ui"):
+                uic.loadUi(self.exe_directory / Const.UI_CONFIG_REL_PATH, self)
+        else:
+            with startup_trace.phase("Создание формы"):
+                self.setupUi(self)  # Форма, заранее сгенерированная из Calc.ui
+
+    def setup_interface(self) -> None:
+        """Настройка начальных параметров интерфейса."""
+
+        self.txtFormula.setFocus()  # Установка фокуса на поле ввода формулы
+        # установка текста подсказки в поля вводу формулы и вывода результата
+        self.txtResult.setPlaceholderText(Const.PLACEHOLDER_RESULT)
+        self.lineSearch.setPlaceholderText(Const.PLACEHOLDER_SEARCH)
+        self.f.set_decimal_places_input()  # Настройка поля ввода числа знаков округления
+        self.customize_results_table()  # Настройка таблицы результатов
+        with startup_trace.phase("Загрузка истории"):
+            self.load_history()  # Инициализация таблицы результатов
+        self.set_output_filename_label()  # Установка имени файла в метку формы
+        self.setup_bold()  # Установка жирного шрифта для некоторых элементов
+
+    # noinspection PyUnresolvedReferences
+    def setup_connections(self) -> None:
+        """Привязка сигналов к слотам"""
+
+        # Привязка статичных кнопок к слотам
+        self.btnClear.clicked.connect(self.clear_all_fields)
+        self.btnCopy.clicked.connect(self.copy_result_to_clipboard)
+        self.btnExit.clicked.connect(QtWidgets.QApplication.quit)
+        self.btnExport.clicked.connect(self.export_history)
+        self.btnHelp.clicked.connect(self.open_help)
+        self.btnPasteCopy.clicked.connect(self.paste_copy)
+        self.btnRound.clicked.connect(self.f.round_result)
+        self.btnRun.clicked.connect(self.f.formula_processing)
+
+        # Нажатие на кнопку "C" в строке истории копирует формулу
+        self.copy_button_delegate.clicked.connect(
+            self.copy_history_formula_to_clipboard
+        )
+
+        # Вычисление формулы по ходу ввода
+        self.chkLivePreview.toggled.connect(self.f.preview_formula)
+        self.txtFormula.textChanged.connect(self.f.preview_formula)
+        self.live_preview.result_ready.connect(self.output_preview_to_result_field)
+
+        # Режим листа вычислений
+        self.chkWorksheet.toggled.connect(self.f.toggle_worksheet)
+
+        # Поиск в истории по мере ввода строки поиска
+        self.lineSearch.textChanged.connect(self.history_model.search)
+
+        # Сообщение об обрезке слишком длинного текста из буфера обмена
+        self.txtFormula.paste_truncated.connect(self.show_paste_truncated)
+        self.txtFormula.paste_finished.connect(self.finish_paste_copy)
+
+        # Переопределение обработки нажатий клавиш при вводе формулы
+        self.txtFormula.keyPressEvent = self.f.handle_key_press  # type: ignore
+
+    def customize_results_table(self):
+        """Настройка внешнего вида таблицы результатов"""
+
+        self.history_model = HistoryModel(self)
+        self.tblResults.setModel(self.history_model)
+        # Кнопки копирования рисуются делегатом, а не создаются в каждой строке
+        self.copy_button_delegate = CopyButtonDelegate(self)
+        self.tblResults.setItemDelegateForColumn(
+            HistoryModel.COLUMN_BUTTON, self.copy_button_delegate
+        )
+        self.customize_results_columns()  # Настройка колонок таблицы результатов
+
+        self.tblResults.horizontalHeader().setVisible(
+            False
+        )  # Скрыть горизонтальный заголовок
+        self.tblResults.verticalHeader().setVisible(
+            False
+        )  # Скрыть вертикальный заголовок
+
+        self.tblResults.setWordWrap(
+            False
+        )  # Запрет переноса информации на следующую строку
+
+        # Одинаковая высота строк — таблице не нужно измерять каждую строку
+        vertical_header = self.tblResults.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(vertical_header.minimumSectionSize())
+
+    def load_history(self):
+        """Историю прошлых сеансов переписываем в таблицу результатов.
+
+        База открывается в фоновом потоке записи, а история читается
+        в фоновом потоке загрузки страницами, начиная с самых новых записей."""
+
+        self.history_store.start()  # Запуск фоновой записи истории
+
+        # Индикатор загрузки истории в строке состояния
+        self.history_progress = QProgressBar(self)
+        self.history_progress.setFormat(Const.HISTORY_LOADING_TEXT)
+        self.history_progress.setMaximumHeight(Const.HISTORY_PROGRESS_HEIGHT)
+        self.statusBar().addPermanentWidget(self.history_progress)
+
+        self.history_loader = HistoryLoader(
+            self.history_store, self.history_model.older_index, self
+        )
+        self.history_loader.chunk_loaded.connect(self.add_history_chunk)
+        self.history_loader.progress.connect(self.history_progress.setValue)
+        self.history_loader.failed.connect(self.show_history_read_error)
+        self.history_loader.finished.connect(self.finish_history_loading)
+        self.history_loader.start()
+
+    def add_history_chunk(self, rows: list[tuple[str, str]]) -> None:
+        """Добавление очередного блока загруженной истории в конец таблицы"""
+
+        if not self.history_loader.cancelled:
+            self.history_model.extend_older(rows, indexed=True)
+            self.result_cache.warm(rows)  # Пока в кэше есть свободное место
+
+    def show_history_read_error(self, error: str) -> None:
+        """При ошибке чтении файла — выдаём сообщение Пользователю"""
+
+        self.history_load_failed = True  # История загружена не полностью
+        show_error_message(self, f"{Const.HISTORY_READ_ERROR} \n{error}")
+
+    def finish_history_loading(self) -> None:
+        """Окончание загрузки истории.
+
+        После ошибки загрузки история не считается загруженной: в таблице
+        только её часть, а файлы истории остаются нетронутыми."""
+
+        self.history_progress.hide()
+        if self.history_loader.cancelled:
+            return  # Загрузка была прервана очисткой истории
+        self.history_loaded = not self.history_load_failed
+        self.history_model.refresh_search()  # Поиск и по загруженным записям
+        if self.history_store.archived:
+            self.statusBar().showMessage(
+                Const.HISTORY_ARCHIVED_TEXT.format(self.history_store.archived),
+                Const.PASTE_NOTICE_TIMEOUT_MS,
+            )
+
+    def stop_history_loading(self) -> None:
+        """Прерывание загрузки истории"""
+
+        self.history_loader.cancel()
+        self.history_progress.hide()
+
+    def set_output_filename_label(self):
+        """В строку информации проставляем имя файла вывода"""
+
+        self.lblInf2.setText(
+            self.lblInf2.text().replace("#", Const.HISTORY_DB_FILE_NAME)
+        )
+
+    def setup_bold(self):
+        """Установка жирного начертания для шрифтов элементов управления."""
+        widgets = (self.btnRun, self.btnExit, self.txtFormula)
+        for widget in widgets:
+            widget.setFont(bold_font(widget.font()))  # Установка жирного шрифта
+
+    def clear_all_fields(self):
+        """Очистка формулы, поля результата и истории"""
+
+        self.clear_formula_and_result()
+        if ask_for_continuation(Const.DIALOG_ASK):
+            self.clear_table_results()
+        self.txtFormula.setFocus()  # Установка фокуса обратно на поле ввода
+
+    def copy_result_to_clipboard(self) -> None:
+        """Копирование результата вычислений в буфер обмена"""
+
+        text = self.txtResult.toPlainText()  # Получение текста результата вычислений
+        clipboard = (
+            QtWidgets.QApplication.clipboard()
+        )  # Получение доступа к буферу обмена
+        clipboard.setText(text)  # Запись текста в буфер обмена
+        self.txtFormula.setFocus()  # Установка фокуса на поле ввода
+
+    def customize_results_columns(self):
+        """Настраиваем ширину колонок таблицы результатов"""
+
+        self.tblResults.setColumnWidth(0, Const.COLUMN_WIDTH_BUTTON)
+        table_widget_width = self.tblResults.width()
+        table_width = table_widget_width - self.tblResults.verticalScrollBar().width()
+        column_width = int((table_width - Const.COLUMN_WIDTH_BUTTON) / 2)
+        self.tblResults.setColumnWidth(1, column_width)
+        self.tblResults.setColumnWidth(2, column_width)
+
+    def clear_formula_and_result(self):
+        """Очищаем поля ввода формулы и вывода результата"""
+
+        self.txtFormula.cancel_paste()  # Прерываем незаконченную вставку
+        self.paste_copy_pending = False
+        self.txtFormula.clear()  # Очищаем поле формулы
+        self.txtResult.clear()  # Очищаем поле результата
+        self.txtResult.setFont((bold_font(self.txtResult.font(), False)))
+
+    def evaluate_formula(
+        self, formula: str, cancelled: threading.Event | None = None
+    ) -> str:
+        """Результат формулы из кэша или вычисленный в рабочем процессе.
+
+        Вызывается и из потока вычисления по ходу ввода: cancelled — событие
+        отмены устаревшего вычисления (отменённое вычисление не кэшируется)."""
+
+        result = self.result_cache.get(formula)
+        if result is None:
+            # Вычисление в рабочем процессе с ограничением времени и памяти
+            result = self.sandbox.evaluate(formula, cancelled)
+            self.result_cache.put(formula, result)
+        return result
+
+    def output_result_to_text_field_and_history(
+        self, formula: str, result: str
+    ) -> None:
+        """Вывод результата вычисления в текстовое поле и таблицу истории."""
+
+        self.output_result_to_result_field(result)  # Вывод результата в текстовое поле
+        self.insert_new_row_in_results(
+            formula, result
+        )  # Вывод формулы и результата в таблицу
+
+    def output_result_to_result_field(self, result: str) -> None:
+        """Вывод результата вычисления в поле 'Результат'"""
+
+        self.txtResult.setFont(bold_font(self.txtResult.font()))
+        self.txtResult.setPlainText(result)
+
+    def output_preview_to_result_field(self, result: str) -> None:
+        """Вывод результата вычисления по ходу ввода в поле 'Результат'.
+
+        Предварительный результат выводится обычным, а не жирным шрифтом.
+        Ошибку синтаксиса недописанной формулы не показываем."""
+
+        self.txtResult.setFont(bold_font(self.txtResult.font(), False))
+        if result in Const.LIVE_PREVIEW_HIDDEN_RESULTS:
+            self.txtResult.clear()
+        else:
+            self.txtResult.setPlainText(result)
+
+    def insert_new_row_in_results(self, formula: str, result: str):
+        """В таблицу результатов добавляем новую строку.
+        Строку записываем в начало таблицы."""
+
+        self.history_model.prepend(formula, result)
+        self.history_store.append(formula, result)  # Запись на диск — в фоне
+
+    def clear_table_results(self):
+        """Очищаем таблицу истории"""
+
+        self.stop_history_loading()  # Старая история больше не нужна
+        self.history_model.clear()  # Удаляем строки
+        self.history_store.clear()  # Удаляем историю на диске
+        self.result_cache.clear()  # Кэш хранит те же формулы
+
+    def copy_history_formula_to_clipboard(self, row: int) -> None:
+        """Копирование формулы из таблицы результатов в буфер обмена."""
+
+        text, _ = self.history_model.entry(row)  # Получение текста формулы
+        clipboard = (
+            QtWidgets.QApplication.clipboard()
+        )  # Получение доступа к буферу обмена
+        clipboard.setText(text)  # type: ignore # Установка текста в буфер обмена
+        self.txtFormula.setFocus()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        with startup_trace.phase("Настройка колонок истории"):
+            self.customize_results_columns()
+
+    def paintEvent(self, event):
+        """Переопределение отрисовки окна: после первой — отчёт о запуске"""
+
+        super().paintEvent(event)
+        startup_trace.finish("Первая отрисовка окна")
+
+    def resizeEvent(self, event):
+        """Переопределение изменения размера окна"""
+        super().resizeEvent(event)
+        self.customize_results_columns()
+
+    def keyPressEvent(self, event):
+        """Переопределение обработки нажатия клавиши"""
+
+        # При нажатии клавиши F1 вызов справки.
+        if event.key() == Qt.Key.Key_F1:
+            self.open_help()  # открываем файл со справкой
+
+    def closeEvent(self, event):
+        """Переопределение метода выхода из программы"""
+
+        self.history_loader.cancel()
+        self.txtFormula.cancel_paste()
+        # Выполняемое вычисление прерывается, поэтому поток завершается быстро
+        self.live_preview.stop()
+        self.sandbox.close()  # Завершение рабочих процессов
+        try:
+            self.result_cache.save()
+        except OSError:
+            pass  # Без кэша программа работает, только медленнее
+        # История уже записана в базу — дописываем только последний пакет
+        error = self.history_store.close()
+        if error is not None:
+            show_error_message(self, f"{Const.FAILED_TO_WRITE_HISTORY_TEXT}\n {error}")
+        event.accept()
+
+    def export_history(self) -> None:
+        """Выгрузка истории в csv файл для MS EXCEL"""
+
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self,
+            Const.HISTORY_EXPORT_TITLE,
+            Const.HISTORY_FILE_NAME,
+            Const.HISTORY_EXPORT_FILTER,
+        )
+        if not path:
+            return  # Пользователь отказался от выгрузки
+        QtWidgets.QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            count = self.history_store.export_csv(path)
+        except (OSError, sqlite3.Error) as e:
+            show_error_message(self, f"{Const.HISTORY_EXPORT_ERROR}\n {e}")
+            return
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        self.statusBar().showMessage(
+            Const.HISTORY_EXPORT_DONE_TEXT.format(path, count),
+            Const.PASTE_NOTICE_TIMEOUT_MS,
+        )
+
+    def paste_copy(self):
+        """Обработка нажатия кнопки 'Вставить, копировать'"""
+        self.clear_formula_and_result()  # очищаем поле формулы
+        self.txtFormula.paste()  # Копируем буфер обмена в поле формулы
+        # Длинный текст вставляется в фоне — рассчитываем по окончании вставки
+        self.paste_copy_pending = self.txtFormula.is_pasting()
+        if not self.paste_copy_pending:
+            self.process_pasted_formula()
+
+    def finish_paste_copy(self) -> None:
+        """Окончание фоновой вставки по кнопке 'Вставить, копировать'"""
+
+        if self.paste_copy_pending:
+            self.paste_copy_pending = False
+            self.process_pasted_formula()
+
+    def process_pasted_formula(self):
+        """Расчёт вставленной формулы и копирование результата"""
+
+        self.f.formula_processing()  # рассчитываем формулу
+        self.copy_result_to_clipboard()  # записываем результат в буфер обмена
+
+    def show_paste_truncated(self, length: int) -> None:
+        """Сообщение об обрезке слишком длинного текста из буфера обмена"""
+
+        self.statusBar().showMessage(
+            Const.PASTE_TRUNCATED_TEXT.format(length), Const.PASTE_NOTICE_TIMEOUT_MS
+        )
+
+    def open_help(self):
+        """Вызов Help файла"""
+
+        help_file_path = self.exe_directory / Path(Const.HELP_FILE_NAME)
+        QDesktopServices.openUrl(QUrl.fromLocalFile(str(help_file_path)))
+
+    def start(self) -> int:
+        """Запуск приложения и отображение главного окна."""
+
+        self.show()  # Показ формы
+        return QtWidgets.QApplication.exec()  # Запуск основного цикла приложения
+
+
+def main() -> int:
+    """Запуск приложения. Возвращает код завершения программы"""
+
+    with startup_trace.phase("Создание QApplication"):
+        # Экземпляр приложения должен жить до выхода из функции
+        app = QtWidgets.QApplication(sys.argv)  # noqa: F841
+    with startup_trace.phase("Создание окна калькулятора"):
+        calc_app = CalculatorApp()  # Создание экземпляра калькулятора
+    return calc_app.start()  # Запуск калькулятора
@@ -1,14 +1,48 @@
 from dataclasses import dataclass
 
-from PyQt6.QtGui import QColor
-
 
 @dataclass(frozen=True)
 class Const:
-    ALIGN_LEFT = "left"  # Выравнивание — налево
-    ALIGN_RIGHT = "right"  # Выравнивание направо
+    # Параллельное вычисление большого числа формул
+    BATCH_CHUNK_SIZE = 5000  # Число формул в блоке, передаваемом процессу
+    BATCH_CHUNKS_PER_WORKER = 2  # Наибольшее число блоков в работе на процесс
+    # Замеры производительности
+    BENCHMARK_BASELINE_FILE_NAME = "benchmark_baseline.json"  # Базовые замеры
+    BENCHMARK_THRESHOLD = 1.5  # Допустимое замедление относительно базы, раз
     BUTTON_TEXT_COPY_LINE = "C"  # Текст кнопки "Копирование строки"
+    # Тексты консольного режима
+    CLI_ARCHIVE_HELP = "перенести старую историю вычислений в архив"
+    CLI_ARCHIVE_BYTES_HELP = "наибольший размер базы истории, байт"
+    CLI_ARCHIVE_DAYS_HELP = "наибольший возраст записи в базе, дней"
+    CLI_ARCHIVE_DONE_TEXT = "Перенесено в архив записей: {}"
+    CLI_ARCHIVE_ENTRIES_HELP = "наибольшее число записей истории в базе"
+    CLI_DESCRIPTION = "Калькулятор. Вычисление формул без графического интерфейса"
+    CLI_EVAL_HELP = "вычислить формулы, по одной в строке"
+    CLI_EVAL_FILE_HELP = "файл с формулами (по умолчанию — стандартный ввод)"
+    CLI_EVAL_HEADER_HELP = "вывести строку заголовков, как в файле истории"
+    CLI_EVAL_JOBS_HELP = "число процессов вычисления (0 — по числу ядер)"
+    CLI_PROGRESS_TEXT = "\rВычислено формул: {}"  # Ход вычисления в stderr
+    CLI_EXPORT_HELP = "выгрузить историю вычислений в csv файл для MS EXCEL"
+    CLI_EXPORT_DATABASE_HELP = "файл базы данных истории"
+    CLI_EXPORT_FILE_HELP = "csv файл (по умолчанию — results.csv)"
+    CLI_HISTORY_ERROR = "Ошибка работы с историей вычислений:"
+    CLI_NO_ARCHIVE_HELP = "не читать архив истории"
+    CLI_READ_ERROR = "Не удалось открыть файл с формулами:"
+    CLI_SEARCH_EXACT_HELP = "найти вычисления формулы, заданной целиком"
+    CLI_SEARCH_HELP = "найти записи истории вычислений, включая архив"
+    CLI_SEARCH_QUERY_HELP = "строка поиска (без учёта регистра букв)"
+    CLI_SERVE_HELP = "запустить локальный HTTP сервер вычисления формул"
+    CLI_SERVE_HOST_HELP = "адрес сервера"
+    CLI_SERVE_PORT_HELP = "порт сервера"
+    CLI_SERVE_UNIX_HELP = "путь к Unix сокету (вместо адреса и порта)"
+    CLI_SWEEP_HELP = "табулировать формулу по диапазону значений переменной"
+    CLI_SWEEP_FORMULA_HELP = "формула вида 'sin(t)/t | t = 1 .. 10 .. 0.5'"
     COLUMN_WIDTH_BUTTON = 50  # Ширина колонки с кнопкой
+    # Оценка стоимости вычисления по числу цифр целых промежуточных результатов
+    COST_CHEAP_DIGITS = 20_000  # Не больше — формула вычисляется сразу
+    COST_CHEAP_LENGTH = 20_000  # Длиннее формула — разбор в рабочем процессе
+    COST_MAX_DIGITS = 5_000_000  # Больше — формула не вычисляется
+    COST_SMALL_INT_DIGITS = 18  # Целые до стольких цифр дёшевы, как вещественные
     CSV_HEADERS = ("Выражение", "Результат")  # Заголовки столбцов CSV файла
     DECIMAL_PLACE_RANGE = (0, 9)  # Диапазон числа знаков для округления
     DEFAULT_DECIMAL_PLACES = 2  # Число знаков для округления по умолчанию
@@ -24,7 +58,17 @@ class Const:
     # текст ошибки при вводе недопустимого символа
     ERROR_INVALID_SYMBOL = "Ошибка. Недопустимый символ"
     ERROR_SYNTAX = "Ошибка синтаксиса"
+    # Текст ошибки при превышении времени или памяти на вычисление формулы
+    ERROR_TOO_EXPENSIVE = "Ошибка. Слишком сложное вычисление"
+    ERROR_NO_VALUE = "Ошибка. Значение не определено"  # Значение в точке — inf/nan
+    ERROR_NUMPY_MISSING = "Ошибка. Для табулирования нужен пакет NumPy"
+    ERROR_SWEEP_RANGE = "Ошибка. Неверный диапазон табулирования"
+    ERROR_SWEEP_TOO_MANY_POINTS = "Ошибка. Слишком много точек табулирования"
+    ERROR_WORKSHEET_FORWARD = "Ошибка. Ссылка не на предыдущую строку листа"
+    ERROR_WORKSHEET_NAME = "Ошибка. Недопустимое имя строки листа"
+    ERROR_WORKSHEET_REFERENCE = "Ошибка. Ссылка на пустую строку или строку с ошибкой"
     ERROR_MESSAGE_TITLE = "Ошибка"  # Заголовок окна с сообщением об ошибке
+    FORMULA_CACHE_SIZE = 1024  # Размер кэша скомпилированных формул
     FAILED_TO_WRITE_HISTORY_TEXT = "Не удалось записать историю вычислений в файл\n:"
     EXCEL_LIST_SEPARATOR = ";"  # Разделитель элементов списка для MS EXCEL
     # Набор допустимых формул
@@ -45,12 +89,46 @@ class Const:
     }
     HELP_FILE_NAME = "_internal\\Help.htm"  # Имя файла с Help
     HELP_WINDOW_SIZE = (800, 600)  # Размеры окна помощи
-    HISTORY_FILE_NAME = "results.csv"  # Имя файла с историей формул и результатов
+    # Архив старых записей истории (политика хранения — в HistoryStore)
+    HISTORY_ARCHIVE_DIR_SUFFIX = "_archive"  # Каталог архива: results_archive
+    HISTORY_ARCHIVE_MIN_ROWS = 1000  # Меньшее число лишних записей не архивируется
+    HISTORY_ARCHIVE_SEGMENT = 50_000  # Наибольшее число записей в сегменте архива
+    HISTORY_ARCHIVE_SUFFIX = ".csv.gz"  # Расширение сегмента архива
+    HISTORY_ARCHIVED_TEXT = "Старая история перенесена в архив. Записей: {}"
+    HISTORY_DB_FILE_NAME = "results.sqlite3"  # База данных истории вычислений
+    HISTORY_DB_TIMEOUT_S = 30.0  # Ожидание освобождения базы другим соединением
+    # Выгрузка истории в csv файл для MS EXCEL
+    HISTORY_EXPORT_DONE_TEXT = "История выгружена в файл {}. Записей: {}"
+    HISTORY_EXPORT_ERROR = "Не удалось выгрузить историю в файл:"
+    HISTORY_EXPORT_FILTER = "Файлы CSV (*.csv)"  # Фильтр диалога выбора файла
+    HISTORY_EXPORT_PAGE = 50_000  # Число записей, выгружаемых в csv файл за раз
+    HISTORY_EXPORT_TITLE = "Выгрузка истории в csv файл"  # Заголовок диалога
+    HISTORY_FILE_NAME = "results.csv"  # Файл истории (прежние версии, выгрузка)
+    HISTORY_LOAD_CHUNK = 5000  # Число записей истории в блоке фоновой загрузки
+    HISTORY_LOADING_TEXT = "Загрузка истории: %p%"  # Текст индикатора загрузки
+    HISTORY_PROGRESS_HEIGHT = 14  # Высота индикатора загрузки истории
+    HISTORY_RETAIN_BYTES = 32 * 2**20  # Наибольший размер базы истории, байт
+    HISTORY_RETAIN_DAYS = None  # Наибольший возраст записи в базе, дней
+    HISTORY_RETAIN_ENTRIES = 100_000  # Наибольшее число записей истории в базе
+    HISTORY_SEARCH_PAGE = 500  # Число найденных записей, показываемых за раз
     HISTORY_READ_ERROR = (
         "Файл с историй вычислений существует, но испорчен или недоступен. \n"
         "Прежняя история вычислений не используется:"
     )  # Текст при ошибке чтения файла истории
+    HISTORY_WRITE_BATCH = 256  # Наибольшее число записей в пакете записи истории
+    LIVE_PREVIEW_DELAY_MS = 300  # Пауза в наборе формулы перед её вычислением
+    # Результаты, которые не показываются при вычислении по ходу ввода
+    LIVE_PREVIEW_HIDDEN_RESULTS = (ERROR_SYNTAX,)
+    LIVE_PREVIEW_STOP_TIMEOUT_MS = 5000  # Ожидание отменённого вычисления при выходе
+    # Вставка текста из буфера обмена
+    PASTE_CHUNK_SIZE = 16384  # Число символов, очищаемых и вставляемых за один шаг
+    PASTE_MAX_LENGTH = 1_000_000  # Наибольшая длина вставляемого текста
+    PASTE_NOTICE_TIMEOUT_MS = 10_000  # Время показа сообщения об обрезке текста
+    PASTE_TRUNCATED_TEXT = (
+        "Текст в буфере обмена слишком длинный. Вставлены первые {} символов"
+    )
     PLACEHOLDER_RESULT = "Здесь будет результат вычисления"
+    PLACEHOLDER_SEARCH = "Поиск в истории по формуле или результату"
     # Словарь для замены нестандартных символов на стандартные
     REPLACEMENT_DICTIONARY = {
         ",": ".",
@@ -66,7 +144,46 @@ class Const:
         "х": "*",
         "–": "-",  # Широкий дефис меняется на знак "-"
     }
-    # Специальные символы шаблона регулярных выражений
-    SPECIAL_REGEX_SYMBOLS = r".^$*+?{}[]\|()"
-    UI_CONFIG_REL_PATH = "_internal\\Calc.ui"  # Путь к файлу UI калькулятора
+    # Кэш результатов вычисления формул
+    RESULT_CACHE_FILE_NAME = "results_cache.json"  # Файл кэша
+    RESULT_CACHE_MAX_LENGTH = 10_000  # Более длинные результаты не кэшируются
+    RESULT_CACHE_SIZE = 10_000  # Наибольшее число записей кэша
+    SANDBOX_CANCEL_CHECK_S = 0.05  # Период проверки отмены вычисления, секунд
+    SANDBOX_MEMORY_LIMIT = 1024 * 1024 * 1024  # Память рабочего процесса, байт
+    SANDBOX_STOP_TIMEOUT_S = 1.0  # Ожидание штатного завершения процесса, секунд
+    SANDBOX_TIME_LIMIT_S = 2.0  # Время на вычисление одной формулы, секунд
+    SANDBOX_WORKERS = 2  # Число рабочих процессов: для ввода и для просмотра
+    # Локальный HTTP сервер вычисления формул
+    SERVER_BAD_REQUEST = (
+        'Неверный запрос: ожидается JSON {"formula": "..."} или {"formulas": [...]}'
+    )
+    SERVER_BATCH_TOO_LARGE = "Слишком много формул в запросе"
+    SERVER_BODY_TOO_LARGE = "Слишком большой запрос"
+    SERVER_CHUNK_SIZE = 256  # Число формул пакета, вычисляемых в потоке за раз
+    SERVER_HOST = "127.0.0.1"  # Сервер доступен только с этой машины
+    SERVER_MAX_BATCH = 100_000  # Наибольшее число формул в одном запросе
+    SERVER_MAX_BODY = 16 * 1024 * 1024  # Наибольший размер тела запроса, байт
+    SERVER_MAX_IN_FLIGHT = 64  # Наибольшее число одновременно обрабатываемых запросов
+    SERVER_METHOD_NOT_ALLOWED = "Допустим только метод POST"
+    SERVER_NOT_FOUND = "Неизвестный адрес. Формулы вычисляются по адресу /evaluate"
+    SERVER_PATH = "/evaluate"  # Адрес вычисления формул
+    SERVER_PORT = 8765  # Порт сервера по умолчанию
+    SERVER_STARTED_TEXT = "Сервер вычисления формул запущен:"
+    # Табулирование формулы по диапазону значений переменной
+    SWEEP_CLIPBOARD_MAX_POINTS = 100_000  # Наибольшее число строк в буфере обмена
+    SWEEP_CLIPBOARD_SEPARATOR = "\t"  # Разделитель колонок таблицы в буфере обмена
+    SWEEP_FORMAT_CHUNK = 65536  # Число точек, форматируемых за один шаг
+    SWEEP_MAX_POINTS = 10_000_000  # Наибольшее число точек диапазона
+    SWEEP_RANGE_SEPARATOR = ".."  # Разделитель начала, конца и шага диапазона
+    SWEEP_RESULT_TEXT = "Таблица из {} значений скопирована в буфер обмена"
+    SWEEP_SEPARATOR = "|"  # Отделяет формулу от диапазона
+    SWEEP_VARIABLE = "t"  # Переменная табулирования ('x' означает умножение)
+    UI_CONFIG_REL_PATH = "_internal/Calc.ui"  # Путь к файлу UI калькулятора
+    # Переменная окружения: загружать форму из Calc.ui, а не из Calc.py
+    UI_DEVELOPMENT_ENV = "CALC_LOAD_UI"
     VALID_CHAR_SET = "0123456789.+-*/()"  # Набор допустимых символов
+    # Лист вычислений: формулы в нескольких строках со ссылками друг на друга
+    WORKSHEET_ASSIGNMENT = "="  # Отделяет имя строки от формулы
+    WORKSHEET_LINE_REFERENCE = "#"  # Ссылка на строку по номеру: #1 — первая строка
+    WORKSHEET_NOTICE_TIMEOUT_MS = 5000  # Время показа сообщения о пересчёте листа
+    WORKSHEET_RECALCULATED_TEXT = "Пересчитано строк листа: {} из {}"
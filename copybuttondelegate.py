@@ -0,0 +1,59 @@
+from PyQt6.QtCore import QEvent, QModelIndex, QPersistentModelIndex, Qt, pyqtSignal
+from PyQt6.QtWidgets import (
+    QApplication,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionButton,
+)
+
+
+class CopyButtonDelegate(QStyledItemDelegate):
+    """Рисует в ячейке таблицы кнопку копирования формулы.
+
+    Кнопка только рисуется — виджеты в строках таблицы не создаются.
+    Нажатие определяется по положению мыши и передаётся сигналом clicked."""
+
+    clicked = pyqtSignal(int)  # Номер строки, в которой нажата кнопка
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pressed = QPersistentModelIndex()  # Ячейка с нажатой кнопкой
+
+    def paint(self, painter, option, index: QModelIndex) -> None:
+        """Рисование кнопки в ячейке"""
+
+        button = QStyleOptionButton()
+        button.rect = option.rect
+        button.text = index.data()
+        button.state = QStyle.StateFlag.State_Enabled
+        if self._pressed.isValid() and self._pressed == QPersistentModelIndex(index):
+            button.state |= QStyle.StateFlag.State_Sunken  # Кнопка нажата
+
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, widget)
+
+    def editorEvent(self, event, model, option, index: QModelIndex) -> bool:
+        """Определение нажатия кнопки мышью"""
+
+        if event.type() not in (
+            QEvent.Type.MouseButtonPress,
+            QEvent.Type.MouseButtonRelease,
+        ):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+
+        inside = option.rect.contains(event.position().toPoint())
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self._pressed = (
+                QPersistentModelIndex(index) if inside else QPersistentModelIndex()
+            )
+            return inside
+
+        # Кнопка срабатывает, если мышь отпущена над той же кнопкой
+        released_on_pressed = inside and self._pressed == QPersistentModelIndex(index)
+        self._pressed = QPersistentModelIndex()
+        if released_on_pressed:
+            self.clicked.emit(index.row())
+        return released_on_pressed
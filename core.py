@@ -0,0 +1,141 @@
+"""Ядро калькулятора: стандартизация, проверка и вычисление формул.
+
+Модуль не зависит от PyQt6, поэтому пригоден для пакетной обработки
+на машинах без графики. Импорт модуля занимает десятки миллисекунд:
+основное время уходит на стандартные модули dataclasses, re и enum,
+нужные constants, lexer и engine.
+Графический интерфейс, консольный режим и рабочие процессы пользуются
+только функциями этого модуля. Открытый интерфейс перечислен в __all__."""
+
+from dataclasses import dataclass
+from numbers import Number
+
+from constants import Const
+from engine import FormulaCost, compile_formula, run_compiled_formula
+from lexer import TRANSLATION_TABLE, is_valid_normalized, validate_formula
+
+__all__ = [
+    "ERRORS",
+    "Result",
+    "evaluate",
+    "calculate",
+    "evaluate_formula",
+    "calculate_and_validate_formula",
+    "error_text",
+    "estimate_formula_cost",
+    "estimate_normalized_cost",
+    "normalize_characters",
+    "no_virus",
+]
+
+# Тексты ошибок вычисления: результат с таким текстом — ошибка
+ERRORS = frozenset(
+    value
+    for name, value in vars(Const).items()
+    if name.startswith("ERROR_") and isinstance(value, str)
+)
+
+
+@dataclass(frozen=True)
+class Result:
+    """Результат вычисления формулы"""
+
+    text: str  # Результат в виде текста или текст ошибки — как в окне калькулятора
+    value: Number | None = None  # Числовое значение (None при ошибке)
+    error: str | None = None  # Текст ошибки из Const.ERROR_* (None, если ошибки нет)
+
+    @property
+    def ok(self) -> bool:
+        """Формула вычислена без ошибок"""
+
+        return self.error is None
+
+    @classmethod
+    def failure(cls, error: str) -> "Result":
+        """Результат с ошибкой"""
+
+        return cls(text=error, error=error)
+
+
+def normalize_characters(formula: str) -> str:
+    """Заменяет нестандартные символы стандартными"""
+
+    return formula.translate(TRANSLATION_TABLE)  # Замена символов в формуле
+
+
+def no_virus(formula: str) -> bool:
+    """Проверка стандартизованной формулы на наличие только допустимого текста.
+
+    Защищает программу от ввода вредоносного кода."""
+
+    return is_valid_normalized(formula)  # True, если весь текст допустим
+
+
+def evaluate(formula: str) -> Result:
+    """Стандартизация, проверка и вычисление формулы, введённой пользователем"""
+
+    text = validate_formula(formula)  # Стандартизация и проверка символов
+    if text is None:
+        return Result.failure(Const.ERROR_INVALID_SYMBOL)
+    return calculate(text)
+
+
+def calculate(formula: str) -> Result:
+    """Вычисление стандартизованной формулы и обработка ошибок"""
+
+    compiled = compile_formula(formula)  # Разобранная формула берётся из кэша
+    if compiled is None:
+        return Result.failure(Const.ERROR_SYNTAX)  # Синтаксическая ошибка
+    if compiled.cost is FormulaCost.INFEASIBLE:
+        return Result.failure(Const.ERROR_TOO_EXPENSIVE)  # Заведомо неподъёмная
+
+    # noinspection PyBroadException
+    try:
+        value = run_compiled_formula(compiled.code)  # Результат вычисления
+        text = str(value)  # Слишком длинное целое число не переводится в текст
+    except Exception as e:
+        return Result.failure(error_text(e))
+    return Result(text, value)
+
+
+def error_text(error: Exception) -> str:
+    """Текст ошибки вычисления формулы для Пользователя"""
+
+    if isinstance(error, ZeroDivisionError):
+        return Const.ERROR_DIVIDE_BY_ZERO  # Деление на 0
+    if isinstance(error, MemoryError):
+        return Const.ERROR_TOO_EXPENSIVE  # Слишком дорогое
+    return Const.ERROR_SYNTAX  # Синтаксическая ошибка
+
+
+def evaluate_formula(formula: str) -> str:
+    """Результат вычисления формулы, введённой пользователем, в виде текста"""
+
+    return evaluate(formula).text
+
+
+def calculate_and_validate_formula(formula: str) -> str:
+    """Результат вычисления стандартизованной формулы в виде текста"""
+
+    return calculate(formula).text
+
+
+def estimate_formula_cost(formula: str) -> FormulaCost:
+    """Оценка стоимости вычисления формулы, введённой пользователем.
+
+    Формулы с ошибками вычисляются мгновенно и считаются дешёвыми."""
+
+    text = validate_formula(formula)
+    return FormulaCost.CHEAP if text is None else estimate_normalized_cost(text)
+
+
+def estimate_normalized_cost(formula: str) -> FormulaCost:
+    """Оценка стоимости вычисления стандартизованной и проверенной формулы.
+
+    Очень длинные формулы долго разбираются, поэтому они не компилируются
+    здесь, а передаются в рабочий процесс с ограничением времени."""
+
+    if len(formula) > Const.COST_CHEAP_LENGTH:
+        return FormulaCost.BORDERLINE
+    compiled = compile_formula(formula)  # Разобранная формула берётся из кэша
+    return FormulaCost.CHEAP if compiled is None else compiled.cost
@@ -1,20 +1,93 @@
-from PyQt6.QtCore import QMimeData
+from PyQt6.QtCore import QMimeData, pyqtSignal
 from PyQt6.QtWidgets import QTextEdit
-from PyQt6.QtGui import QKeyEvent
+from PyQt6.QtGui import QKeyEvent, QTextCursor
 
-from functions import filter_out_unsafe_symbols
+from constants import Const
+from pastesanitizer import PasteSanitizer, sanitize_chunks
 
 
 class CustomTextEdit(QTextEdit):
-    """Класс для перехвата вставки текста из буфера обмена"""
+    """Класс для перехвата вставки текста из буфера обмена.
+
+    Короткий текст очищается от лишних символов сразу, длинный — в рабочем
+    потоке блоками, которые вставляются в поле по мере готовности."""
+
+    paste_finished = pyqtSignal()  # Вставка текста из буфера обмена закончена
+    paste_truncated = pyqtSignal(int)  # Текст обрезан до указанной длины
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.paste_sanitizer: PasteSanitizer | None = None  # Очистка длинного текста
+        self.paste_cursor: QTextCursor | None = None  # Место вставки блоков
+        self.paste_chunks = 0  # Число вставленных блоков
+        self.plain_paste = False  # Вставка без очистки (в режиме листа вычислений)
 
     def insertFromMimeData(self, source: QMimeData):
         """Подмена метода вставки данных из буфера обмена"""
 
-        # Из текста вставки убираем все лишние символы, и передаём управление дальше.
-        if source.hasText():
-            source = filter_out_unsafe_symbols(source)
-        super().insertFromMimeData(source)
+        if not source.hasText():
+            super().insertFromMimeData(source)
+            return
+
+        self.cancel_paste()  # Новая вставка заменяет незаконченную
+        text = source.text()
+        if len(text) > Const.PASTE_MAX_LENGTH:
+            text = text[: Const.PASTE_MAX_LENGTH]
+            self.paste_truncated.emit(Const.PASTE_MAX_LENGTH)
+
+        if self.plain_paste:
+            self.insertPlainText(text)  # Строки листа проверяются при пересчёте
+            self.paste_finished.emit()
+            return
+
+        # Из текста вставки убираем все лишние символы
+        if len(text) <= Const.PASTE_CHUNK_SIZE:
+            self.insertPlainText("".join(sanitize_chunks(text)))
+            self.paste_finished.emit()
+            return
+
+        self.paste_cursor = self.textCursor()
+        self.paste_chunks = 0
+        self.paste_sanitizer = PasteSanitizer(text, self)
+        self.paste_sanitizer.chunk_ready.connect(self.insert_paste_chunk)
+        self.paste_sanitizer.finished.connect(self.finish_paste)
+        self.paste_sanitizer.start()
+
+    def insert_paste_chunk(self, chunk: str) -> None:
+        """Вставка очередного блока очищенного текста"""
+
+        if self.sender() is not self.paste_sanitizer:
+            return  # Блок прерванной вставки
+        # Все блоки вставки отменяются одним действием "Отменить"
+        if self.paste_chunks:
+            self.paste_cursor.joinPreviousEditBlock()
+        else:
+            self.paste_cursor.beginEditBlock()
+        self.paste_cursor.insertText(chunk)
+        self.paste_cursor.endEditBlock()
+        self.paste_chunks += 1
+        self.setTextCursor(self.paste_cursor)
+
+    def finish_paste(self) -> None:
+        """Окончание вставки длинного текста"""
+
+        if self.sender() is not self.paste_sanitizer:
+            return  # Прерванная вставка
+        self.paste_sanitizer.deleteLater()
+        self.paste_sanitizer = None
+        self.paste_cursor = None
+        self.paste_finished.emit()
+
+    def is_pasting(self) -> bool:
+        """Идёт ли вставка длинного текста"""
+
+        return self.paste_sanitizer is not None
+
+    def cancel_paste(self) -> None:
+        """Прерывание незаконченной вставки"""
+
+        if self.paste_sanitizer is not None:
+            self.paste_sanitizer.cancel()
+            self.paste_sanitizer.deleteLater()
+            self.paste_sanitizer = None
+            self.paste_cursor = None
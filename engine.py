@@ -0,0 +1,559 @@
+"""Движок вычисления формул.
+
+Формула один раз разбирается в синтаксическое дерево (AST),
+дерево проверяется по белому списку допустимых узлов и компилируется в байт-код.
+Дерево строится из лексем формулы алгоритмом сортировочной станции
+(shunting-yard) с явными стеками и теми же приоритетами операций, что
+в Python. Время разбора линейно, а глубина вложенности скобок и длина
+формулы не ограничены глубиной рекурсии интерпретатора.
+Перед компиляцией дерево переводится в линейную последовательность
+присваиваний временным переменным. Одинаковые подвыражения (например,
+повторяющиеся sqrt(2) или sin(pi/6)) вычисляются один раз, а у дешёвых
+формул константные подвыражения вычисляются ещё при компиляции. Операции
+выполняются те же и в том же порядке, поэтому результат не меняется
+ни в одном бите. Линейный код не вкладывает выражения друг в друга,
+и компилятор Python не упирается в глубину длинной формулы.
+Скомпилированные формулы хранятся в ограниченном LRU кэше,
+поэтому повторное вычисление формулы обходится без её разбора.
+
+До вычисления стоимость формулы оценивается по дереву: заведомо
+неподъёмные формулы (например, 9**9**9) не вычисляются вовсе."""
+
+import ast
+import math
+import operator
+import sys
+from collections.abc import Collection
+from enum import Enum
+from functools import lru_cache
+from types import CodeType
+from typing import NamedTuple
+
+from constants import Const
+from lexer import NAME, NUMBER, OPERATOR, PAREN, Token, scan_normalized
+
+# Пространство имён формулы: только разрешённые функции и константы.
+# abs отсутствует в модуле math, поэтому берётся встроенная функция.
+FORMULA_NAMESPACE = {
+    name: getattr(math, name) if hasattr(math, name) else abs
+    for name in Const.FORMULA_VALIDATION_LIST
+}
+FORMULA_NAMESPACE["__builtins__"] = {}  # Запрет доступа к встроенным функциям
+
+# Операции формулы — те же функции, что выполняет байт-код Python
+BINARY_OPERATIONS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow,
+}
+UNARY_OPERATIONS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+# Приоритеты бинарных операций и их узлы. Возведение в степень —
+# правоассоциативная операция, остальные — левоассоциативные
+BINARY_OPERATORS = {
+    "+": (1, ast.Add),
+    "-": (1, ast.Sub),
+    "*": (2, ast.Mult),
+    "/": (2, ast.Div),
+    "//": (2, ast.FloorDiv),
+    "**": (4, ast.Pow),
+}
+UNARY_OPERATORS = {"+": ast.UAdd, "-": ast.USub}
+# Унарные + и - связывают сильнее * и /, но слабее **: -2**2 == -(2**2)
+UNARY_PRECEDENCE = 3
+POWER_PRECEDENCE = BINARY_OPERATORS["**"][0]
+
+RESULT_NAME = "_result"  # Переменная с результатом вычисления формулы
+# Положение узлов линейного кода в тексте: у формулы одна строка
+LOCATION = {"lineno": 1, "col_offset": 0}
+
+
+class ParseError(Exception):
+    """Синтаксическая ошибка формулы"""
+
+
+def number_value(text: str) -> int | float:
+    """Значение числа так же, как у числа в тексте программы на Python"""
+
+    if text.isdigit():
+        # Python не допускает ведущих нулей в целых числах, кроме самого 0
+        if text[0] == "0" and text.strip("0"):
+            raise ParseError(text)
+        return int(text)  # Число длиннее 4300 цифр вызывает ValueError
+    return float(text)
+
+
+def reduce_operator(entry: tuple, operands: list[ast.expr]) -> None:
+    """Применение операции из стека операций к операндам на вершине стека"""
+
+    kind, _, node_class = entry
+    if kind == "unary":
+        operands.append(ast.UnaryOp(node_class(), operands.pop()))
+    else:
+        right = operands.pop()
+        operands.append(ast.BinOp(operands.pop(), node_class(), right))
+
+
+def parse_tokens(tokens: tuple[Token, ...]) -> ast.Expression | None:
+    """Построение дерева формулы из лексем без рекурсии.
+
+    Грамматика та же, что у выражений Python из чисел, имён, скобок,
+    вызовов функций и арифметических действий. Возвращает None при
+    синтаксической ошибке."""
+
+    operands: list[ast.expr] = []  # Стек операндов — готовых поддеревьев
+    # Стек операций: (вид, приоритет, класс узла или имя функции).
+    # Вид "paren" — открывающая скобка, "call" — скобка вызова функции
+    operators: list[tuple] = []
+    expect_operand = True  # Ожидается операнд, а не бинарная операция
+    call_paren = False  # Лексема — скобка вызова функции, уже учтённая в стеке
+    last = len(tokens) - 1
+    try:
+        for number, (kind, text) in enumerate(tokens):
+            if call_paren:
+                call_paren = False
+            elif expect_operand:
+                if kind == NUMBER:
+                    operands.append(ast.Constant(number_value(text)))
+                    expect_operand = False
+                elif kind == NAME:
+                    if number < last and tokens[number + 1] == (PAREN, "("):
+                        operators.append(("call", -1, text))
+                        call_paren = True
+                    else:
+                        operands.append(ast.Name(text, ast.Load()))
+                        expect_operand = False
+                elif text == "(":
+                    operators.append(("paren", -1, None))
+                elif text == ")" and operators and operators[-1][0] == "call":
+                    # Вызов функции без аргументов
+                    operands.append(
+                        ast.Call(ast.Name(operators.pop()[2], ast.Load()), [], [])
+                    )
+                    expect_operand = False
+                elif kind == OPERATOR and text in UNARY_OPERATORS:
+                    operators.append(("unary", UNARY_PRECEDENCE, UNARY_OPERATORS[text]))
+                else:
+                    return None
+            elif kind == OPERATOR:
+                precedence, node_class = BINARY_OPERATORS[text]
+                # Выполняются операции с большим приоритетом, а при равном —
+                # левоассоциативные: 1-2-3 == (1-2)-3, но 2**3**2 == 2**(3**2)
+                while operators and (
+                    operators[-1][1] > precedence
+                    or operators[-1][1] == precedence != POWER_PRECEDENCE
+                ):
+                    reduce_operator(operators.pop(), operands)
+                operators.append(("binary", precedence, node_class))
+                expect_operand = True
+            elif text == ")":
+                while operators and operators[-1][0] not in ("paren", "call"):
+                    reduce_operator(operators.pop(), operands)
+                if not operators:
+                    return None  # Нет парной открывающей скобки
+                marker, _, name = operators.pop()
+                if marker == "call":
+                    func = ast.Name(name, ast.Load())
+                    operands.append(ast.Call(func, [operands.pop()], []))
+            else:
+                return None  # Два операнда подряд или точка вне числа
+
+        if expect_operand:
+            return None  # Формула пуста или оканчивается знаком действия
+        while operators:
+            entry = operators.pop()
+            if entry[0] in ("paren", "call"):
+                return None  # Нет парной закрывающей скобки
+            reduce_operator(entry, operands)
+    except (ParseError, ValueError):
+        return None
+    return ast.Expression(operands.pop())
+
+
+def is_allowed_tree(
+    tree: ast.AST, allowed_names: Collection[str] = Const.FORMULA_VALIDATION_LIST
+) -> bool:
+    """Проверяет, что дерево формулы состоит только из разрешённых узлов.
+
+    Допустимы числа, разрешённые имена, арифметические операции и вызовы
+    разрешённых функций. Дерево обходится без рекурсии."""
+
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is ast.BinOp:
+            if type(node.op) not in BINARY_OPERATIONS:
+                return False
+            stack.append(node.left)
+            stack.append(node.right)
+        elif node_type is ast.Constant:
+            # Константами могут быть только числа (bool — подкласс int)
+            if type(node.value) not in (int, float):
+                return False
+        elif node_type is ast.Call:
+            # Вызываются только разрешённые функции с позиционными аргументами
+            if type(node.func) is not ast.Name or node.keywords:
+                return False
+            stack.append(node.func)
+            stack.extend(node.args)
+        elif node_type is ast.Name:
+            if node.id not in allowed_names:
+                return False
+        elif node_type is ast.UnaryOp:
+            if type(node.op) not in UNARY_OPERATIONS:
+                return False
+            stack.append(node.operand)
+        elif node_type is ast.Expression:
+            stack.append(node.body)
+        else:
+            return False
+    return True
+
+
+# Наибольшее число десятичных цифр целой части вещественного числа
+FLOAT_DIGITS = math.log10(sys.float_info.max)
+
+
+class FormulaCost(Enum):
+    """Оценка стоимости вычисления формулы"""
+
+    CHEAP = "cheap"  # Вычисляется быстро
+    BORDERLINE = "borderline"  # Может вычисляться долго — нужен безопасный путь
+    INFEASIBLE = "infeasible"  # Заведомо неподъёмна — не вычисляется
+
+
+class CompiledFormula(NamedTuple):
+    """Скомпилированная формула и оценка стоимости её вычисления"""
+
+    code: CodeType
+    cost: FormulaCost
+
+
+def number_digits(value: int | float) -> float:
+    """Число десятичных цифр целой части числа (0 для чисел по модулю до 1)"""
+
+    value = abs(value)
+    return math.log10(value) if value > 1 else 0.0
+
+
+class Bound(NamedTuple):
+    """Оценка значения узла формулы"""
+
+    is_int: bool  # Значение — целое число
+    digits: float  # Верхняя граница числа цифр целой части
+    negative: bool  # Значение может быть отрицательным
+    non_negative: bool  # Значение может быть неотрицательным
+
+
+# Оценка вещественного значения: любой знак, число цифр ограничено
+FLOAT_BOUND = Bound(False, FLOAT_DIGITS, True, True)
+
+
+def estimate_node(node: ast.AST, bounds: dict) -> Bound:
+    """Оценка значения узла по оценкам значений его операндов.
+
+    Стоимость определяют только целые числа — их размер не ограничен.
+    Вещественные числа ограничены, а их переполнение выявляется сразу.
+    Знак значения учитывается, потому что целое число в отрицательной
+    степени — вещественное число, а не огромное целое."""
+
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return Bound(
+            isinstance(value, int), number_digits(value), value < 0, value >= 0
+        )
+    if isinstance(node, ast.UnaryOp):
+        bound = bounds[id(node.operand)]
+        if isinstance(node.op, ast.USub):
+            # Смена знака: возможные знаки меняются местами
+            return bound._replace(
+                negative=bound.non_negative, non_negative=bound.negative
+            )
+        return bound
+    if isinstance(node, ast.Call):
+        # abs сохраняет размер аргумента, функции math возвращают float
+        if node.func.id == "abs" and len(node.args) == 1:
+            return bounds[id(node.args[0])]._replace(negative=False, non_negative=True)
+        return FLOAT_BOUND
+    if not isinstance(node, ast.BinOp):
+        return FLOAT_BOUND  # Константы pi, e
+
+    left = bounds[id(node.left)]
+    right = bounds[id(node.right)]
+    if not (left.is_int and right.is_int) or isinstance(node.op, ast.Div):
+        return FLOAT_BOUND  # Результат — вещественное число
+
+    if isinstance(node.op, (ast.Add, ast.Sub)):
+        # |a ± b| <= |a| + |b|: длинная сумма небольших чисел остаётся небольшой
+        high, low = max(left.digits, right.digits), min(left.digits, right.digits)
+        digits = high + math.log10(1 + 10 ** (low - high))
+        if isinstance(node.op, ast.Add):
+            negative = left.negative or right.negative
+            non_negative = left.non_negative or right.non_negative
+        else:
+            negative = left.negative or right.non_negative
+            non_negative = left.non_negative or right.negative
+        return Bound(True, digits, negative, non_negative)
+    if isinstance(node.op, (ast.Mult, ast.FloorDiv)):
+        # Знак произведения и частного — по правилу знаков
+        negative = (left.negative and right.non_negative) or (
+            left.non_negative and right.negative
+        )
+        non_negative = (left.non_negative and right.non_negative) or (
+            left.negative and right.negative
+        )
+        if isinstance(node.op, ast.Mult):
+            digits = left.digits + right.digits
+        else:
+            digits = left.digits
+        return Bound(True, digits, negative, non_negative)
+    # Возведение в степень
+    if not right.non_negative:
+        # Целое в отрицательной степени — вещественное число, например 2**-3
+        return FLOAT_BOUND
+    if left.digits == 0:
+        return Bound(True, 0.0, left.negative, True)  # Основание по модулю до 1
+    # Цифр основания, умноженное на показатель степени
+    try:
+        digits = left.digits * 10**right.digits
+    except OverflowError:
+        digits = math.inf
+    return Bound(True, digits, left.negative, True)
+
+
+def evaluation_order(tree: ast.Expression) -> list[ast.expr]:
+    """Узлы дерева в порядке вычисления: операнды слева направо, затем узел.
+
+    Дерево обходится без рекурсии."""
+
+    # Обход "узел, последний операнд, ..., первый операнд" в обратном порядке —
+    # это порядок вычисления
+    order = []
+    stack = [tree.body]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if isinstance(node, ast.BinOp):
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, ast.UnaryOp):
+            stack.append(node.operand)
+        elif isinstance(node, ast.Call):
+            stack.extend(node.args)
+    order.reverse()
+    return order
+
+
+def estimate_cost(tree: ast.Expression) -> FormulaCost:
+    """Оценка стоимости вычисления формулы по её дереву.
+
+    Время оценки линейно по длине формулы."""
+
+    bounds: dict[int, Bound] = {}  # Оценки значений узлов
+    work = 0.0  # Суммарное число цифр целых промежуточных результатов
+    for node in evaluation_order(tree):
+        bound = bounds[id(node)] = estimate_node(node, bounds)
+        if bound.is_int:
+            if bound.digits > Const.COST_MAX_DIGITS:
+                return FormulaCost.INFEASIBLE
+            if bound.digits > Const.COST_SMALL_INT_DIGITS:
+                work += bound.digits
+
+    return (
+        FormulaCost.CHEAP if work <= Const.COST_CHEAP_DIGITS else FormulaCost.BORDERLINE
+    )
+
+
+def constant_key(value: object) -> tuple:
+    """Ключ константы: 1 и 1.0, 0.0 и -0.0 — разные константы"""
+
+    if isinstance(value, float):
+        return float, value.hex()
+    if isinstance(value, complex):
+        return complex, value.real.hex(), value.imag.hex()
+    return type(value), value
+
+
+class LinearCode:
+    """Линейный код формулы: присваивания временным переменным.
+
+    Каждому различному подвыражению присваивается номер значения (value
+    numbering), поэтому одинаковые подвыражения вычисляются один раз.
+    Значение — это константа или временная переменная, в которую его
+    записывает одно из присваиваний."""
+
+    def __init__(self, fold: bool):
+        self.fold = fold  # Вычислять константные подвыражения при компиляции
+        self.numbers: dict[tuple, int] = {}  # Ключ подвыражения -> номер значения
+        self.operands: list[ast.expr] = []  # Номер значения -> Constant или Name
+        self.statements: list[ast.stmt] = []  # Присваивания временным переменным
+
+    def constant(self, value: object) -> int:
+        """Номер значения константы"""
+
+        key = ("constant",) + constant_key(value)
+        number = self.numbers.get(key)
+        if number is None:
+            number = self.numbers[key] = len(self.operands)
+            self.operands.append(ast.Constant(value, **LOCATION))
+        return number
+
+    def name(self, name: str) -> int:
+        """Номер значения имени: константы pi, e или функции без вызова"""
+
+        value = FORMULA_NAMESPACE.get(name)  # У переменной значения нет
+        if self.fold and isinstance(value, float):
+            return self.constant(value)
+        key = ("name", name)
+        number = self.numbers.get(key)
+        if number is None:
+            number = self.numbers[key] = len(self.operands)
+            self.operands.append(ast.Name(name, ast.Load(), **LOCATION))
+        return number
+
+    def fold_operation(self, key: tuple, function, arguments: tuple) -> int | None:
+        """Номер значения уже вычисленной операции или константы-результата.
+
+        None — операцию нужно вычислить. Операция, вызывающая ошибку,
+        не вычисляется при компиляции: ошибка возникнет при вычислении."""
+
+        number = self.numbers.get(key)
+        if number is not None or not self.fold:
+            return number  # Подвыражение уже вычислено
+        values = []
+        for argument in arguments:
+            operand = self.operands[argument]
+            if not isinstance(operand, ast.Constant):
+                return None
+            values.append(operand.value)
+        try:
+            number = self.constant(function(*values))
+        except (ArithmeticError, ValueError, TypeError):
+            return None
+        self.numbers[key] = number
+        return number
+
+    def assign(self, key: tuple, node: ast.expr) -> int:
+        """Номер значения операции, записываемой во временную переменную"""
+
+        temp = f"_{len(self.statements)}"
+        target = ast.Name(temp, ast.Store(), **LOCATION)
+        self.statements.append(ast.Assign([target], node, **LOCATION))
+        number = self.numbers[key] = len(self.operands)
+        self.operands.append(ast.Name(temp, ast.Load(), **LOCATION))
+        return number
+
+    def module(self, result: int) -> ast.Module:
+        """Модуль, записывающий значение result в переменную RESULT_NAME"""
+
+        target = ast.Name(RESULT_NAME, ast.Store(), **LOCATION)
+        statements = self.statements + [
+            ast.Assign([target], self.operands[result], **LOCATION)
+        ]
+        return ast.Module(statements, type_ignores=[])
+
+
+def linearize(tree: ast.Expression, fold: bool) -> ast.Module:
+    """Перевод дерева формулы в линейный код.
+
+    Узлы переводятся в порядке вычисления, поэтому ошибки
+    (например, деление на 0) возникают в том же порядке."""
+
+    code = LinearCode(fold)
+    operands = code.operands
+    numbers: dict[int, int] = {}  # id узла -> номер значения
+    for node in evaluation_order(tree):
+        if isinstance(node, ast.BinOp):
+            left, right = numbers[id(node.left)], numbers[id(node.right)]
+            key = (type(node.op), left, right)
+            number = code.fold_operation(
+                key, BINARY_OPERATIONS[type(node.op)], (left, right)
+            )
+            if number is None:
+                number = code.assign(
+                    key,
+                    ast.BinOp(operands[left], node.op, operands[right], **LOCATION),
+                )
+        elif isinstance(node, ast.Constant):
+            number = code.constant(node.value)
+        elif isinstance(node, ast.Call):
+            # Функции калькулятора не имеют побочных эффектов
+            name = node.func.id
+            arguments = tuple(numbers[id(argument)] for argument in node.args)
+            key = (name, *arguments)
+            function = FORMULA_NAMESPACE.get(name)
+            number = code.fold_operation(key, function, arguments)
+            if number is None:
+                number = code.assign(
+                    key,
+                    ast.Call(
+                        ast.Name(name, ast.Load(), **LOCATION),
+                        [operands[argument] for argument in arguments],
+                        [],
+                        **LOCATION,
+                    ),
+                )
+        elif isinstance(node, ast.UnaryOp):
+            operand = numbers[id(node.operand)]
+            key = (type(node.op), operand)
+            number = code.fold_operation(
+                key, UNARY_OPERATIONS[type(node.op)], (operand,)
+            )
+            if number is None:
+                number = code.assign(
+                    key, ast.UnaryOp(node.op, operands[operand], **LOCATION)
+                )
+        else:
+            number = code.name(node.id)
+        numbers[id(node)] = number
+    return code.module(numbers[id(tree.body)])
+
+
+@lru_cache(maxsize=Const.FORMULA_CACHE_SIZE)
+def compile_formula(formula: str) -> CompiledFormula | None:
+    """Компилирует стандартизованную формулу в байт-код и оценивает её стоимость.
+
+    Возвращает None, если формула синтаксически неверна или содержит
+    недопустимые конструкции. Результат (в том числе None) кэшируется."""
+
+    return compile_expression(formula)
+
+
+def compile_expression(
+    formula: str,
+    names: Collection[str] = Const.FORMULA_VALIDATION_LIST,
+    fold: bool = True,
+) -> CompiledFormula | None:
+    """Компиляция стандартизованной формулы без кэша.
+
+    names — допустимые имена (у табулирования к ним добавляется переменная).
+    fold — вычислять константные подвыражения дешёвых формул при компиляции."""
+
+    tokens = scan_normalized(formula, names)
+    tree = None if tokens is None else parse_tokens(tokens)
+    if tree is None or not is_allowed_tree(tree, names):
+        return None
+
+    # Константы вычисляются при компиляции только у дешёвых формул:
+    # долгие вычисления выполняются в рабочих процессах, а не здесь
+    cost = estimate_cost(tree)
+    try:
+        module = linearize(tree, fold=fold and cost is FormulaCost.CHEAP)
+        code = compile(module, "<formula>", "exec")
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+    return CompiledFormula(code, cost)
+
+
+def run_compiled_formula(code: CodeType, namespace: dict = FORMULA_NAMESPACE) -> object:
+    """Вычисляет скомпилированную формулу. Исключения передаются вызывающему.
+
+    namespace — функции и константы формулы (по умолчанию — из модуля math)."""
+
+    variables: dict[str, object] = {}  # Временные переменные линейного кода
+    exec(code, namespace, variables)
+    return variables[RESULT_NAME]
@@ -4,10 +4,12 @@ from PyQt6.QtGui import QColor, QIntValidator
 from PyQt6.QtWidgets import QApplication
 
 from constants import Const
-from functions import (
-    no_virus,
-    calculate_and_validate_formula,
-    normalize_characters,
+from sweep import (
+    SweepError,
+    evaluate_sweep,
+    format_sweep_rows,
+    is_sweep,
+    parse_sweep,
 )
 
 
@@ -18,22 +20,94 @@ class F:
     def formula_processing(self) -> None:
         """Получение формулы из текстового поля и её обработка"""
 
+        self.calculator_app.live_preview.cancel()  # Предварительный результат не нужен
+        if self.calculator_app.chkWorksheet.isChecked():
+            self.worksheet_processing()  # Пересчёт листа вычислений
+            return
         formula = (
             self.calculator_app.txtFormula.toPlainText()
         )  # Получение текста формулы
-        formula_standard = normalize_characters(formula)  # Стандартизация формулы
-        # Проверка на допустимые символы
-        if no_virus(formula_standard):
-            self.calculator_app.output_result_to_text_field_and_history(
-                formula, calculate_and_validate_formula(formula_standard)
-            )  # Вывод результата
+        if is_sweep(formula):
+            result = self.sweep_processing(formula)  # Табулирование формулы
         else:
-            self.calculator_app.output_result_to_text_field_and_history(
-                formula, Const.ERROR_INVALID_SYMBOL
-            )  # Вывод сообщения об ошибке
+            # Результат из кэша или вычисленный в рабочем процессе
+            result = self.calculator_app.evaluate_formula(formula)
+        # Вывод результата или сообщения об ошибке
+        self.calculator_app.output_result_to_text_field_and_history(formula, result)
 
         self.calculator_app.txtFormula.setFocus()  # Установка фокуса на поле ввода
 
+    def worksheet_processing(self) -> None:
+        """Пересчёт листа вычислений. Результаты выводятся построчно.
+
+        Пересчитываются только изменённые строки и зависящие от них."""
+
+        app = self.calculator_app
+        worksheet = app.worksheet
+        recalculated = worksheet.update(app.txtFormula.toPlainText())
+        app.output_result_to_result_field("\n".join(worksheet.results))
+        app.statusBar().showMessage(
+            Const.WORKSHEET_RECALCULATED_TEXT.format(
+                len(recalculated), len(worksheet.lines)
+            ),
+            Const.WORKSHEET_NOTICE_TIMEOUT_MS,
+        )
+
+    def toggle_worksheet(self, checked: bool) -> None:
+        """Включение и выключение режима листа вычислений.
+
+        В режиме листа текст вставляется из буфера обмена без очистки:
+        в нём нужны переводы строк, имена строк и ссылки."""
+
+        self.calculator_app.txtFormula.plain_paste = checked
+        if checked:
+            self.formula_processing()
+        else:
+            self.preview_formula()
+
+    def sweep_processing(self, formula: str) -> str:
+        """Табулирование формулы. Таблица значений копируется в буфер обмена.
+
+        Границы диапазона вычисляются, как обычные формулы, с ограничением
+        времени. Таблица собирается в окне программы, поэтому число её строк
+        ограничено Const.SWEEP_CLIPBOARD_MAX_POINTS."""
+
+        sandbox = self.calculator_app.sandbox
+        try:
+            sweep = parse_sweep(
+                formula, sandbox.evaluate, Const.SWEEP_CLIPBOARD_MAX_POINTS
+            )
+            arguments, values = evaluate_sweep(sweep)
+        except SweepError as e:
+            return str(e)  # Сообщение об ошибке
+
+        # Колонки разделяются табуляцией, чтобы таблицу можно было вставить в MS EXCEL
+        table = "\n".join(
+            Const.SWEEP_CLIPBOARD_SEPARATOR.join(row)
+            for row in format_sweep_rows(arguments, values)
+        )
+        QApplication.clipboard().setText(table)
+        return Const.SWEEP_RESULT_TEXT.format(len(arguments))
+
+    def preview_formula(self) -> None:
+        """Планирование вычисления формулы по ходу ввода.
+
+        Формула вычисляется, если включён соответствующий режим.
+        Табулирование по ходу ввода не выполняется — оно меняет буфер обмена,
+        лист вычислений пересчитывается по нажатию клавиши "Ввод"."""
+
+        formula = self.calculator_app.txtFormula.toPlainText()
+        live_preview = self.calculator_app.live_preview
+        if (
+            self.calculator_app.chkLivePreview.isChecked()
+            and not self.calculator_app.chkWorksheet.isChecked()
+            and formula.strip()
+            and not is_sweep(formula)
+        ):
+            live_preview.schedule(formula)
+        else:
+            live_preview.cancel()
+
     def handle_key_press(self, event: QtGui.QKeyEvent) -> None:
         """Обработка нажатий клавиш, включая Enter, Esc"""
 
@@ -50,6 +124,15 @@ class F:
 
         keys = (Qt.Key.Key_Return, Qt.Key.Key_Enter, Qt.Key.Key_Equal)
 
+        # В листе вычислений "Ввод" начинает новую строку и пересчитывает лист,
+        # а "=" отделяет имя строки от формулы
+        if self.calculator_app.chkWorksheet.isChecked():
+            if event.key() not in keys[:2]:
+                return False
+            QtWidgets.QTextEdit.keyPressEvent(self.calculator_app.txtFormula, event)
+            self.worksheet_processing()
+            return True
+
         # Проверяем нажата ли клавиша "Ввод" и, если нажата, производим расчёт
         if event.key() in keys:
             self.formula_processing()  # Вычисление формулы при нажатии клавиши "Ввод"
@@ -0,0 +1,97 @@
+"""Архив старых записей истории вычислений.
+
+История в базе (historystore) ограничивается политикой хранения: числом
+записей, размером базы и возрастом записей. Более старые записи
+переносятся в архив — каталог сжатых gzip файлов (сегментов). Сегменты
+не загружаются при запуске программы, поэтому время запуска не зависит
+от длины всей истории, а в архиве записи по запросу ищутся и выгружаются.
+
+Сегмент — csv файл прежнего формата (utf-8-sig, разделитель ';', строка
+заголовков, записи от новой к старой), сжатый gzip: распакованный сегмент
+открывается в MS EXCEL. Сегменты нумеруются по порядку создания, поэтому
+более новые записи находятся в сегментах с большими номерами."""
+
+import csv
+import gzip
+import os
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from constants import Const
+from historyindex import search_text
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Политика хранения истории в базе. None — без ограничения"""
+
+    max_entries: int | None = Const.HISTORY_RETAIN_ENTRIES  # Число записей
+    max_bytes: int | None = Const.HISTORY_RETAIN_BYTES  # Размер базы, байт
+    max_age_days: float | None = Const.HISTORY_RETAIN_DAYS  # Возраст, дней
+
+
+class HistoryArchive:
+    """Каталог сжатых сегментов истории"""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def segments(self) -> list[Path]:
+        """Сегменты, начиная с самого нового"""
+
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            self.directory.glob(f"*{Const.HISTORY_ARCHIVE_SUFFIX}"), reverse=True
+        )
+
+    def write_segment(self, rows: Iterable[tuple[str, str]]) -> Path:
+        """Атомарная запись нового сегмента. rows — от новой записи к старой"""
+
+        segments = self.segments()
+        number = int(segments[0].name.split(".")[0]) + 1 if segments else 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{number:08d}{Const.HISTORY_ARCHIVE_SUFFIX}"
+        temp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(temp_path, mode="wt", newline="", encoding="utf-8-sig") as file:
+            writer = csv.writer(file, delimiter=Const.EXCEL_LIST_SEPARATOR)
+            writer.writerow(Const.CSV_HEADERS)
+            writer.writerows(rows)
+        os.replace(temp_path, path)  # Атомарная замена файла
+        return path
+
+    @staticmethod
+    def read_segment(path: Path) -> Iterator[tuple[str, str]]:
+        """Записи сегмента (формула, результат), начиная с самой новой.
+
+        Испорченный сегмент вызывает OSError, как и ошибка чтения файла."""
+
+        with gzip.open(path, mode="rt", newline="", encoding="utf-8-sig") as file:
+            reader = csv.reader(file, delimiter=Const.EXCEL_LIST_SEPARATOR)
+            try:
+                next(reader, None)  # Строка заголовков
+                for formula, result in reader:
+                    yield formula, result
+            except (EOFError, ValueError, csv.Error) as e:
+                raise OSError(f"{path}: {e}") from e
+
+    def rows(self) -> Iterator[tuple[str, str]]:
+        """Все записи архива, начиная с самой новой"""
+
+        for path in self.segments():
+            yield from self.read_segment(path)
+
+    def search(self, query: str) -> Iterator[tuple[str, str]]:
+        """Записи архива, содержащие строку поиска (без учёта регистра букв)"""
+
+        query = query.lower()
+        for formula, result in self.rows():
+            if query in search_text(formula, result):
+                yield formula, result
+
+    def clear(self) -> None:
+        """Удаление всех сегментов"""
+
+        for path in self.segments():
+            path.unlink()
@@ -0,0 +1,98 @@
+"""Индекс поиска по истории вычислений.
+
+Для каждой записи истории (формула и результат) запоминаются все её
+триграммы — подстроки из трёх символов. Для каждой триграммы хранится
+список номеров записей, в которых она встречается (инвертированный индекс).
+Запись, содержащая строку поиска, содержит и все её триграммы, поэтому
+проверять нужно только записи из самого короткого из этих списков.
+
+Поиск не зависит от регистра букв. Строки поиска короче трёх символов
+проверяются по всем записям: такие строки обычно встречаются часто,
+и первые совпадения находятся быстро.
+
+Записи добавляются одним потоком, а искать можно одновременно из другого:
+текст записи добавляется раньше её номера в списки триграмм."""
+
+from array import array
+from collections.abc import Iterable, Iterator
+
+GRAM = 3  # Длина индексируемой подстроки
+SEPARATOR = "\0"  # Разделитель формулы и результата: не встречается в них
+
+
+def search_text(formula: str, result: str) -> str:
+    """Текст записи истории, по которому выполняется поиск"""
+
+    return f"{formula}{SEPARATOR}{result}".lower()
+
+
+def grams(text: str) -> set[str]:
+    """Все различные триграммы текста"""
+
+    return {text[i : i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class TrigramIndex:
+    """Триграммный индекс записей истории. Номер записи — порядок добавления"""
+
+    def __init__(self):
+        self._texts: list[str] = []  # Тексты записей для окончательной проверки
+        self._postings: dict[str, array] = {}  # Триграмма -> номера записей
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, formula: str, result: str) -> None:
+        """Добавление записи"""
+
+        number = len(self._texts)
+        text = search_text(formula, result)
+        self._texts.append(text)
+        postings = self._postings
+        for gram in grams(text):
+            numbers = postings.get(gram)
+            if numbers is None:
+                postings[gram] = array("i", (number,))
+            else:
+                numbers.append(number)
+
+    def extend(self, rows: Iterable[tuple[str, str]]) -> None:
+        """Добавление записей (формула, результат)"""
+
+        for formula, result in rows:
+            self.add(formula, result)
+
+    def clear(self) -> None:
+        """Удаление всех записей"""
+
+        self._texts = []
+        self._postings = {}
+
+    def contains(self, number: int, query: str) -> bool:
+        """Содержит ли запись строку поиска (query — в нижнем регистре)"""
+
+        return query in self._texts[number]
+
+    def search(self, query: str, newest_first: bool = False) -> Iterator[int]:
+        """Номера записей, содержащих строку поиска, по мере их нахождения.
+
+        Номера выдаются по возрастанию, а при newest_first — по убыванию."""
+
+        query = query.lower()
+        texts = self._texts
+        if len(query) < GRAM:
+            candidates: Iterable[int] = range(len(texts))
+        else:
+            shortest = None
+            for gram in grams(query):
+                numbers = self._postings.get(gram)
+                if numbers is None:
+                    return  # Триграммы нет ни в одной записи
+                if shortest is None or len(numbers) < len(shortest):
+                    shortest = numbers
+            candidates = shortest
+        if newest_first:
+            candidates = reversed(candidates)
+        for number in candidates:
+            if query in texts[number]:
+                yield number
@@ -0,0 +1,53 @@
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from constants import Const
+from historyindex import TrigramIndex
+from historystore import HistoryStore
+
+
+class HistoryLoader(QThread):
+    """Фоновая загрузка истории вычислений прошлых сеансов из базы.
+
+    Записи передаются страницами, начиная с самых новых, поэтому окно программы
+    появляется сразу, а история заполняется по мере чтения базы.
+
+    Переданная страница добавляется в индекс поиска здесь же, в потоке загрузки,
+    чтобы построение индекса не задерживало окно программы."""
+
+    chunk_loaded = pyqtSignal(list)  # Очередной блок пар (формула, результат)
+    progress = pyqtSignal(int)  # Процент прочитанной части истории
+    failed = pyqtSignal(str)  # Текст ошибки чтения истории
+
+    def __init__(self, store: HistoryStore, index: TrigramIndex, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.index = index  # Индекс поиска по загружаемым записям
+        self.cancelled = False  # Загрузка прервана — блоки больше не нужны
+
+    def cancel(self) -> None:
+        """Прерывание загрузки с ожиданием завершения потока"""
+
+        self.cancelled = True
+        self.wait()
+
+    def run(self) -> None:
+        """Чтение истории страницами"""
+
+        store = self.store
+        store.ready.wait()  # База открыта, история прежних версий перенесена
+        for error in (store.import_error, store.error):
+            if error is not None:
+                self.failed.emit(str(error))
+        total = store.loaded_count or 1
+        loaded = 0
+        try:
+            # Записи текущего сеанса уже есть в таблице
+            for chunk in store.pages(store.loaded_until, Const.HISTORY_LOAD_CHUNK):
+                if self.cancelled:
+                    return
+                self.chunk_loaded.emit(chunk)
+                loaded += len(chunk)
+                self.progress.emit(loaded * 100 // total)
+                self.index.extend(chunk)
+        except Exception as e:
+            self.failed.emit(str(e))
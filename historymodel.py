@@ -0,0 +1,188 @@
+from collections.abc import Iterable, Iterator
+from itertools import chain, islice
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from constants import Const
+from historyindex import TrigramIndex, search_text
+
+
+class HistoryModel(QAbstractTableModel):
+    """Модель таблицы истории вычислений.
+
+    Записи хранятся в двух списках, как в деке: новые записи добавляются
+    в конец списка newer, а старые (загруженные из файла) — в конец списка older.
+    Добавление с обеих сторон и доступ к строке по номеру выполняются за O(1).
+    Строка 0 — самая новая запись.
+
+    При поиске таблица показывает только записи, содержащие строку поиска.
+    Записи ищутся по триграммным индексам и подгружаются страницами по мере
+    прокрутки таблицы (canFetchMore/fetchMore), поэтому время поиска
+    не зависит от числа найденных записей. Записи в найденном хранятся
+    ключами: k >= 0 — запись older[k], k < 0 — запись newer[-k - 1];
+    ключи не меняются при добавлении записей в начало таблицы."""
+
+    COLUMN_BUTTON = 0  # Колонка с кнопкой копирования формулы
+    COLUMN_FORMULA = 1  # Колонка с формулой
+    COLUMN_RESULT = 2  # Колонка с результатом
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._newer: list[tuple[str, str]] = []  # Новые записи, от старых к новым
+        self._older: list[tuple[str, str]] = []  # Старые записи, от новых к старым
+        self.newer_index = TrigramIndex()  # Индекс поиска по новым записям
+        # Индекс поиска по старым записям. Записи загруженной истории в него
+        # добавляет поток загрузки
+        self.older_index = TrigramIndex()
+        self._query = ""  # Строка поиска в нижнем регистре ("" — поиска нет)
+        self._found: list[int] = []  # Ключи показываемых найденных записей
+        self._matches: Iterator[int] | None = None  # Ещё не показанные найденные
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        if self._query:
+            return len(self._found)
+        return len(self._newer) + len(self._older)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else 3
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        # Элементы таблицы нельзя редактировать
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == self.COLUMN_BUTTON:
+                return Const.BUTTON_TEXT_COPY_LINE
+            return self.entry(index.row())[column - 1]
+
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if column == self.COLUMN_BUTTON:
+                return Qt.AlignmentFlag.AlignCenter
+            if column == self.COLUMN_RESULT:  # Результат выравнивается вправо
+                return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+            return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+        return None
+
+    def entry(self, row: int) -> tuple[str, str]:
+        """Пара (формула, результат) строки таблицы"""
+
+        if self._query:
+            key = self._found[row]
+            return self._older[key] if key >= 0 else self._newer[-key - 1]
+        newer_count = len(self._newer)
+        if row < newer_count:
+            return self._newer[newer_count - 1 - row]
+        return self._older[row - newer_count]
+
+    def prepend(self, formula: str, result: str) -> None:
+        """Добавляет новую запись в начало таблицы"""
+
+        self.newer_index.add(formula, result)
+        if self._query:
+            if self._query in search_text(formula, result):
+                self.beginInsertRows(QModelIndex(), 0, 0)
+                self._newer.append((formula, result))
+                self._found.insert(0, -len(self._newer))
+                self.endInsertRows()
+            else:
+                self._newer.append((formula, result))
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._newer.append((formula, result))
+        self.endInsertRows()
+
+    def extend_older(
+        self, rows: Iterable[tuple[str, str]], indexed: bool = False
+    ) -> None:
+        """Добавляет более старые записи в конец таблицы.
+
+        indexed — записи уже добавлены в индекс поиска (потоком загрузки).
+        При поиске новые записи появляются в таблице после обновления поиска."""
+
+        rows = list(rows)
+        if not indexed:
+            self.older_index.extend(rows)
+        if not rows:
+            return
+        if self._query:
+            self._older.extend(rows)
+            return
+        first = self.rowCount()
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._older.extend(rows)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        """Удаляет все записи"""
+
+        self.beginResetModel()
+        self._newer.clear()
+        self._older.clear()
+        self.newer_index.clear()
+        self.older_index.clear()
+        self._found = []
+        self._matches = None
+        self.endResetModel()
+
+    def search(self, query: str) -> None:
+        """Показ только записей, содержащих строку поиска ("" — всех записей)"""
+
+        self.beginResetModel()
+        self._query = query.lower()
+        self._found = []
+        self._matches = None
+        if self._query:
+            self._matches = self._search_keys()
+            self._found = self._next_page()
+        self.endResetModel()
+
+    def refresh_search(self) -> None:
+        """Повторный поиск — после загрузки новых записей истории"""
+
+        if self._query:
+            self.search(self._query)
+
+    def _search_keys(self) -> Iterator[int]:
+        """Ключи найденных записей, начиная с самой новой"""
+
+        newer = (
+            -number - 1
+            for number in self.newer_index.search(self._query, newest_first=True)
+        )
+        # Индекс может опережать таблицу: поток загрузки уже добавил записи
+        # в индекс, а таблица их ещё не получила
+        older = (
+            number
+            for number in self.older_index.search(self._query)
+            if number < len(self._older)
+        )
+        return chain(newer, older)
+
+    def _next_page(self) -> list[int]:
+        """Очередная страница ключей найденных записей"""
+
+        page = list(islice(self._matches, Const.HISTORY_SEARCH_PAGE))
+        if len(page) < Const.HISTORY_SEARCH_PAGE:
+            self._matches = None  # Найдены все записи
+        return page
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._matches is not None
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if not self.canFetchMore(parent):
+            return
+        page = self._next_page()
+        if page:
+            first = len(self._found)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self._found.extend(page)
+            self.endInsertRows()
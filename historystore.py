@@ -0,0 +1,432 @@
+"""Хранилище истории вычислений в базе данных SQLite.
+
+Каждая запись истории — формула, результат и время вычисления. Записи
+добавляются фоновым потоком небольшими пакетами, по одной транзакции
+на пакет, поэтому ни сохранение записи, ни выход из программы не зависят
+от длины истории. База работает в режиме WAL: история читается
+из других потоков (загрузка истории, выгрузка в csv файл) одновременно
+с записью. Индекс по формуле ускоряет поиск вычислений формулы,
+индекс по времени — выборку записей за период.
+
+История читается страницами от новых записей к старым: страница
+выбирается по номеру последней записи предыдущей страницы (а не по
+смещению), поэтому время чтения страницы не зависит от её места в истории.
+
+Для пользователей MS EXCEL история по запросу выгружается в csv файл
+прежнего формата. При создании базы в неё переносится история из
+csv файла прежних версий программы; пока его не удаётся прочитать,
+перенос повторяется при каждом открытии базы.
+
+При открытии базы записи, не входящие в политику хранения (число записей,
+размер базы, возраст), переносятся в архив сжатых сегментов
+(historyarchive), поэтому загружаемая при запуске история ограничена.
+Поиск и выгрузка истории по запросу читают и архив."""
+
+import csv
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future
+from pathlib import Path
+
+from constants import Const
+from historyarchive import HistoryArchive, RetentionPolicy
+from historyindex import search_text
+from legacyhistory import LegacyHistory
+
+SCHEMA_VERSION = 1  # Версия структуры базы (PRAGMA user_version)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    formula TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_formula ON history (formula);
+CREATE INDEX IF NOT EXISTS history_created ON history (created);
+"""
+
+# Команды фоновому потоку записи
+_APPEND = "append"  # Добавить запись
+_CLEAR = "clear"  # Удалить всю историю
+_EXPORT = "export"  # Выгрузить историю в csv файл
+_STOP = "stop"  # Завершить работу потока
+
+
+class HistoryStore:
+    """История вычислений в базе SQLite с фоновой записью"""
+
+    def __init__(
+        self,
+        path: str | Path = Const.HISTORY_DB_FILE_NAME,
+        legacy: LegacyHistory | None = None,
+        retention: RetentionPolicy | None = None,
+    ):
+        self.path = Path(path)  # Файл базы данных
+        self.archive = HistoryArchive(
+            self.path.with_name(self.path.stem + Const.HISTORY_ARCHIVE_DIR_SUFFIX)
+        )
+        self.retention = retention  # Политика хранения (None — без архивации)
+        # История прежних версий программы для переноса в новую базу
+        self.legacy = LegacyHistory() if legacy is None else legacy
+        self.error: Exception | None = None  # Последняя ошибка записи
+        self.import_error: Exception | None = None  # Ошибка чтения прежней истории
+        self.ready = threading.Event()  # База открыта, история перенесена
+        self.loaded_until = 0  # Номер последней записи прошлых сеансов
+        self.loaded_count = 0  # Число записей прошлых сеансов
+        self.archived = 0  # Число записей, перенесённых в архив при открытии
+        self._connection: sqlite3.Connection | None = None  # Соединение записи
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Новое соединение с базой. Соединение используется одним потоком"""
+
+        connection = sqlite3.connect(self.path, timeout=Const.HISTORY_DB_TIMEOUT_S)
+        connection.execute("PRAGMA synchronous = NORMAL")  # Достаточно для WAL
+        return connection
+
+    def open(self) -> None:
+        """Открытие базы: создание таблиц, перенос истории прежних версий
+        и перенос в архив записей, не входящих в политику хранения.
+
+        Запоминает номер последней записи — записи прошлых сеансов."""
+
+        try:
+            connection = self.connect()
+            connection.execute("PRAGMA journal_mode = WAL")
+            # Таблицы и индексы, которых нет в базе прежней версии программы
+            connection.executescript(SCHEMA)
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version < SCHEMA_VERSION:
+                rows = self.read_legacy()
+                # Записи и отметка о переносе — одной транзакцией. Нечитаемая
+                # история не отмечается перенесённой и не теряется: перенос
+                # повторяется при следующем открытии базы
+                with connection:
+                    self.add_older_rows(connection, rows)
+                    if self.import_error is None:
+                        connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            if self.retention is not None:
+                try:
+                    self.archived = self.retain(connection, self.retention)
+                except OSError as e:
+                    self.error = e  # Без архивации история работает, но растёт
+            # Записи удаляются только вместе со всеми более старыми, поэтому
+            # номера записей идут подряд и COUNT(*) (чтение всей таблицы) не нужен.
+            # MIN и MAX в отдельных запросах берутся из концов таблицы
+            first, last = connection.execute(
+                "SELECT (SELECT MIN(id) FROM history), (SELECT MAX(id) FROM history)"
+            ).fetchone()
+            self.loaded_until = last or 0
+            self.loaded_count = 0 if last is None else last - first + 1
+            self._connection = connection
+        finally:
+            self.ready.set()  # При ошибке загрузка истории сообщит о ней
+
+    def read_legacy(self) -> list[tuple[str, str]]:
+        """История прежних версий программы, начиная с самой новой записи.
+
+        Испорченная история не переносится, ошибка запоминается в import_error."""
+
+        try:
+            return list(self.legacy.read_history())
+        except (OSError, ValueError, IndexError, csv.Error) as e:
+            self.import_error = e
+            return []
+
+    def retain(
+        self,
+        connection: sqlite3.Connection,
+        policy: RetentionPolicy,
+        now: float | None = None,
+    ) -> int:
+        """Перенос в архив самых старых записей, не входящих в политику хранения.
+
+        Записи переносятся сегментами, не меньше HISTORY_ARCHIVE_MIN_ROWS
+        записей за раз. Сегмент записывается до подтверждения удаления его
+        записей из базы: при сбое записи могут остаться и в базе, и в архиве,
+        но не теряются. Возвращает число перенесённых записей."""
+
+        cutoff = self.retention_cutoff(connection, policy, now)
+        first = connection.execute("SELECT MIN(id) FROM history").fetchone()[0]
+        if first is None or cutoff - first + 1 < Const.HISTORY_ARCHIVE_MIN_ROWS:
+            # Мелкие сегменты не создаются: лишние записи ждут следующего раза
+            return 0
+        count = 0
+        while first <= cutoff:
+            last = min(cutoff, first + Const.HISTORY_ARCHIVE_SEGMENT - 1)
+            rows = connection.execute(
+                "SELECT formula, result FROM history"
+                " WHERE id BETWEEN ? AND ? ORDER BY id DESC",
+                (first, last),
+            ).fetchall()
+            with connection:  # При ошибке записи сегмента удаление отменяется
+                connection.execute("DELETE FROM history WHERE id <= ?", (last,))
+                self.archive.write_segment(rows)
+            count += len(rows)
+            first = last + 1
+        return count
+
+    @staticmethod
+    def retention_cutoff(
+        connection: sqlite3.Connection,
+        policy: RetentionPolicy,
+        now: float | None = None,
+    ) -> int:
+        """Номер самой новой записи, не входящей в политику хранения (0 — нет).
+
+        Все проверки выполняются по индексам, без чтения записей истории."""
+
+        first, last = connection.execute(
+            "SELECT (SELECT MIN(id) FROM history), (SELECT MAX(id) FROM history)"
+        ).fetchone()
+        if last is None:
+            return 0
+        cutoffs = [0]
+        if policy.max_entries is not None:
+            cutoffs.append(last - policy.max_entries)
+        if policy.max_age_days is not None:
+            now = time.time() if now is None else now
+            oldest = now - policy.max_age_days * 24 * 60 * 60
+            row = connection.execute(
+                "SELECT id FROM history WHERE created < ?"
+                " ORDER BY created DESC LIMIT 1",
+                (oldest,),
+            ).fetchone()
+            cutoffs.append(0 if row is None else row[0])
+        if policy.max_bytes is not None:
+            # Размер занятых страниц базы; в базе остаётся доля самых новых
+            # записей, равная доле допустимого размера
+            pages = connection.execute("PRAGMA page_count").fetchone()[0]
+            pages -= connection.execute("PRAGMA freelist_count").fetchone()[0]
+            size = pages * connection.execute("PRAGMA page_size").fetchone()[0]
+            if size > policy.max_bytes:
+                keep = (last - first + 1) * policy.max_bytes // size
+                cutoffs.append(last - keep)
+        return max(cutoffs)
+
+    @staticmethod
+    def add_rows(
+        connection: sqlite3.Connection,
+        rows: list[tuple[str, str]],
+        created: float | None = None,
+    ) -> None:
+        """Добавление записей одной транзакцией. rows — от новой к старой"""
+
+        created = time.time() if created is None else created
+        with connection:
+            connection.executemany(
+                "INSERT INTO history (formula, result, created) VALUES (?, ?, ?)",
+                ((formula, result, created) for formula, result in reversed(rows)),
+            )
+
+    @staticmethod
+    def add_older_rows(
+        connection: sqlite3.Connection, rows: list[tuple[str, str]]
+    ) -> None:
+        """Добавление записей старше всех записей истории. rows — от новой к старой.
+
+        Номера записей продолжаются вниз от самой старой записи (и могут быть
+        отрицательными), поэтому номера по-прежнему идут подряд. Время записей
+        равно времени самой старой записи. Транзакцией управляет вызывающий."""
+
+        first = connection.execute("SELECT MIN(id) FROM history").fetchone()[0]
+        if first is None:
+            first, created = len(rows) + 1, time.time()
+        else:
+            created = connection.execute(
+                "SELECT created FROM history WHERE id = ?", (first,)
+            ).fetchone()[0]
+        connection.executemany(
+            "INSERT INTO history (id, formula, result, created) VALUES (?, ?, ?, ?)",
+            (
+                (first - number, formula, result, created)
+                for number, (formula, result) in enumerate(rows, start=1)
+            ),
+        )
+
+    def start(self) -> None:
+        """Запуск фонового потока записи. База открывается в этом потоке"""
+
+        self._thread = threading.Thread(
+            target=self._run, name="HistoryStore", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, formula: str, result: str) -> None:
+        """Добавляет запись в историю (запись выполняется в фоне)"""
+
+        self._queue.put((_APPEND, (formula, result, time.time())))
+
+    def clear(self) -> None:
+        """Удаляет всю историю, включая архив"""
+
+        self._queue.put((_CLEAR, None))
+
+    def export_csv(self, path: str | Path, archived: bool = True) -> int:
+        """Выгрузка истории в csv файл для MS EXCEL, начиная с самой новой записи.
+
+        Выгружаются и записи, ожидающие записи в базу, а при archived — и архив.
+        Возвращает число записей."""
+
+        if self._thread is None:
+            return self._export(path, archived)
+        future: Future = Future()
+        self._queue.put((_EXPORT, (path, archived, future)))
+        return future.result()
+
+    def close(self) -> Exception | None:
+        """Записывает оставшиеся записи и завершает поток.
+
+        Возвращает последнюю ошибку записи или None."""
+
+        if self._thread is not None:
+            self._queue.put((_STOP, None))
+            self._thread.join()
+            self._thread = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        return self.error
+
+    def pages(
+        self, until: int | None = None, size: int = Const.HISTORY_LOAD_CHUNK
+    ) -> Iterator[list[tuple[str, str]]]:
+        """Выдаёт страницы пар (формула, результат), начиная с самой новой.
+
+        until — номер самой новой выдаваемой записи (None — все записи)."""
+
+        connection = self.connect()
+        try:
+            if until is None:
+                until = connection.execute("SELECT MAX(id) FROM history").fetchone()[0]
+            before = (until or 0) + 1
+            while True:
+                page = connection.execute(
+                    "SELECT id, formula, result FROM history"
+                    " WHERE id < ? ORDER BY id DESC LIMIT ?",
+                    (before, size),
+                ).fetchall()
+                if not page:
+                    return
+                before = page[-1][0]
+                yield [(formula, result) for _, formula, result in page]
+        finally:
+            connection.close()
+
+    def search(self, query: str, archived: bool = True) -> Iterator[tuple[str, str]]:
+        """Записи (формула, результат), содержащие строку поиска, от новых к старым.
+
+        Регистр букв не учитывается. При archived поиск продолжается в архиве."""
+
+        query = query.lower()
+        for page in self.pages(size=Const.HISTORY_EXPORT_PAGE):
+            for formula, result in page:
+                if query in search_text(formula, result):
+                    yield formula, result
+        if archived:
+            yield from self.archive.search(query)
+
+    def find_formula(
+        self, formula: str, archived: bool = True
+    ) -> Iterator[tuple[str, str]]:
+        """Вычисления формулы (формула, результат) от новых к старым.
+
+        Формула сравнивается целиком, с учётом регистра букв. Записи базы
+        выбираются по индексу формул, без чтения всей истории. При archived
+        поиск продолжается в архиве."""
+
+        connection = self.connect()
+        try:
+            yield from connection.execute(
+                "SELECT formula, result FROM history"
+                " WHERE formula = ? ORDER BY id DESC",
+                (formula,),
+            )
+        finally:
+            connection.close()
+        if archived:
+            for row in self.archive.rows():
+                if row[0] == formula:
+                    yield row
+
+    def _run(self) -> None:
+        """Цикл фонового потока записи"""
+
+        try:
+            self.open()
+        except (OSError, sqlite3.Error) as e:
+            self.error = e  # Запись невозможна — команды только выбираются
+        while True:
+            command, payload = self._queue.get()
+            if command == _STOP:
+                break
+            if self._connection is None:
+                if command == _EXPORT:
+                    payload[-1].set_exception(self.error)
+                continue
+            try:
+                if command == _APPEND:
+                    self._write_batch(payload)
+                elif command == _CLEAR:
+                    self.archive.clear()  # При ошибке база не очищается
+                    with self._connection:
+                        self._connection.execute("DELETE FROM history")
+                        # Очищенная история прежних версий больше не переносится
+                        self._connection.execute(
+                            f"PRAGMA user_version = {SCHEMA_VERSION}"
+                        )
+                elif command == _EXPORT:
+                    path, archived, future = payload
+                    try:
+                        future.set_result(self._export(path, archived))
+                    except (OSError, sqlite3.Error) as e:
+                        future.set_exception(e)
+            except (OSError, sqlite3.Error) as e:
+                self.error = e
+        if self._connection is not None:
+            self._connection.close()  # Соединение закрывается создавшим его потоком
+            self._connection = None
+
+    def _write_batch(self, first: tuple[str, str, float]) -> None:
+        """Добавляет запись и все уже ожидающие записи одной транзакцией"""
+
+        batch = [first]
+        while len(batch) < Const.HISTORY_WRITE_BATCH:
+            try:
+                command, payload = self._queue.queue[0]
+            except IndexError:
+                break
+            if command != _APPEND:
+                break  # Порядок команд сохраняется
+            batch.append(self._queue.get_nowait()[1])
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO history (formula, result, created) VALUES (?, ?, ?)",
+                batch,
+            )
+
+    def _export(self, path: str | Path, archived: bool) -> int:
+        """Атомарная запись истории в csv файл. Возвращает число записей"""
+
+        path = Path(path)
+        temp_path = path.with_name(path.name + ".tmp")
+        count = 0
+        with open(temp_path, mode="w", newline="", encoding="utf-8-sig") as file:
+            writer = csv.writer(file, delimiter=Const.EXCEL_LIST_SEPARATOR)
+            writer.writerow(Const.CSV_HEADERS)
+            for page in self.pages(size=Const.HISTORY_EXPORT_PAGE):
+                writer.writerows(page)
+                count += len(page)
+            if archived:  # Записи архива старше записей базы
+                for segment in self.archive.segments():
+                    rows = list(self.archive.read_segment(segment))
+                    writer.writerows(rows)
+                    count += len(rows)
+        os.replace(temp_path, path)  # Атомарная замена файла
+        return count
@@ -0,0 +1,32 @@
+"""Чтение истории вычислений прежних версий программы.
+
+Прежние версии хранили историю в csv файле для MS EXCEL. Теперь история
+хранится в базе (historystore), а csv файл только читается один раз —
+при переносе истории в новую базу."""
+
+import csv
+from collections.abc import Iterator
+from pathlib import Path
+
+from constants import Const
+
+
+class LegacyHistory:
+    """История вычислений прежних версий — csv файл"""
+
+    def __init__(self, history_path: str | Path = Const.HISTORY_FILE_NAME):
+        self.history_path = Path(history_path)  # csv файл для MS EXCEL
+
+    def read_history(self) -> Iterator[tuple[str, str]]:
+        """Выдаёт пары (формула, результат) csv файла, начиная с самой новой"""
+
+        try:
+            # Файл может начинаться с BOM, который пишет MS EXCEL
+            file = open(self.history_path, mode="r", encoding="utf-8-sig", newline="")
+        except FileNotFoundError:
+            return  # отсутствие файла не ошибка — начинаем историю с чистого листа
+        with file:
+            reader = csv.reader(file, delimiter=Const.EXCEL_LIST_SEPARATOR)
+            next(reader, None)  # Пропускаем шапку файла
+            for row_data in reader:
+                yield row_data[0], row_data[1]
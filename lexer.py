@@ -0,0 +1,172 @@
+"""Лексический анализ формулы.
+
+Формула стандартизуется (замена символов-синонимов), проверяется
+на допустимые символы и имена функций и разбивается на лексемы.
+Таблица замены и регулярные выражения строятся один раз при загрузке модуля.
+Регулярные выражения не содержат вложенных повторений, поэтому
+время разбора не зависит от содержимого формулы — только от её длины.
+
+Проверка (validate_formula) не создаёт лексем: весь текст проверяется
+одним сравнением с классом допустимых символов, а слова из букв — по
+множеству допустимых имён. Лексемы (scan_formula) нужны только
+для разбора формулы и строятся при её компиляции."""
+
+import re
+from collections.abc import Collection
+from functools import lru_cache
+from typing import NamedTuple
+
+from constants import Const
+
+# Таблица замены нестандартных символов на стандартные
+TRANSLATION_TABLE = str.maketrans(Const.REPLACEMENT_DICTIONARY)
+
+# Виды лексем
+NUMBER = "number"  # Число
+NAME = "name"  # Имя функции или константы
+OPERATOR = "operator"  # Знак арифметического действия
+PAREN = "paren"  # Скобка
+DOT = "dot"  # Точка вне числа — допустимый символ, но ошибка синтаксиса
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<number>[0-9]+(?:\.[0-9]*)?|\.[0-9]+)
+    |(?P<name>[a-z][a-z0-9]*)
+    |(?P<operator>\*\*|//|[-+*/])
+    |(?P<paren>[()])
+    |(?P<dot>\.)
+    """,
+    re.VERBOSE,
+)
+
+# Допустимые символы: символы лексем и буквы имён
+VALID_TEXT_PATTERN = re.compile(f"[{re.escape(Const.VALID_CHAR_SET)}a-z]*")
+# Символы, разделяющие слова из букв и цифр, заменяются пробелами.
+# Проверенный текст состоит из символов ASCII, а замена байтов быстрее замены
+# символов строки
+WORD_SEPARATORS = bytes.maketrans(b".+-*/()", b" " * 7)
+NAME_BYTES = frozenset(name.encode() for name in Const.FORMULA_VALIDATION_LIST)
+
+NAME_MAX_LENGTH = max(map(len, Const.FORMULA_VALIDATION_LIST))
+
+
+class Token(NamedTuple):
+    """Лексема формулы"""
+
+    kind: str  # Вид лексемы
+    text: str  # Текст лексемы
+
+
+class ScannedFormula(NamedTuple):
+    """Стандартизованная формула и её лексемы"""
+
+    text: str
+    tokens: tuple[Token, ...]
+
+
+def split_names(
+    word: str, names: Collection[str] = Const.FORMULA_VALIDATION_LIST
+) -> list[Token] | None:
+    """Разбивает слово из букв и цифр на допустимые имена (names) и числа.
+
+    Имена могут стоять подряд (например, 'pie' — это 'pi' и 'e', а 'e2' —
+    это 'e' и '2'): такая формула синтаксически неверна, но символы в ней
+    допустимы. Возвращает None, если разбиение невозможно.
+    Время — O(длина * длина самого длинного имени)."""
+
+    # previous[i] — начало последней части в разбиении word[:i]
+    previous: list[int | None] = [None] * (len(word) + 1)
+    previous[0] = 0
+    longest = max(map(len, names), default=0)  # Длина самого длинного имени
+    for end in range(1, len(word) + 1):
+        if previous[end - 1] is not None and word[end - 1].isdigit():
+            previous[end] = end - 1  # Цифра — допустимый символ
+            continue
+        for start in range(max(0, end - longest), end):
+            if previous[start] is not None and word[start:end] in names:
+                previous[end] = start
+                break
+    if previous[-1] is None:
+        return None
+
+    tokens: list[Token] = []
+    end = len(word)
+    while end:
+        start = previous[end]
+        part = word[start:end]
+        if part.isdigit():
+            # Цифры подряд объединяются в одно число
+            if tokens and tokens[-1].kind == NUMBER:
+                part += tokens.pop().text
+            tokens.append(Token(NUMBER, part))
+        else:
+            tokens.append(Token(NAME, part))
+        end = start
+    tokens.reverse()
+    return tokens
+
+
+@lru_cache(maxsize=Const.FORMULA_CACHE_SIZE)
+def is_name_sequence(word: bytes) -> bool:
+    """Слово из букв и цифр разбивается на допустимые имена и числа"""
+
+    return split_names(word.decode()) is not None
+
+
+def is_valid_normalized(text: str) -> bool:
+    """Проверка стандартизованной формулы: только допустимые символы и имена.
+
+    Лексемы не создаются; разбиение слова на имена (split_names) выполняется
+    только для слов, которые не являются ни именем, ни числом."""
+
+    if VALID_TEXT_PATTERN.fullmatch(text) is None:
+        return False
+    for word in text.encode("ascii").translate(WORD_SEPARATORS).split():
+        if word not in NAME_BYTES and not word.isdigit() and not is_name_sequence(word):
+            return False
+    return True
+
+
+def validate_formula(formula: str) -> str | None:
+    """Стандартизованная формула или None, если в ней есть недопустимый символ"""
+
+    text = formula.translate(TRANSLATION_TABLE)
+    return text if is_valid_normalized(text) else None
+
+
+def scan_normalized(
+    text: str, names: Collection[str] = Const.FORMULA_VALIDATION_LIST
+) -> tuple[Token, ...] | None:
+    """Разбивает стандартизованную формулу на лексемы.
+
+    names — допустимые имена. Возвращает None, если в формуле есть
+    недопустимый символ или имя."""
+
+    tokens = []
+    position = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        if match.start() != position:
+            return None  # Пропущен недопустимый символ
+        position = match.end()
+        kind = match.lastgroup
+        lexeme = match.group()
+        if kind == NAME and lexeme not in names:
+            parts = split_names(lexeme, names)
+            if parts is None:
+                return None
+            tokens.extend(parts)
+        else:
+            tokens.append(Token(kind, lexeme))
+    if position != len(text):
+        return None  # Недопустимый символ в конце формулы
+    return tuple(tokens)
+
+
+def scan_formula(formula: str) -> ScannedFormula | None:
+    """Стандартизует формулу, проверяет её и разбивает на лексемы.
+
+    Возвращает None, если в формуле есть недопустимый символ или имя."""
+
+    text = formula.translate(TRANSLATION_TABLE)
+    tokens = scan_normalized(text)
+    return None if tokens is None else ScannedFormula(text, tokens)
@@ -0,0 +1,126 @@
+"""Вычисление формулы по ходу ввода.
+
+После паузы в наборе текста формула вычисляется в пуле из одного потока,
+чтобы окно программы не ждало результата. Каждое изменение текста
+увеличивает номер поколения формулы: ещё не начатые задачи снимаются
+с очереди, а выполняемой задаче передаётся событие отмены. Если формула
+вычисляется в рабочем процессе (sandbox), процесс уничтожается, не дожидаясь
+ограничения времени, а результат не выдаётся и не попадает в кэш. Дешёвые
+формулы вычисляются за доли секунды и не прерываются: их устаревший
+результат отбрасывается по номеру поколения."""
+
+import threading
+from collections.abc import Callable
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from constants import Const
+from sandbox import EvaluationCancelled
+
+
+class PreviewSignals(QObject):
+    """Сигналы задачи предварительного вычисления"""
+
+    finished = pyqtSignal(int, str)  # Номер поколения формулы и результат
+
+
+class PreviewTask(QRunnable):
+    """Задача предварительного вычисления формулы в рабочем потоке"""
+
+    def __init__(
+        self,
+        generation: int,
+        formula: str,
+        evaluate: Callable[[str, threading.Event], str],
+        signals: PreviewSignals,
+    ):
+        super().__init__()
+        self.generation = generation  # Номер поколения формулы
+        self.formula = formula
+        self.evaluate = evaluate  # Функция вычисления формулы с событием отмены
+        self.signals = signals
+        self.cancelled = threading.Event()  # Формула устарела — вычисление не нужно
+
+    def run(self) -> None:
+        try:
+            result = self.evaluate(self.formula, self.cancelled)
+        except EvaluationCancelled:
+            return  # Рабочий процесс уничтожен, результата нет
+        self.signals.finished.emit(self.generation, result)
+
+
+class LivePreview(QObject):
+    """Вычисление формулы по ходу ввода.
+
+    Формула вычисляется в пуле потоков после паузы в наборе текста.
+    Устаревшие задачи снимаются с очереди или отменяются, а результаты
+    устаревших вычислений отбрасываются."""
+
+    result_ready = pyqtSignal(str)  # Результат вычисления актуальной формулы
+
+    def __init__(self, evaluate: Callable[[str, threading.Event], str], parent=None):
+        super().__init__(parent)
+        self.evaluate = evaluate  # Функция вычисления формулы с событием отмены
+        self.generation = 0  # Номер поколения актуальной формулы
+        self.formula = ""  # Актуальная формула
+        # Событие отмены последней запущенной задачи (задачу удаляет пул)
+        self.task_cancelled: threading.Event | None = None
+
+        # Вычисление начинается после паузы в наборе текста
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(Const.LIVE_PREVIEW_DELAY_MS)
+        self.timer.timeout.connect(self.start_evaluation)
+
+        # Одного рабочего потока достаточно: устаревшие задачи не выполняются
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self.signals = PreviewSignals()
+        self.signals.finished.connect(self.deliver_result)
+
+    def schedule(self, formula: str) -> None:
+        """Планирование вычисления новой формулы"""
+
+        self.generation += 1
+        self.formula = formula
+        self.cancel_task()  # Вычисление прежней формулы больше не нужно
+        self.timer.start()  # Перезапуск таймера откладывает вычисление
+
+    def cancel(self) -> None:
+        """Отмена всех запланированных и выполняемых вычислений"""
+
+        self.generation += 1
+        self.timer.stop()
+        self.pool.clear()  # Снятие с очереди ещё не начатых задач
+        self.cancel_task()
+
+    def cancel_task(self) -> None:
+        """Отмена выполняемого вычисления"""
+
+        if self.task_cancelled is not None:
+            self.task_cancelled.set()
+            self.task_cancelled = None
+
+    def stop(self) -> bool:
+        """Отмена вычислений и ожидание завершения рабочего потока.
+
+        Возвращает False, если поток не завершился за отведённое время."""
+
+        self.cancel()
+        return self.pool.waitForDone(Const.LIVE_PREVIEW_STOP_TIMEOUT_MS)
+
+    def start_evaluation(self) -> None:
+        """Запуск вычисления актуальной формулы в рабочем потоке"""
+
+        self.pool.clear()
+        self.cancel_task()
+        task = PreviewTask(self.generation, self.formula, self.evaluate, self.signals)
+        self.task_cancelled = task.cancelled
+        self.pool.start(task)
+
+    def deliver_result(self, generation: int, result: str) -> None:
+        """Передача результата, если формула не изменилась за время вычисления"""
+
+        if generation == self.generation:
+            self.result_ready.emit(result)
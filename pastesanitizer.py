@@ -0,0 +1,73 @@
+"""Потоковая очистка текста, вставляемого из буфера обмена.
+
+Текст из буфера обмена может быть очень большим (например, скопированная
+таблица MS EXCEL), поэтому он очищается от лишних символов блоками
+в рабочем потоке, а результат вставляется в поле формулы по мере готовности."""
+
+import re
+import string
+from collections.abc import Iterator
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from constants import Const
+from core import normalize_characters
+from lexer import NAME_MAX_LENGTH
+
+# Безопасный текст: подряд идущие допустимые символы или имя функции.
+# Длинные имена проверяются раньше коротких ('asin' раньше 'sin').
+SAFE_TEXT_PATTERN = re.compile(
+    "["
+    + re.escape(Const.VALID_CHAR_SET)
+    + "]+|"
+    + "|".join(sorted(Const.FORMULA_VALIDATION_LIST, key=len, reverse=True))
+)
+# Символы, из которых состоят имена функций
+WORD_CHARACTERS = string.ascii_lowercase + string.digits
+
+
+def sanitize_chunks(
+    text: str, chunk_size: int = Const.PASTE_CHUNK_SIZE
+) -> Iterator[str]:
+    """Выдаёт очищенный текст блоками.
+
+    Имя функции не может содержать других символов, кроме букв и цифр, поэтому
+    хвост блока из букв и цифр переносится в следующий блок — имя, разрезанное
+    границей блока, не теряется."""
+
+    tail = ""
+    for start in range(0, len(text), chunk_size):
+        chunk = tail + normalize_characters(text[start : start + chunk_size])
+        tail_start = len(chunk.rstrip(WORD_CHARACTERS))
+        if tail_start == 0 and len(chunk) > chunk_size:
+            # Слишком длинное слово: переносится только возможное начало имени
+            tail_start = len(chunk) - NAME_MAX_LENGTH + 1
+        chunk, tail = chunk[:tail_start], chunk[tail_start:]
+        yield "".join(SAFE_TEXT_PATTERN.findall(chunk))
+    yield "".join(SAFE_TEXT_PATTERN.findall(tail))
+
+
+class PasteSanitizer(QThread):
+    """Очистка текста из буфера обмена в рабочем потоке"""
+
+    chunk_ready = pyqtSignal(str)  # Очередной блок очищенного текста
+
+    def __init__(self, text: str, parent=None):
+        super().__init__(parent)
+        self.text = text
+        self.cancelled = False  # Вставка прервана — блоки больше не нужны
+
+    def cancel(self) -> None:
+        """Прерывание очистки с ожиданием завершения потока"""
+
+        self.cancelled = True
+        self.wait()
+
+    def run(self) -> None:
+        """Очистка текста блоками"""
+
+        for chunk in sanitize_chunks(self.text):
+            if self.cancelled:
+                return
+            if chunk:
+                self.chunk_ready.emit(chunk)
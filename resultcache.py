@@ -0,0 +1,150 @@
+"""Кэш результатов вычисления формул.
+
+Одни и те же формулы вводятся снова и снова, поэтому их результаты
+запоминаются и повторно не вычисляются. Ключ кэша — стандартизованная
+формула: "2 x 2" и "2*2" дают одну запись. Размер кэша ограничен,
+при переполнении удаляется запись, которая дольше всех не использовалась.
+
+Кэш записывается в файл при выходе из программы и читается при запуске.
+Свободное место заполняется результатами из истории вычислений.
+Ошибки не кэшируются: например, ошибка "Слишком сложное вычисление"
+зависит от загрузки машины. Табулирование (формула с разделителем
+Const.SWEEP_SEPARATOR) в кэш не попадает."""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+
+from constants import Const
+from core import ERRORS, normalize_characters
+
+
+class ResultCache:
+    """Кэш результатов с вытеснением давно не использованных записей.
+
+    Обращения из потока вычисления по ходу ввода защищены блокировкой."""
+
+    def __init__(
+        self,
+        path: str | Path = Const.RESULT_CACHE_FILE_NAME,
+        max_size: int = Const.RESULT_CACHE_SIZE,
+    ):
+        self.path = Path(path)  # Файл кэша
+        self.max_size = max_size  # Наибольшее число записей
+        self.hits = 0  # Число результатов, найденных в кэше
+        self.misses = 0  # Число результатов, которых в кэше не было
+        # Записи от давно не использованной к последней использованной
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def key(formula: str) -> str:
+        """Ключ кэша — стандартизованная формула.
+
+        Стандартизация — только замена символов, без проверки формулы:
+        результат недопустимой формулы — ошибка, и в кэш он не попадает."""
+
+        return normalize_characters(formula)
+
+    @staticmethod
+    def cacheable(key: str, result: str) -> bool:
+        """Результат можно кэшировать: не ошибка, не слишком длинный текст
+        и не результат табулирования"""
+
+        return (
+            result not in ERRORS
+            and len(result) <= Const.RESULT_CACHE_MAX_LENGTH
+            and Const.SWEEP_SEPARATOR not in key
+        )
+
+    def get(self, formula: str) -> str | None:
+        """Результат формулы из кэша (None, если его там нет)"""
+
+        key = self.key(formula)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)  # Запись использована последней
+            return result
+
+    def put(self, formula: str, result: str) -> None:
+        """Запоминание результата формулы"""
+
+        key = self.key(formula)
+        if not self.cacheable(key, result):
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)  # Вытеснение давней записи
+
+    def warm(self, rows: Iterable[tuple[str, str]]) -> None:
+        """Заполнение свободного места записями истории.
+
+        rows — пары (формула, результат), начиная с самой новой. Записи
+        истории считаются использованными раньше уже имеющихся в кэше
+        и не вытесняют их."""
+
+        for formula, result in rows:
+            key = self.key(formula)
+            if not self.cacheable(key, result):
+                continue
+            with self._lock:
+                if len(self._entries) >= self.max_size:
+                    return
+                if key not in self._entries:
+                    self._entries[key] = result
+                    self._entries.move_to_end(key, last=False)
+
+    def clear(self) -> None:
+        """Удаление всех записей (счётчики сохраняются)"""
+
+        with self._lock:
+            self._entries.clear()
+
+    def statistics(self) -> dict[str, int | float]:
+        """Счётчики для подбора размера кэша"""
+
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
+
+    def load(self) -> None:
+        """Чтение кэша из файла. Отсутствующий или испорченный файл пропускается"""
+
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                entries = json.load(file)
+            rows = [(str(key), str(result)) for key, result in entries]
+        except (OSError, ValueError, TypeError):
+            return
+        with self._lock:
+            for key, result in rows[-self.max_size :]:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+
+    def save(self) -> None:
+        """Атомарная запись кэша в файл"""
+
+        with self._lock:
+            entries = list(self._entries.items())
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, mode="w", encoding="utf-8") as file:
+            json.dump(entries, file, ensure_ascii=False)
+        os.replace(temp_path, self.path)
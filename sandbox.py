@@ -0,0 +1,153 @@
+"""Изолированное вычисление формул в пуле рабочих процессов.
+
+Формула вроде 9**9**9 проходит проверку символов, но вычисляется часами
+и занимает гигабайты памяти. Поэтому формулы вычисляются в заранее
+запущенных рабочих процессах с ограничением памяти (sandboxworker).
+Если формула не вычислена за отведённое время, процесс уничтожается
+и заменяется новым, а вместо результата возвращается Const.ERROR_TOO_EXPENSIVE."""
+
+import multiprocessing
+import queue
+import threading
+import time
+
+from constants import Const
+from core import calculate_and_validate_formula, estimate_normalized_cost
+from engine import FormulaCost
+from lexer import validate_formula
+from sandboxworker import worker_main
+
+
+class EvaluationCancelled(Exception):
+    """Вычисление отменено: результат формулы больше не нужен"""
+
+
+def evaluate_without_worker(text: str) -> str | None:
+    """Результат стандартизованной и проверенной формулы, если для него
+    не нужен рабочий процесс: дешёвая формула вычисляется сразу, а заведомо
+    неподъёмная отвергается. None — формула пограничная"""
+
+    cost = estimate_normalized_cost(text)
+    if cost is FormulaCost.CHEAP:
+        return calculate_and_validate_formula(text)
+    if cost is FormulaCost.INFEASIBLE:
+        return Const.ERROR_TOO_EXPENSIVE
+    return None
+
+
+class Worker:
+    """Рабочий процесс и канал связи с ним"""
+
+    def __init__(self, context, memory_limit: int):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=worker_main,
+            args=(child_connection, memory_limit),
+            name="CalcSandbox",
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()  # Конец канала рабочего процесса нужен только ему
+
+    def kill(self) -> None:
+        """Уничтожение рабочего процесса"""
+
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def stop(self) -> None:
+        """Штатное завершение рабочего процесса"""
+
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(Const.SANDBOX_STOP_TIMEOUT_S)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+class EvaluationSandbox:
+    """Пул рабочих процессов для вычисления формул.
+
+    Дешёвые по оценке формулы вычисляются сразу в текущем процессе,
+    заведомо неподъёмные — отвергаются, а в рабочих процессах вычисляются
+    только пограничные. Процессы запускаются при создании пула, поэтому
+    формулы не ждут запуска процесса. Методом evaluate можно пользоваться
+    из нескольких потоков одновременно."""
+
+    def __init__(
+        self,
+        workers: int = Const.SANDBOX_WORKERS,
+        time_limit: float = Const.SANDBOX_TIME_LIMIT_S,
+        memory_limit: int = Const.SANDBOX_MEMORY_LIMIT,
+    ):
+        self.time_limit = time_limit  # Время на вычисление одной формулы, секунд
+        self.memory_limit = memory_limit  # Память рабочего процесса, байт
+        # Метод spawn одинаково работает в Windows, Linux и в собранном exe файле
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: queue.Queue[Worker] = queue.Queue()  # Свободные процессы
+        self._workers_count = workers
+        for _ in range(workers):
+            self._idle.put(self._new_worker())
+
+    def _new_worker(self) -> Worker:
+        return Worker(self._context, self.memory_limit)
+
+    def evaluate(self, formula: str, cancelled: threading.Event | None = None) -> str:
+        """Вычисление формулы с ограничением времени.
+
+        Формула стандартизуется и проверяется один раз, а оценка стоимости
+        и вычисление пользуются одной скомпилированной формулой из кэша.
+        cancelled — событие отмены: если оно наступает во время вычисления
+        в рабочем процессе, процесс уничтожается и вызывается
+        EvaluationCancelled."""
+
+        text = validate_formula(formula)
+        if text is None:
+            return Const.ERROR_INVALID_SYMBOL
+        result = evaluate_without_worker(text)
+        if result is not None:
+            return result
+
+        worker = self._idle.get()  # Ожидание свободного процесса
+        try:
+            worker.connection.send(text)
+            if self._wait_result(worker, cancelled):
+                result = worker.connection.recv()
+                self._idle.put(worker)
+                return result
+        except (EOFError, OSError):
+            pass  # Процесс аварийно завершился, например, от нехватки памяти
+
+        # Вычисление слишком дорогое или отменено — процесс заменяется новым
+        worker.kill()
+        self._idle.put(self._new_worker())
+        if cancelled is not None and cancelled.is_set():
+            raise EvaluationCancelled
+        return Const.ERROR_TOO_EXPENSIVE
+
+    def _wait_result(self, worker: Worker, cancelled: threading.Event | None) -> bool:
+        """Ожидание результата рабочего процесса не дольше time_limit.
+
+        False — время вышло или вычисление отменено."""
+
+        if cancelled is None:
+            return worker.connection.poll(self.time_limit)
+        deadline = time.monotonic() + self.time_limit
+        while not cancelled.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if worker.connection.poll(min(remaining, Const.SANDBOX_CANCEL_CHECK_S)):
+                return True
+        return False
+
+    def close(self) -> None:
+        """Завершение всех рабочих процессов"""
+
+        for _ in range(self._workers_count):
+            self._idle.get().stop()
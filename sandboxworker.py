@@ -0,0 +1,124 @@
+"""Рабочий процесс изолированного вычисления формул (sandbox).
+
+Модуль не зависит от PyQt6. Рабочий процесс, запущенный методом spawn,
+загружает и главный модуль программы (main.py), но тот импортирует окно
+программы только в главном процессе, поэтому рабочий процесс загружает
+только ядро вычислений.
+
+Память рабочего процесса ограничивается в Linux и macOS через
+RLIMIT_DATA, а в Windows — объектом задания (Job Object)."""
+
+import sys
+from multiprocessing.connection import Connection
+
+from core import calculate_and_validate_formula
+
+
+def limit_memory(limit: int) -> None:
+    """Ограничение памяти текущего процесса (где это поддерживается)"""
+
+    if sys.platform == "win32":
+        limit_job_memory(limit)
+        return
+    try:
+        import resource
+    except ImportError:  # Система без ограничений ресурсов — только время
+        return
+    try:
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    except (ValueError, OSError):
+        pass  # Система не позволяет ограничить память
+
+
+def limit_job_memory(limit: int) -> None:
+    """Ограничение памяти текущего процесса в Windows.
+
+    Процесс включается в новый объект задания с ограничением памяти
+    процесса. Описатель задания не закрывается: задание живёт, пока жив
+    процесс. Если система не позволяет создать задание, остаётся только
+    ограничение времени."""
+
+    import ctypes
+    from ctypes import wintypes
+
+    class IoCounters(ctypes.Structure):
+        _fields_ = [
+            (name, ctypes.c_ulonglong)
+            for name in (
+                "ReadOperationCount",
+                "WriteOperationCount",
+                "OtherOperationCount",
+                "ReadTransferCount",
+                "WriteTransferCount",
+                "OtherTransferCount",
+            )
+        ]
+
+    class BasicLimitInformation(ctypes.Structure):
+        _fields_ = [
+            ("PerProcessUserTimeLimit", ctypes.c_longlong),
+            ("PerJobUserTimeLimit", ctypes.c_longlong),
+            ("LimitFlags", wintypes.DWORD),
+            ("MinimumWorkingSetSize", ctypes.c_size_t),
+            ("MaximumWorkingSetSize", ctypes.c_size_t),
+            ("ActiveProcessLimit", wintypes.DWORD),
+            ("Affinity", ctypes.c_size_t),
+            ("PriorityClass", wintypes.DWORD),
+            ("SchedulingClass", wintypes.DWORD),
+        ]
+
+    class ExtendedLimitInformation(ctypes.Structure):
+        _fields_ = [
+            ("BasicLimitInformation", BasicLimitInformation),
+            ("IoInfo", IoCounters),
+            ("ProcessMemoryLimit", ctypes.c_size_t),
+            ("JobMemoryLimit", ctypes.c_size_t),
+            ("PeakProcessMemoryUsed", ctypes.c_size_t),
+            ("PeakJobMemoryUsed", ctypes.c_size_t),
+        ]
+
+    job_object_extended_limit_information = 9  # Класс сведений о задании
+    job_object_limit_process_memory = 0x100  # Флаг ограничения памяти процесса
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+    kernel32.CreateJobObjectW.argtypes = (ctypes.c_void_p, wintypes.LPCWSTR)
+    kernel32.SetInformationJobObject.restype = wintypes.BOOL
+    kernel32.SetInformationJobObject.argtypes = (
+        wintypes.HANDLE,
+        ctypes.c_int,
+        ctypes.c_void_p,
+        wintypes.DWORD,
+    )
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    kernel32.AssignProcessToJobObject.restype = wintypes.BOOL
+    kernel32.AssignProcessToJobObject.argtypes = (wintypes.HANDLE, wintypes.HANDLE)
+
+    job = kernel32.CreateJobObjectW(None, None)
+    if not job:
+        return
+    info = ExtendedLimitInformation()
+    info.BasicLimitInformation.LimitFlags = job_object_limit_process_memory
+    info.ProcessMemoryLimit = limit
+    if kernel32.SetInformationJobObject(
+        job,
+        job_object_extended_limit_information,
+        ctypes.byref(info),
+        ctypes.sizeof(info),
+    ):
+        kernel32.AssignProcessToJobObject(job, kernel32.GetCurrentProcess())
+
+
+def worker_main(connection: Connection, memory_limit: int) -> None:
+    """Цикл рабочего процесса: получить формулу — вернуть результат"""
+
+    limit_memory(memory_limit)
+    while True:
+        try:
+            formula = connection.recv()
+        except EOFError:
+            return  # Главный процесс завершился
+        if formula is None:
+            return  # Команда завершения
+        # Формула уже стандартизована и проверена в главном процессе
+        connection.send(calculate_and_validate_formula(formula))
@@ -0,0 +1,231 @@
+"""Локальный HTTP сервер вычисления формул.
+
+Запуск:
+    python -m calc serve [--host 127.0.0.1] [--port 8765]
+    python -m calc serve --unix /tmp/calc.sock
+
+Формулы вычисляются так же, как в окне калькулятора, и с теми же текстами
+ошибок (Const.ERROR_*). Запрос — POST /evaluate с JSON телом:
+    {"formula": "2 x 2"}          ->  {"formula": "2 x 2", "result": "4", "ok": true}
+    {"formulas": ["2 x 2", "1/0"]} ->  {"results": [{...}, {...}]}
+
+Соединения HTTP/1.1 по умолчанию остаются открытыми (keep-alive), поэтому
+клиент может отправлять запросы один за другим без новых соединений.
+Формулы вычисляются не в цикле событий, а в потоках ожидания: дешёвые
+по оценке формулы — сразу в потоке, пограничные — в рабочих процессах
+с ограничением времени и памяти (sandbox.EvaluationSandbox.evaluate)."""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from constants import Const
+from core import ERRORS
+from sandbox import EvaluationSandbox
+
+
+class RequestError(Exception):
+    """Ошибка запроса: HTTP статус и текст для клиента"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class EvaluationServer:
+    """HTTP сервер вычисления формул"""
+
+    def __init__(self, sandbox: EvaluationSandbox):
+        self.sandbox = sandbox  # Рабочие процессы для пограничных формул
+        # Потоки вычисления формул и ожидания результата рабочих процессов
+        self.executor = ThreadPoolExecutor(
+            max_workers=Const.SANDBOX_WORKERS, thread_name_prefix="CalcServer"
+        )
+        # Ограничение числа одновременно обрабатываемых запросов
+        self.in_flight = asyncio.Semaphore(Const.SERVER_MAX_IN_FLIGHT)
+
+    def evaluate_chunk(self, formulas: list[str]) -> list[dict]:
+        """Вычисление части пакета (выполняется в потоке, а не в цикле событий)"""
+
+        results = []
+        for formula in formulas:
+            result = self.sandbox.evaluate(formula)
+            results.append(
+                {"formula": formula, "result": result, "ok": result not in ERRORS}
+            )
+        return results
+
+    async def evaluate(self, formula: str) -> dict:
+        """Вычисление одной формулы"""
+
+        [result] = await self.evaluate_batch([formula])
+        return result
+
+    async def evaluate_batch(self, formulas: list[str]) -> list[dict]:
+        """Вычисление пакета формул с сохранением порядка.
+
+        Пакет вычисляется частями, поэтому другие соединения не ждут его конца"""
+
+        loop = asyncio.get_running_loop()
+        results = []
+        for start in range(0, len(formulas), Const.SERVER_CHUNK_SIZE):
+            chunk = formulas[start : start + Const.SERVER_CHUNK_SIZE]
+            results.extend(
+                await loop.run_in_executor(self.executor, self.evaluate_chunk, chunk)
+            )
+        return results
+
+    async def process(self, method: str, path: str, body: bytes) -> dict:
+        """Обработка запроса. Возвращает JSON ответа"""
+
+        if path != Const.SERVER_PATH:
+            raise RequestError(HTTPStatus.NOT_FOUND, Const.SERVER_NOT_FOUND)
+        if method != "POST":
+            raise RequestError(
+                HTTPStatus.METHOD_NOT_ALLOWED, Const.SERVER_METHOD_NOT_ALLOWED
+            )
+        try:
+            request = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, Const.SERVER_BAD_REQUEST)
+
+        if isinstance(request, dict) and isinstance(request.get("formula"), str):
+            return await self.evaluate(request["formula"])
+        if isinstance(request, dict) and isinstance(request.get("formulas"), list):
+            formulas = request["formulas"]
+            if not all(isinstance(formula, str) for formula in formulas):
+                raise RequestError(HTTPStatus.BAD_REQUEST, Const.SERVER_BAD_REQUEST)
+            if len(formulas) > Const.SERVER_MAX_BATCH:
+                raise RequestError(
+                    HTTPStatus.REQUEST_ENTITY_TOO_LARGE, Const.SERVER_BATCH_TOO_LARGE
+                )
+            return {"results": await self.evaluate_batch(formulas)}
+        raise RequestError(HTTPStatus.BAD_REQUEST, Const.SERVER_BAD_REQUEST)
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Обслуживание соединения: запросы обрабатываются один за другим"""
+
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break  # Клиент закрыл соединение
+                method, path, keep_alive, body = request
+                async with self.in_flight:
+                    try:
+                        status, payload = HTTPStatus.OK, await self.process(
+                            method, path, body
+                        )
+                    except RequestError as e:
+                        status, payload = e.status, {"error": str(e)}
+                writer.write(format_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except RequestError as e:  # Запрос не удалось прочитать
+            writer.write(format_response(e.status, {"error": str(e)}, False))
+            try:
+                await writer.drain()  # Ответ отправляется до закрытия соединения
+            except ConnectionError:
+                pass  # Клиент не дождался ответа
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Соединение оборвано клиентом
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass  # Соединение уже оборвано клиентом
+
+    async def serve(
+        self, host: str, port: int, unix_path: str | None = None
+    ) -> asyncio.AbstractServer:
+        """Запуск сервера на адресе и порту или на Unix сокете"""
+
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_connection, unix_path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self) -> None:
+        """Освобождение потоков ожидания"""
+
+        self.executor.shutdown(wait=True)
+
+
+async def read_request(
+    reader: asyncio.StreamReader,
+) -> tuple[str, str, bool, bytes] | None:
+    """Чтение HTTP запроса: метод, адрес, keep-alive и тело.
+
+    Возвращает None, если соединение закрыто до начала запроса."""
+
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise
+        return None
+    except asyncio.LimitOverrunError:
+        raise RequestError(
+            HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, Const.SERVER_BODY_TOO_LARGE
+        )
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, path, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, Const.SERVER_BAD_REQUEST)
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    # HTTP/1.1 по умолчанию сохраняет соединение, HTTP/1.0 — закрывает
+    connection = headers.get("connection", "").lower()
+    keep_alive = (
+        connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    )
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, Const.SERVER_BAD_REQUEST)
+    if length > Const.SERVER_MAX_BODY:
+        raise RequestError(
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE, Const.SERVER_BODY_TOO_LARGE
+        )
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], keep_alive, body
+
+
+def format_response(status: HTTPStatus, payload: dict, keep_alive: bool) -> bytes:
+    """HTTP ответ с JSON телом"""
+
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def run_server(host: str, port: int, unix_path: str | None = None) -> None:
+    """Работа сервера до прерывания (Ctrl+C)"""
+
+    sandbox = EvaluationSandbox()
+    server = EvaluationServer(sandbox)
+    try:
+        listener = await server.serve(host, port, unix_path)
+        address = unix_path or f"http://{host}:{port}{Const.SERVER_PATH}"
+        print(Const.SERVER_STARTED_TEXT, address, flush=True)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+        sandbox.close()
@@ -0,0 +1,155 @@
+"""Трассировка запуска программы.
+
+Включается переменной окружения CALC_STARTUP_TRACE (её значение — путь
+к файлу отчёта, или 1 — отчёт в файл startup_trace.txt) либо ключом
+командной строки --trace-startup. Записывается время каждого этапа запуска
+и время импорта каждого модуля, а после первой отрисовки окна — отчёт.
+Работает и в exe файле, собранном PyInstaller, где ключ -X importtime
+интерпретатора недоступен.
+
+Модуль должен импортироваться первым, поэтому сам он импортирует только
+стандартные модули: иначе импорт constants.py и модулей, которые импортирует
+он сам, прошёл бы до начала трассировки и не попал бы в отчёт."""
+
+import builtins
+import os
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+TRACE_ENV = "CALC_STARTUP_TRACE"  # Переменная окружения, включающая трассировку
+TRACE_FLAG = "--trace-startup"  # Ключ командной строки, включающий трассировку
+REPORT_FILE_NAME = "startup_trace.txt"  # Файл отчёта по умолчанию
+REPORT_TOP_IMPORTS = 40  # Число самых долгих импортов в отчёте
+
+
+class StartupTrace:
+    """Запись времени этапов запуска и импорта модулей"""
+
+    def __init__(self, enabled: bool, report_path: str = REPORT_FILE_NAME):
+        self.enabled = enabled
+        self.report_path = report_path
+        self.started = time.perf_counter()  # Начало трассировки
+        self.last_mark = self.started  # Конец последнего отмеченного этапа
+        # Этапы: (название, начало от старта, длительность), секунд
+        self.phases: list[tuple[str, float, float]] = []
+        # Импорты: (модуль, полное время, собственное время), секунд
+        self.imports: list[tuple[str, float, float]] = []
+        self._children_time = [0.0]  # Время вложенных импортов по уровням
+        self._original_import = builtins.__import__
+        self.finished = False  # Отчёт записан, трассировка закончена
+        if enabled:
+            builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """Замена __import__: засекает время импорта новых модулей"""
+
+        if not fromlist and not level and name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        package_loaded = name in sys.modules
+        modules_count = len(sys.modules)
+        self._children_time.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            own = elapsed - self._children_time.pop()
+            if len(sys.modules) > modules_count:  # Загружен новый модуль
+                self._children_time[-1] += elapsed
+                if level:  # Относительный импорт — имя отсчитывается от пакета
+                    package = (globals or {}).get("__package__") or ""
+                    package = package.rsplit(".", level - 1)[0]
+                    name = f"{package}.{name}" if name else package
+                submodules = [m for m in fromlist or () if f"{name}.{m}" in sys.modules]
+                if submodules and (package_loaded or level):
+                    name += ": " + ", ".join(submodules)  # Импорт подмодулей пакета
+                self.imports.append((name, elapsed, own))
+
+    def mark(self, name: str) -> None:
+        """Отмечает окончание этапа, начавшегося в конце предыдущей отметки"""
+
+        if self.enabled:
+            now = time.perf_counter()
+            self.phases.append(
+                (name, self.last_mark - self.started, now - self.last_mark)
+            )
+            self.last_mark = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Засекает время выполнения блока кода"""
+
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.phases.append((name, start - self.started, now - start))
+            self.last_mark = now
+
+    def finish(self, name: str) -> None:
+        """Отмечает последний этап и записывает отчёт (только один раз)"""
+
+        if not self.enabled or self.finished:
+            return
+        self.finished = True
+        self.mark(name)
+        builtins.__import__ = self._original_import
+        try:
+            with open(self.report_path, mode="w", encoding="utf-8") as file:
+                file.write(self.report())
+        except OSError as e:
+            print(f"Не удалось записать отчёт о запуске: {e}", file=sys.stderr)
+
+    def report(self) -> str:
+        """Текст отчёта"""
+
+        total = time.perf_counter() - self.started
+        lines = [
+            f"Трассировка запуска: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Программа: {sys.executable}"
+            + (" (exe файл)" if hasattr(sys, "frozen") else ""),
+            f"Python: {sys.version.split()[0]}",
+            f"Всего до первой отрисовки, мс: {total * 1000:.1f}",
+            "",
+            f"{'Начало, мс':>12} {'Время, мс':>10}  Этап",
+        ]
+        for name, start, elapsed in sorted(self.phases, key=lambda item: item[1]):
+            lines.append(f"{start * 1000:12.1f} {elapsed * 1000:10.1f}  {name}")
+
+        imports = sorted(self.imports, key=lambda item: item[1], reverse=True)
+        lines += [
+            "",
+            f"Импортировано модулей: {len(self.imports)}",
+            f"{'Полное, мс':>12} {'Собств., мс':>11}  Модуль",
+        ]
+        for name, elapsed, own in imports[:REPORT_TOP_IMPORTS]:
+            lines.append(f"{elapsed * 1000:12.1f} {own * 1000:11.1f}  {name}")
+        return "\n".join(lines) + "\n"
+
+
+def is_child_process() -> bool:
+    """Рабочий процесс пула вычислений (запуск не трассируется)"""
+
+    if "--multiprocessing-fork" in sys.argv:
+        return True  # Рабочий процесс exe файла
+    multiprocessing = sys.modules.get("multiprocessing")
+    return multiprocessing is not None and multiprocessing.parent_process() is not None
+
+
+def create_trace() -> StartupTrace:
+    """Создаёт трассировку, включённую переменной окружения или ключом"""
+
+    report_path = os.environ.get(TRACE_ENV, "")
+    enabled = (bool(report_path) or TRACE_FLAG in sys.argv) and not is_child_process()
+    if report_path in ("", "1"):
+        report_path = REPORT_FILE_NAME
+    return StartupTrace(enabled, report_path)
+
+
+startup_trace = create_trace()
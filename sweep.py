@@ -0,0 +1,169 @@
+"""Табулирование формулы по диапазону значений переменной.
+
+Формула с переменной записывается так:
+    sin(t)/t | t = 1 .. 10 .. 0.5
+где после '|' указаны начало, конец и (необязательно) шаг диапазона.
+Буква 'x' в калькуляторе означает умножение, поэтому переменная называется 't'.
+
+Формула разбирается и компилируется движком калькулятора (engine),
+а все точки диапазона вычисляются одной векторной операцией NumPy:
+функции калькулятора заменяются соответствующими ufunc NumPy."""
+
+import math
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+
+from constants import Const
+from core import error_text, estimate_formula_cost, evaluate_formula
+from core import normalize_characters
+from engine import FormulaCost, compile_expression, run_compiled_formula
+
+try:
+    import numpy as np
+except ImportError:  # NumPy нужен только для табулирования
+    np = None
+
+# Имена функций NumPy, отличающиеся от имён функций калькулятора
+NUMPY_FUNCTION_NAMES = {"acos": "arccos", "asin": "arcsin", "atan": "arctan"}
+
+# Имена, допустимые в формуле табулирования
+SWEEP_NAMES = Const.FORMULA_VALIDATION_LIST | {Const.SWEEP_VARIABLE}
+
+
+@dataclass(frozen=True)
+class Sweep:
+    """Формула табулирования и диапазон значений переменной"""
+
+    formula: str  # Стандартизованная формула с переменной
+    start: float  # Начало диапазона
+    stop: float  # Конец диапазона (включительно)
+    step: float  # Шаг диапазона
+
+    def count(self) -> int:
+        """Число точек диапазона"""
+
+        # Небольшой допуск, чтобы конец диапазона не терялся из-за округления
+        return math.floor((self.stop - self.start) / self.step + 1e-9) + 1
+
+
+class SweepError(Exception):
+    """Ошибка табулирования. Текст ошибки предназначен для Пользователя"""
+
+
+def is_sweep(formula: str) -> bool:
+    """Проверяет, записана ли формула в виде табулирования"""
+
+    return Const.SWEEP_SEPARATOR in formula
+
+
+def evaluate_bound(formula: str) -> str:
+    """Значение границы или шага диапазона в виде текста.
+
+    Вычисляются только дешёвые по оценке формулы: безопасного медленного
+    пути в текущем процессе нет."""
+
+    if estimate_formula_cost(formula) is not FormulaCost.CHEAP:
+        return Const.ERROR_TOO_EXPENSIVE
+    return evaluate_formula(formula)
+
+
+def parse_sweep(
+    formula: str,
+    evaluate: Callable[[str], str] = evaluate_bound,
+    max_points: int = Const.SWEEP_MAX_POINTS,
+) -> Sweep:
+    """Разбор записи 'формула | t = начало .. конец .. шаг'.
+
+    evaluate вычисляет границы и шаг, например, в рабочем процессе
+    (sandbox.EvaluationSandbox.evaluate). max_points — наибольшее число точек."""
+
+    expression, _, sweep_range = formula.partition(Const.SWEEP_SEPARATOR)
+    sweep_range = normalize_characters(sweep_range)
+    variable, _, bounds_text = sweep_range.partition("=")
+    bounds = bounds_text.split(Const.SWEEP_RANGE_SEPARATOR)
+    if variable != Const.SWEEP_VARIABLE or len(bounds) not in (2, 3):
+        raise SweepError(Const.ERROR_SWEEP_RANGE)
+
+    # Границы и шаг — обычные формулы калькулятора, например 2*pi
+    values = []
+    for bound in bounds:
+        result = evaluate(bound)
+        try:
+            values.append(float(result))
+        except ValueError:
+            if result == Const.ERROR_TOO_EXPENSIVE:
+                raise SweepError(result) from None
+            raise SweepError(Const.ERROR_SWEEP_RANGE) from None
+    start, stop, step = values if len(values) == 3 else (*values, 1.0)
+
+    if step == 0 or not (math.isfinite(step) and math.isfinite(stop - start)):
+        raise SweepError(Const.ERROR_SWEEP_RANGE)
+    points = (stop - start) / step  # Число шагов диапазона
+    if points < 0:
+        raise SweepError(Const.ERROR_SWEEP_RANGE)
+    if not math.isfinite(points):
+        # Шаг ничтожно мал по сравнению с диапазоном: частное переполнилось
+        raise SweepError(Const.ERROR_SWEEP_TOO_MANY_POINTS)
+
+    sweep = Sweep(normalize_characters(expression), start, stop, step)
+    if sweep.count() > max_points:
+        raise SweepError(Const.ERROR_SWEEP_TOO_MANY_POINTS)
+    return sweep
+
+
+def numpy_namespace() -> dict:
+    """Пространство имён формулы табулирования: функции калькулятора из NumPy"""
+
+    namespace: dict = {"__builtins__": {}}
+    for name in Const.FORMULA_VALIDATION_LIST:
+        namespace[name] = getattr(np, NUMPY_FUNCTION_NAMES.get(name, name))
+    return namespace
+
+
+def evaluate_sweep(sweep: Sweep) -> tuple["np.ndarray", "np.ndarray"]:
+    """Вычисляет формулу во всех точках диапазона одной векторной операцией.
+
+    Возвращает массивы значений переменной и результатов."""
+
+    if np is None:
+        raise SweepError(Const.ERROR_NUMPY_MISSING)
+
+    # Константы не вычисляются при компиляции: все операции выполняет NumPy
+    compiled = compile_expression(sweep.formula, SWEEP_NAMES, fold=False)
+    if compiled is None:
+        raise SweepError(Const.ERROR_SYNTAX)
+    # Безопасного медленного пути для табулирования нет — только дешёвые формулы
+    if compiled.cost is not FormulaCost.CHEAP:
+        raise SweepError(Const.ERROR_TOO_EXPENSIVE)
+
+    arguments = sweep.start + sweep.step * np.arange(sweep.count(), dtype=np.float64)
+    namespace = numpy_namespace()
+    namespace[Const.SWEEP_VARIABLE] = arguments
+
+    # noinspection PyBroadException
+    try:
+        # Деление на 0 и выход из области определения дают inf/nan в точке
+        with np.errstate(all="ignore"):
+            values = run_compiled_formula(compiled.code, namespace)
+            values = np.asarray(values, dtype=np.float64)
+    except Exception as e:
+        raise SweepError(error_text(e)) from None
+
+    # Формула без переменной даёт одно значение для всех точек
+    return arguments, np.broadcast_to(values, arguments.shape)
+
+
+def format_sweep_rows(
+    arguments: "np.ndarray", values: "np.ndarray"
+) -> Iterator[tuple[str, str]]:
+    """Выдаёт строки таблицы (значение переменной, результат).
+
+    Числа форматируются так же, как результат обычного вычисления.
+    Неопределённые значения (inf, nan) заменяются текстом ошибки."""
+
+    for start in range(0, len(arguments), Const.SWEEP_FORMAT_CHUNK):
+        chunk = slice(start, start + Const.SWEEP_FORMAT_CHUNK)
+        for argument, value in zip(arguments[chunk].tolist(), values[chunk].tolist()):
+            yield str(argument), (
+                str(value) if math.isfinite(value) else Const.ERROR_NO_VALUE
+            )
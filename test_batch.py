@@ -0,0 +1,62 @@
+import time
+import unittest
+
+from batch import evaluate_many
+from constants import Const
+from core import evaluate_formula
+
+FORMULAS = [f"{i} / ({i} - 7)" for i in range(200)] + [
+    "2 + ш",
+    "9**9**9",
+    "sqrt(2)",
+]
+
+
+class TestEvaluateMany(unittest.TestCase):
+
+    def test_order_and_progress(self):
+        """Результаты пула процессов — в порядке формул и такие же, как у ядра"""
+        progress = []
+        results = list(evaluate_many(FORMULAS, 2, 7, progress.append))
+        self.assertEqual(results, [evaluate_formula(f) for f in FORMULAS])
+        self.assertIn(Const.ERROR_DIVIDE_BY_ZERO, results)
+        self.assertEqual(progress[-1], len(FORMULAS))
+        self.assertEqual(progress, sorted(progress))
+
+    def test_without_pool(self):
+        """Тестирование вычисления в текущем процессе"""
+        results = list(evaluate_many(FORMULAS, 1, 50))
+        self.assertEqual(results, [evaluate_formula(f) for f in FORMULAS])
+
+    def test_time_limit(self):
+        """Пограничные формулы вычисляются с ограничением времени"""
+        # Без ограничения деление вычисляется минуты
+        formulas = ["1 + 1", "7**10**6", "(7**10**6)**5 // 3**10**6", "2 + 2"]
+        for jobs in (1, 2):
+            started = time.monotonic()
+            results = list(evaluate_many(formulas, jobs, 2))
+            self.assertLess(time.monotonic() - started, 30)
+            self.assertEqual(
+                results,
+                ["2", evaluate_formula("7**10**6"), Const.ERROR_TOO_EXPENSIVE, "4"],
+            )
+
+    def test_backpressure(self):
+        """Формулы читаются не раньше, чем освобождается место для блока"""
+        consumed = 0
+
+        def formulas():
+            nonlocal consumed
+            for i in range(100_000):
+                consumed += 1
+                yield f"{i} + 1"
+
+        results = evaluate_many(formulas(), 2, 10)
+        self.assertEqual(next(results), "1")
+        in_flight = 2 * Const.BATCH_CHUNKS_PER_WORKER * 10
+        self.assertLessEqual(consumed, in_flight + 10)
+        results.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import re
+import unittest
+
+from benchmark import FORMULA_STANDARD, LONG_FORMULA
+from benchmark import Benchmark, Measurement, compare, measure
+from constants import Const
+from core import no_virus, normalize_characters
+
+SPEED_MARGIN = 1.5  # Допустимое отношение времени проверки к прежнему
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_measure(self):
+        """Тестирование замера перцентилей времени вызова"""
+        measurement = measure(Benchmark("сложение", lambda: 2 + 2, 50, 10))
+        self.assertLessEqual(measurement.p50_us, measurement.p95_us)
+        self.assertLessEqual(measurement.p95_us, measurement.p99_us)
+        self.assertGreater(measurement.throughput, 0)
+
+    def test_compare(self):
+        """Регрессия — рост p50 или p95 больше порога"""
+        baseline = {
+            "быстро": {"p50_us": 10, "p95_us": 20, "threshold": 1.5},
+            "медленно": {"p50_us": 10, "p95_us": 20, "threshold": 1.5},
+        }
+        results = {
+            "быстро": Measurement(14, 29, 100, 1),
+            "медленно": Measurement(16, 20, 20, 1),
+            "новая операция": Measurement(1, 1, 1, 1),
+        }
+        self.assertEqual(compare(results, baseline), ["медленно"])
+
+    def test_validation_not_slower_than_regex(self):
+        """Проверка формулы не медленнее прежней проверки одним регулярным
+        выражением — ни для обычной формулы, ни для формулы в 100 КБ.
+
+        Замер времени зависит от нагрузки машины, поэтому тест выявляет
+        только заметное замедление (в SPEED_MARGIN раз). Точное сравнение —
+        по эталону замеров benchmark_baseline.json (python benchmark.py)"""
+        symbols = "|".join(map(re.escape, Const.VALID_CHAR_SET))
+        names = "|".join(Const.FORMULA_VALIDATION_LIST)
+        pattern = re.compile(f"({symbols}|{names})*")
+        long_formula = normalize_characters(LONG_FORMULA)
+        for formula, repeat, number in (
+            (FORMULA_STANDARD, 200, 50),
+            (long_formula, 15, 1),
+        ):
+            self.assertTrue(no_virus(formula))
+            new = Benchmark("", lambda: no_virus(formula), repeat, number)
+            old = Benchmark("", lambda: pattern.fullmatch(formula), repeat, number)
+            # Замеры чередуются, чтобы фоновая нагрузка сказывалась на обоих
+            new_us, old_us = [], []
+            for _ in range(3):
+                new_us.append(measure(new).p50_us)
+                old_us.append(measure(old).p50_us)
+            self.assertLessEqual(min(new_us), SPEED_MARGIN * min(old_us))
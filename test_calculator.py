@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
 
@@ -7,9 +9,10 @@ from PyQt6.QtCore import QUrl, Qt
 from PyQt6.QtTest import QTest
 from PyQt6.QtGui import QKeyEvent
 
-from main import CalculatorApp
+from calculatorapp import CalculatorApp
 from constants import Const
 import functions
+from pastesanitizer import sanitize_chunks
 
 
 # noinspection PyUnusedLocal
@@ -17,10 +20,21 @@ class TestCalculatorApp(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
+        # История тестов записывается во временный каталог, а не в базу results.sqlite3
+        cls.work_dir = tempfile.TemporaryDirectory()
+        cls.old_dir = os.getcwd()
+        os.chdir(cls.work_dir.name)
+
         cls.app = QApplication([])  # Создаем экземпляр QApplication
         cls.calculator = CalculatorApp()  # Создаём экземпляр калькулятора
 
-    @patch("main.ask_for_continuation", return_value=True)  # Подмена функции
+    @classmethod
+    def tearDownClass(cls):
+        cls.calculator.close()  # Завершаем фоновую загрузку и запись истории
+        os.chdir(cls.old_dir)
+        cls.work_dir.cleanup()
+
+    @patch("calculatorapp.ask_for_continuation", return_value=True)  # Подмена функции
     def test_clear_all_fields(self, mock_ask):
         """Тестирование очистки всех полей"""
         self.calculator.txtFormula.setPlainText("2 + 2")
@@ -28,7 +42,7 @@ class TestCalculatorApp(unittest.TestCase):
         self.calculator.clear_all_fields()  # Здесь вызывается ask_for_continuation
         self.assertEqual(self.calculator.txtFormula.toPlainText(), "")
         self.assertEqual(self.calculator.txtResult.toPlainText(), "")
-        self.assertEqual(self.calculator.tblResults.rowCount(), 0)
+        self.assertEqual(self.calculator.history_model.rowCount(), 0)
 
     def test_copy_result_to_clipboard(self):
         """Тестирование копирования результата в буфер обмена"""
@@ -65,6 +79,19 @@ class TestCalculatorApp(unittest.TestCase):
             self.calculator.txtResult.toPlainText(), Const.ERROR_DIVIDE_BY_ZERO
         )
 
+    def test_live_preview(self):
+        """Тестирование вычисления формулы по ходу ввода"""
+        self.calculator.clear_table_results()
+        self.calculator.chkLivePreview.setChecked(True)
+        self.calculator.txtFormula.setPlainText("6 * 7")
+        for _ in range(100):  # Ожидание результата из рабочего потока
+            if self.calculator.txtResult.toPlainText() == "42":
+                break
+            QTest.qWait(20)
+        self.calculator.chkLivePreview.setChecked(False)
+        self.assertEqual(self.calculator.txtResult.toPlainText(), "42")
+        self.assertEqual(self.calculator.history_model.rowCount(), 0)
+
     def test_round_result(self):
         """Тестирование округления результата"""
         self.calculator.txtResult.setPlainText("3.14159")
@@ -76,9 +103,90 @@ class TestCalculatorApp(unittest.TestCase):
         """Тестирование добавления новой строки в таблицу результатов"""
         self.calculator.clear_table_results()
         self.calculator.insert_new_row_in_results("2 + 2", "4")
-        self.assertEqual(self.calculator.tblResults.rowCount(), 1)
-        self.assertEqual(self.calculator.tblResults.item(0, 1).text(), "2 + 2")
-        self.assertEqual(self.calculator.tblResults.item(0, 2).text(), "4")
+        self.calculator.insert_new_row_in_results("3 + 3", "6")
+        model = self.calculator.history_model
+        self.assertEqual(model.rowCount(), 2)
+        self.assertEqual(model.index(0, 1).data(), "3 + 3")
+        self.assertEqual(model.index(1, 2).data(), "4")
+        self.assertEqual(model.entry(0), ("3 + 3", "6"))
+
+    def test_export_history(self):
+        """Тестирование выгрузки истории в csv файл по кнопке"""
+        self.calculator.clear_table_results()
+        self.calculator.insert_new_row_in_results("2 + 2", "4")
+        path = os.path.abspath("export.csv")
+        with patch(
+            "PyQt6.QtWidgets.QFileDialog.getSaveFileName", return_value=(path, "")
+        ):
+            self.calculator.btnExport.click()
+        with open(path, encoding="utf-8-sig") as file:
+            self.assertEqual(
+                file.read().splitlines(), ["Выражение;Результат", "2 + 2;4"]
+            )
+
+    def test_history_search(self):
+        """Тестирование поиска в истории и добавления строк при поиске"""
+        self.calculator.clear_table_results()
+        model = self.calculator.history_model
+        model.extend_older([("7 * 7", "49"), ("sin(1)", "0.84")])
+        self.calculator.insert_new_row_in_results("2 + 2", "4")
+        self.calculator.lineSearch.setText("SIN")
+        self.assertEqual(model.rowCount(), 1)
+        self.assertEqual(model.index(0, 1).data(), "sin(1)")
+
+        self.calculator.insert_new_row_in_results("sin(0)", "0.0")
+        self.calculator.insert_new_row_in_results("3 + 3", "6")
+        self.assertEqual(model.rowCount(), 2)
+        self.assertEqual(model.index(0, 1).data(), "sin(0)")
+
+        self.calculator.lineSearch.setText("4")
+        self.assertEqual([model.entry(row)[0] for row in range(2)], ["2 + 2", "7 * 7"])
+        self.calculator.lineSearch.clear()
+        self.assertEqual(model.rowCount(), 5)
+
+    def test_worksheet_mode(self):
+        """Тестирование листа вычислений: "Ввод" начинает строку и пересчитывает"""
+        calculator = self.calculator
+        calculator.clear_formula_and_result()
+        calculator.chkWorksheet.setChecked(True)
+        QTest.keyClicks(calculator.txtFormula, "a = 2 x 3")
+        QTest.keyClick(calculator.txtFormula, Qt.Key.Key_Return)
+        QTest.keyClicks(calculator.txtFormula, "a + #1")
+        calculator.f.formula_processing()
+        calculator.chkWorksheet.setChecked(False)
+        self.assertEqual(calculator.txtFormula.toPlainText(), "a = 2 x 3\na + #1")
+        self.assertEqual(calculator.txtResult.toPlainText(), "6\n12")
+
+    def test_copy_history_formula_button(self):
+        """Тестирование кнопки копирования формулы из строки истории"""
+        self.calculator.clear_table_results()
+        self.calculator.insert_new_row_in_results("5 * 5", "25")
+        table = self.calculator.tblResults
+        rect = table.visualRect(self.calculator.history_model.index(0, 0))
+        QTest.mouseClick(table.viewport(), Qt.MouseButton.LeftButton, pos=rect.center())
+        self.assertEqual(QApplication.clipboard().text(), "5 * 5")
+
+    def test_sanitize_chunks(self):
+        """Тестирование очистки текста блоками: имя функции на границе блоков"""
+        text = "1;2 х sqrt(4) + log10(100) - asin(1)"
+        for chunk_size in (7, 8, 11, 100):
+            self.assertEqual(
+                "".join(sanitize_chunks(text, chunk_size)),
+                "12*sqrt(4)+log10(100)-asin(1)",
+            )
+
+    def test_paste_copy_long_text(self):
+        """Тестирование вставки длинного текста в фоне и расчёта по её окончании"""
+        term = "1" + "0" * 35  # 500 слагаемых по 37 символов — больше одного блока
+        QApplication.clipboard().setText(f"+{term};" * 500)
+        self.calculator.paste_copy()
+        for _ in range(250):  # Ожидание окончания вставки в рабочем потоке
+            if not self.calculator.paste_copy_pending:
+                break
+            QTest.qWait(20)
+        result = "5" + "0" * 37
+        self.assertEqual(self.calculator.txtResult.toPlainText(), result)
+        self.assertEqual(QApplication.clipboard().text(), result)
 
     def test_bold_font(self):
         """Тестирование установки жирного начертания шрифта"""
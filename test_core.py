@@ -0,0 +1,35 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from constants import Const
+from core import Result, evaluate
+
+
+class TestCore(unittest.TestCase):
+
+    def test_evaluate(self):
+        """Тестирование результата вычисления формулы"""
+        self.assertEqual(evaluate("2 х 21"), Result("42", 42))
+        self.assertTrue(evaluate("2 х 21").ok)
+
+        result = evaluate("1/0")
+        self.assertFalse(result.ok)
+        self.assertIsNone(result.value)
+        self.assertEqual(result.text, Const.ERROR_DIVIDE_BY_ZERO)
+        self.assertEqual(evaluate("2+a").error, Const.ERROR_INVALID_SYMBOL)
+
+    def test_core_does_not_import_qt(self):
+        """Ядро работает без PyQt6"""
+        code = (
+            "import core, sys; print(any(m.startswith('PyQt6') for m in sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output.strip(), "False")
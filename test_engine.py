@@ -0,0 +1,138 @@
+import ast
+import unittest
+
+from constants import Const
+from engine import FORMULA_NAMESPACE, FormulaCost, compile_formula, linearize
+from core import calculate_and_validate_formula
+
+
+class TestEngine(unittest.TestCase):
+
+    def test_calculate(self):
+        """Тестирование вычисления формул движком"""
+        self.assertEqual(calculate_and_validate_formula("2*2"), "4")
+        self.assertEqual(calculate_and_validate_formula("abs(-3)"), "3")
+        self.assertEqual(calculate_and_validate_formula("degrees(pi)"), "180.0")
+        self.assertEqual(
+            calculate_and_validate_formula("1//0"), Const.ERROR_DIVIDE_BY_ZERO
+        )
+
+    def test_rejects_not_allowed_constructions(self):
+        """Тестирование отказа от недопустимых конструкций"""
+        for formula in ("().__class__", "2(3)", "sqrt(x=1)", "2+*"):
+            self.assertIsNone(compile_formula(formula))
+            self.assertEqual(
+                calculate_and_validate_formula(formula), Const.ERROR_SYNTAX
+            )
+
+    def test_estimate_cost(self):
+        """Тестирование оценки стоимости вычисления"""
+        cases = {
+            "2**10*3": FormulaCost.CHEAP,
+            "2.5**10**100": FormulaCost.CHEAP,  # Переполнение float выявляется сразу
+            "1**10**100": FormulaCost.CHEAP,
+            "(10**100000)/10**99999": FormulaCost.BORDERLINE,
+            "9**9**9": FormulaCost.INFEASIBLE,
+            "-(2^2^2^2^2)+1": FormulaCost.BORDERLINE,
+            "-(2^2^2^2^2^2)+1": FormulaCost.INFEASIBLE,
+            "2**-(-10**7)": FormulaCost.BORDERLINE,  # Показатель снова положителен
+        }
+        for formula, cost in cases.items():
+            self.assertIs(compile_formula(formula.replace("^", "**")).cost, cost)
+        self.assertEqual(
+            calculate_and_validate_formula("9**9**9"), Const.ERROR_TOO_EXPENSIVE
+        )
+
+    def test_negative_exponent(self):
+        """Целое в отрицательной степени — вещественное число, а не огромное целое"""
+        for formula in ("2**-3**20", "10**-(10**7)", "-9**-9**-9"):
+            self.assertIs(compile_formula(formula).cost, FormulaCost.CHEAP)
+            self.assertEqual(
+                calculate_and_validate_formula(formula), str(eval(formula))
+            )
+
+    def test_compiled_formula_is_cached(self):
+        """Тестирование повторного использования скомпилированной формулы"""
+        compile_formula.cache_clear()
+        calculate_and_validate_formula("3*3")
+        calculate_and_validate_formula("3*3")
+        self.assertEqual(compile_formula.cache_info().hits, 1)
+
+    def test_linear_code_matches_eval(self):
+        """Тестирование совпадения результатов линейного кода и eval до бита"""
+        formulas = (
+            "sin(pi/6)+sin(pi/6)*sqrt(2)-sqrt(2)/3",
+            "-0.0*1+0.0",
+            "(-8)**(1/3)+2**0.5",
+            "0.1+0.2+0.3-(0.1+(0.2+0.3))",
+            "2**100//3**7+abs(-5)",
+        )
+        for formula in formulas:
+            expected = eval(formula, FORMULA_NAMESPACE)
+            self.assertEqual(
+                repr(calculate_and_validate_formula(formula)), repr(str(expected))
+            )
+
+    def test_common_subexpressions(self):
+        """Тестирование однократного вычисления одинаковых подвыражений"""
+        tree = ast.parse("sqrt(2)*sin(pi)+sqrt(2)*sin(pi)", mode="eval")
+        # sqrt(2), sin(pi), произведение, сумма и запись результата
+        self.assertEqual(len(linearize(tree, fold=False).body), 5)
+        # Константы вычислены при компиляции — остаётся запись результата
+        self.assertEqual(len(linearize(tree, fold=True).body), 1)
+
+    def test_errors_keep_order(self):
+        """Тестирование ошибок вычисления в порядке слагаемых формулы"""
+        self.assertEqual(
+            calculate_and_validate_formula("1/0+sqrt(-1)"), Const.ERROR_DIVIDE_BY_ZERO
+        )
+        self.assertEqual(
+            calculate_and_validate_formula("sqrt(-1)+1/0"), Const.ERROR_SYNTAX
+        )
+
+    def test_long_formula(self):
+        """Тестирование формулы из 2000 слагаемых"""
+        formula = "+".join(
+            f"sqrt({i % 7 + 2})*sin(pi/{i % 5 + 2})" for i in range(2000)
+        )
+        self.assertEqual(calculate_and_validate_formula(formula), "3200.805740346513")
+
+    def test_parser_matches_python(self):
+        """Тестирование приоритетов и ассоциативности операций, как в Python"""
+        for formula in (
+            "-2**2",
+            "2**-1",
+            "2**3**2",
+            "2**-2**2",
+            "1-2-3",
+            "8/2/2",
+            "7//2*3",
+            "2*-3**2",
+            "-+-(1)",
+            "abs(-(2))**2",
+            "1000.+.5+1.",
+        ):
+            self.assertEqual(
+                calculate_and_validate_formula(formula),
+                str(eval(formula, FORMULA_NAMESPACE)),
+            )
+        for formula in ("012", "()", "2(3)", "sin(1)(2)", "pi(2)", "sqrt()", "1+"):
+            self.assertEqual(
+                calculate_and_validate_formula(formula), Const.ERROR_SYNTAX
+            )
+
+    def test_deep_nesting(self):
+        """Тестирование формул глубже предела рекурсии интерпретатора"""
+        depth = 20_000
+        self.assertEqual(
+            calculate_and_validate_formula("(" * depth + "2" + ")" * depth), "2"
+        )
+        self.assertEqual(
+            calculate_and_validate_formula("abs(" * depth + "-3" + ")" * depth), "3"
+        )
+        self.assertEqual(calculate_and_validate_formula("-" * depth + "1"), "1")
+        self.assertEqual(calculate_and_validate_formula("1+" * depth + "1"), "20001")
+
+
+if __name__ == "__main__":
+    unittest.main()
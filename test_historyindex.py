@@ -0,0 +1,53 @@
+import unittest
+
+from historyindex import TrigramIndex
+
+ROWS = [
+    ("2 + 2", "4"),
+    ("sqrt(16)", "4.0"),
+    ("SIN(1)", "0.8414709848078965"),
+    ("12 * 12", "144"),
+    ("1/0", "Деление на ноль"),
+]
+
+
+class TestTrigramIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex()
+        self.index.extend(ROWS)
+
+    def test_search(self):
+        """Тестирование поиска по формуле и результату без учёта регистра"""
+        self.assertEqual(list(self.index.search("sin(")), [2])
+        self.assertEqual(list(self.index.search("4.0")), [1])
+        self.assertEqual(list(self.index.search("НОЛЬ")), [4])
+        self.assertEqual(list(self.index.search("2 *")), [3])
+        self.assertEqual(list(self.index.search("нет такого")), [])
+
+    def test_short_query(self):
+        """Тестирование строки поиска короче триграммы и порядка результатов"""
+        self.assertEqual(list(self.index.search("4")), [0, 1, 2, 3])
+        self.assertEqual(list(self.index.search("4", newest_first=True)), [3, 2, 1, 0])
+        self.assertEqual(len(list(self.index.search(""))), len(ROWS))
+
+    def test_candidates_checked(self):
+        """Все триграммы строки есть в записи, но сама строка — нет"""
+        self.index.add("abc+bcd", "0")
+        self.assertEqual(list(self.index.search("abcd")), [])
+        self.index.add("abcd", "0")
+        self.assertEqual(list(self.index.search("abcd")), [6])
+
+    def test_separator(self):
+        """Строка поиска не находится на стыке формулы и результата"""
+        self.assertEqual(list(self.index.search("2 + 24")), [])
+
+    def test_clear(self):
+        """Тестирование очистки индекса"""
+        self.index.clear()
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(list(self.index.search("2 + 2")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from constants import Const
+from historyarchive import RetentionPolicy
+from historystore import HistoryStore
+from legacyhistory import LegacyHistory
+
+
+class TestHistoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.work_dir.name)
+        self.legacy = LegacyHistory(self.directory / "results.csv")
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def new_store(self, retention: RetentionPolicy | None = None) -> HistoryStore:
+        return HistoryStore(self.directory / "results.sqlite3", self.legacy, retention)
+
+    def fill(self, size: int, created: float) -> None:
+        """История из size записей "i;i", созданных в момент created"""
+        store = self.new_store()
+        store.open()
+        # noinspection PyProtectedMember
+        rows = [(str(i), str(i)) for i in reversed(range(size))]
+        HistoryStore.add_rows(store._connection, rows, created)
+        store.close()
+
+    def test_append_and_pages(self):
+        """Тестирование записи в фоне и чтения страницами от новых к старым"""
+        store = self.new_store()
+        store.start()
+        for i in range(7):
+            store.append(f"{i}+{i}", str(2 * i))
+        self.assertIsNone(store.close())
+
+        store = self.new_store()
+        store.open()
+        self.assertEqual((store.loaded_count, store.loaded_until), (7, 7))
+        pages = list(store.pages(store.loaded_until, size=3))
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(pages[0][0], ("6+6", "12"))
+        self.assertEqual(pages[-1], [("0+0", "0")])
+        self.assertEqual(list(store.pages(2)), [[("1+1", "2"), ("0+0", "0")]])
+        store.close()
+
+    def test_legacy_import(self):
+        """История прежних версий переносится в новую базу один раз"""
+        self.legacy.history_path.write_text(
+            "Выражение;Результат\r\n2+2;4\r\n1+1;2\r\n", encoding="utf-8"
+        )
+
+        store = self.new_store()
+        store.start()
+        store.ready.wait()
+        self.assertEqual(next(store.pages()), [("2+2", "4"), ("1+1", "2")])
+        store.clear()
+        store.close()
+
+        store = self.new_store()  # Очищенная история не переносится повторно
+        store.open()
+        self.assertEqual(store.loaded_count, 0)
+        store.close()
+
+    def test_legacy_import_retry(self):
+        """Нечитаемая история прежних версий переносится, когда станет читаемой"""
+        self.legacy.history_path.write_text(
+            "Выражение;Результат\r\nиспорчено\r\n", encoding="utf-8"
+        )
+        store = self.new_store()
+        store.start()
+        store.append("3+3", "6")
+        self.assertIsNone(store.close())
+        self.assertIsNotNone(store.import_error)
+
+        self.legacy.history_path.write_text(
+            "Выражение;Результат\r\n2+2;4\r\n1+1;2\r\n", encoding="utf-8"
+        )
+        store = self.new_store()
+        store.open()
+        self.assertIsNone(store.import_error)
+        self.assertEqual(store.loaded_count, 3)
+        # Перенесённые записи старше записей, сделанных до переноса
+        self.assertEqual(
+            next(store.pages()), [("3+3", "6"), ("2+2", "4"), ("1+1", "2")]
+        )
+        store.close()
+
+        store = self.new_store()  # Перенесённая история не переносится повторно
+        store.open()
+        self.assertEqual(store.loaded_count, 3)
+        store.close()
+
+    def test_find_formula(self):
+        """Вычисления формулы выбираются по индексу, от новых к старым"""
+        store = self.new_store()
+        store.start()
+        for formula, result in (("2+2", "4"), ("sin(0)", "0.0"), ("2+2", "4.0")):
+            store.append(formula, result)
+        store.close()
+
+        self.assertEqual(
+            list(store.find_formula("2+2")), [("2+2", "4.0"), ("2+2", "4")]
+        )
+        self.assertEqual(list(store.find_formula("SIN(0)")), [])
+        connection = store.connect()
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT formula, result FROM history"
+            " WHERE formula = ? ORDER BY id DESC",
+            ("2+2",),
+        ).fetchall()
+        connection.close()
+        self.assertIn("history_formula", str(plan))
+
+    def test_export(self):
+        """Тестирование выгрузки в csv файл, включая ещё не записанные записи"""
+        store = self.new_store()
+        store.start()
+        store.append("2*2", "4")
+        store.append("1;1", "Ошибка синтаксиса")
+        path = self.directory / "export.csv"
+        self.assertEqual(store.export_csv(path), 2)
+        store.close()
+
+        self.assertEqual(
+            path.read_text("utf-8-sig").splitlines(),
+            ["Выражение;Результат", '"1;1";Ошибка синтаксиса', "2*2;4"],
+        )
+        # Выгруженный файл читается, как csv файл истории прежних версий
+        exported = LegacyHistory(path)
+        self.assertEqual(
+            list(exported.read_history()),
+            [("1;1", "Ошибка синтаксиса"), ("2*2", "4")],
+        )
+
+    def test_retention(self):
+        """Старые записи переносятся в архив, где ищутся и выгружаются"""
+        size = Const.HISTORY_ARCHIVE_MIN_ROWS + 10
+        self.fill(size, 0.0)
+        store = self.new_store(RetentionPolicy(max_entries=10, max_bytes=None))
+        store.start()
+        store.ready.wait()
+        self.assertEqual((store.archived, store.loaded_count), (size - 10, 10))
+        self.assertEqual(next(store.pages())[-1], (str(size - 10), str(size - 10)))
+        self.assertEqual(list(store.search("1005")), [("1005", "1005")])
+        self.assertEqual(list(store.search("999")), [("999", "999")])  # В архиве
+        self.assertEqual(list(store.search("999", archived=False)), [])
+
+        self.assertEqual(list(store.find_formula("999")), [("999", "999")])
+        self.assertEqual(list(store.find_formula("99+")), [])
+
+        path = self.directory / "export.csv"
+        self.assertEqual(store.export_csv(path), size)
+        exported = LegacyHistory(path)
+        rows = list(exported.read_history())
+        self.assertEqual(
+            [int(formula) for formula, _ in rows], list(reversed(range(size)))
+        )
+
+        store.clear()
+        store.close()
+        self.assertEqual(store.archive.segments(), [])
+
+    def test_retention_by_age(self):
+        """Архивируются записи старше срока хранения, но не меньше сегмента"""
+        day = 24 * 60 * 60
+        self.fill(Const.HISTORY_ARCHIVE_MIN_ROWS - 1, 0.0)
+        policy = RetentionPolicy(None, None, max_age_days=1)
+        store = self.new_store(policy)
+        store.open()
+        self.assertEqual(store.archived, 0)  # Слишком мало для сегмента
+        # noinspection PyProtectedMember
+        HistoryStore.add_rows(store._connection, [("old", "0")], 0.0)
+        # noinspection PyProtectedMember
+        HistoryStore.add_rows(store._connection, [("new", "1")], 5 * day)
+        # noinspection PyProtectedMember
+        archived = store.retain(store._connection, policy, now=5.5 * day)
+        self.assertEqual(archived, Const.HISTORY_ARCHIVE_MIN_ROWS)
+        self.assertEqual(list(store.pages()), [[("new", "1")]])
+        store.close()
+
+        # Испорченный сегмент — ошибка чтения файла
+        store.archive.segments()[0].write_bytes(b"\x1f\x8b damaged")
+        with self.assertRaises(OSError):
+            list(store.archive.rows())
+
+
+if __name__ == "__main__":
+    unittest.main()
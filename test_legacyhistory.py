@@ -0,0 +1,34 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from legacyhistory import LegacyHistory
+
+
+class TestLegacyHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.history_path = Path(self.work_dir.name) / "results.csv"
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def test_read_history(self):
+        """Тестирование чтения csv файла прежних версий"""
+        self.history_path.write_text(
+            '\ufeffВыражение;Результат\r\n"3;3";Ошибка синтаксиса\r\n1+1;2\r\n',
+            encoding="utf-8",
+        )
+        self.assertEqual(
+            list(LegacyHistory(self.history_path).read_history()),
+            [("3;3", "Ошибка синтаксиса"), ("1+1", "2")],
+        )
+
+    def test_missing_file(self):
+        """Отсутствие csv файла — пустая история"""
+        self.assertEqual(list(LegacyHistory(self.history_path).read_history()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
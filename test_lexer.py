@@ -0,0 +1,55 @@
+import time
+import unittest
+
+from constants import Const
+from core import evaluate_formula
+from lexer import NAME, NUMBER, OPERATOR, PAREN, Token, scan_formula
+from lexer import validate_formula
+
+
+class TestLexer(unittest.TestCase):
+
+    def test_tokens(self):
+        """Тестирование стандартизации и разбиения формулы на лексемы"""
+        scanned = scan_formula("2,5 х sqrt(.001)")
+        self.assertEqual(scanned.text, "2.5*sqrt(.001)")
+        self.assertEqual(
+            scanned.tokens,
+            (
+                Token(NUMBER, "2.5"),
+                Token(OPERATOR, "*"),
+                Token(NAME, "sqrt"),
+                Token(PAREN, "("),
+                Token(NUMBER, ".001"),
+                Token(PAREN, ")"),
+            ),
+        )
+
+    def test_invalid_symbols(self):
+        """Тестирование отказа от недопустимых символов и имён"""
+        for formula in ("2+a", "open(1)", "2;3", "sin(1)@", "Pi"):
+            self.assertIsNone(scan_formula(formula))
+            self.assertIsNone(validate_formula(formula))
+            self.assertEqual(evaluate_formula(formula), Const.ERROR_INVALID_SYMBOL)
+
+    def test_valid_symbols_with_syntax_error(self):
+        """Допустимые символы в неверном порядке — синтаксическая ошибка"""
+        for formula in ("pie", "1.2.3", ".", "sinpi", "e2", "log10pi", "2e3", "1e400"):
+            self.assertIsNotNone(scan_formula(formula))
+            self.assertEqual(validate_formula(formula), scan_formula(formula).text)
+            self.assertEqual(evaluate_formula(formula), Const.ERROR_SYNTAX)
+
+    def test_name_with_digits(self):
+        """Тестирование имени функции, содержащего цифры"""
+        self.assertEqual(scan_formula("log10(100)").tokens[0], Token(NAME, "log10"))
+        self.assertEqual(evaluate_formula("log10(100)"), "2.0")
+
+    def test_linear_time(self):
+        """Тестирование времени разбора длинной формулы"""
+        formula = "sin(pi)+" * 12_500 + "(" * 1000  # Около 100 КБ
+        start = time.perf_counter()
+        self.assertIsNotNone(scan_formula(formula))
+        self.assertIsNone(scan_formula(formula + "#"))
+        self.assertIsNotNone(validate_formula(formula))
+        self.assertIsNone(validate_formula("#" + formula))
+        self.assertLess(time.perf_counter() - start, 1.0)
@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from constants import Const
+from resultcache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.work_dir.name) / "results_cache.json"
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def test_normalized_key(self):
+        """Тестирование общего ключа для записей одной формулы"""
+        cache = ResultCache(self.path)
+        cache.put("2 x 2", "4")
+        self.assertEqual(cache.get("2*2"), "4")
+        self.assertIsNone(cache.get("2*3"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_eviction(self):
+        """Тестирование вытеснения давно не использованной записи"""
+        cache = ResultCache(self.path, max_size=2)
+        cache.put("1+1", "2")
+        cache.put("2+2", "4")
+        cache.get("1+1")
+        cache.put("3+3", "6")
+        self.assertIsNone(cache.get("2+2"))
+        self.assertEqual(cache.get("1+1"), "2")
+        self.assertEqual(len(cache), 2)
+
+    def test_errors_not_cached(self):
+        """Тестирование отказа от кэширования ошибок и табулирования"""
+        cache = ResultCache(self.path)
+        cache.put("9**9**9", Const.ERROR_TOO_EXPENSIVE)
+        cache.put("sin(t) | t = 1 .. 2", Const.SWEEP_RESULT_TEXT.format(2))
+        self.assertEqual(len(cache), 0)
+
+    def test_persistence_and_warming(self):
+        """Тестирование записи в файл и заполнения из истории"""
+        cache = ResultCache(self.path, max_size=3)
+        cache.put("5*5", "25")
+        cache.save()
+
+        cache = ResultCache(self.path, max_size=3)
+        cache.load()
+        history = [("5*5", "0"), ("1/0", Const.ERROR_DIVIDE_BY_ZERO)]
+        history += [("6*6", "36"), ("7*7", "49"), ("8*8", "64")]
+        cache.warm(history)
+        self.assertEqual(cache.get("5 x 5"), "25")  # Не заменена историей
+        self.assertEqual(cache.get("7*7"), "49")
+        self.assertIsNone(cache.get("8*8"))  # Места в кэше не осталось
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import threading
+import time
+import unittest
+
+from constants import Const
+from sandbox import EvaluationCancelled, EvaluationSandbox
+
+
+class TestEvaluationSandbox(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sandbox = EvaluationSandbox(workers=1, time_limit=0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sandbox.close()
+
+    def test_evaluate(self):
+        """Тестирование вычисления формулы в рабочем процессе"""
+        self.assertEqual(self.sandbox.evaluate("2 x 3"), "6")
+        self.assertEqual(self.sandbox.evaluate("2 + ш"), Const.ERROR_INVALID_SYMBOL)
+
+    def test_infeasible_formula(self):
+        """Тестирование отказа от заведомо неподъёмного вычисления"""
+        start = time.monotonic()
+        self.assertEqual(self.sandbox.evaluate("9**9**9"), Const.ERROR_TOO_EXPENSIVE)
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_too_long_formula(self):
+        """Тестирование прерывания слишком долгого вычисления"""
+        start = time.monotonic()
+        self.assertEqual(self.sandbox.evaluate("7**10**6"), Const.ERROR_TOO_EXPENSIVE)
+        self.assertLess(time.monotonic() - start, 5)
+        # Рабочий процесс заменён новым и продолжает вычислять
+        self.assertEqual(self.sandbox.evaluate("2^10"), "1024")
+
+    def test_cancel(self):
+        """Отменённое вычисление прерывается, не дожидаясь ограничения времени"""
+        sandbox = EvaluationSandbox(workers=1, time_limit=30)
+        try:
+            cancelled = threading.Event()
+            threading.Timer(0.2, cancelled.set).start()
+            start = time.monotonic()
+            with self.assertRaises(EvaluationCancelled):
+                sandbox.evaluate("(7**10**6)**5 // 3**10**6", cancelled)
+            self.assertLess(time.monotonic() - start, 10)
+            self.assertEqual(sandbox.evaluate("2^10", threading.Event()), "1024")
+        finally:
+            sandbox.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
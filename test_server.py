@@ -0,0 +1,98 @@
+import asyncio
+import json
+import unittest
+
+from constants import Const
+from sandbox import EvaluationSandbox
+from server import EvaluationServer
+
+
+class TestEvaluationServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sandbox = EvaluationSandbox(workers=1, time_limit=0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sandbox.close()
+
+    def exchange(self, requests: list[bytes]) -> list[tuple[int, dict]]:
+        """Отправка запросов по одному соединению. Возвращает статусы и ответы"""
+
+        async def run():
+            server = EvaluationServer(self.sandbox)
+            listener = await server.serve("127.0.0.1", 0)
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            try:
+                for request in requests:
+                    writer.write(request)
+                    await writer.drain()
+                    head = await reader.readuntil(b"\r\n\r\n")
+                    lines = head.decode("latin-1").split("\r\n")
+                    length = next(
+                        int(line.split(":", 1)[1])
+                        for line in lines
+                        if line.lower().startswith("content-length:")
+                    )
+                    body = await reader.readexactly(length)
+                    responses.append((int(lines[0].split()[1]), json.loads(body)))
+            finally:
+                writer.close()
+                listener.close()
+                await listener.wait_closed()
+                server.close()
+            return responses
+
+        return asyncio.run(run())
+
+    @staticmethod
+    def post(payload, path: str = Const.SERVER_PATH) -> bytes:
+        """HTTP/1.1 запрос POST с JSON телом"""
+
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        return (
+            f"POST {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode() + body
+
+    def test_keep_alive(self):
+        """Тестирование нескольких запросов по одному соединению"""
+        responses = self.exchange(
+            [self.post({"formula": "2 x 3"}), self.post({"formula": "1/0"})]
+        )
+        self.assertEqual(
+            responses[0], (200, {"formula": "2 x 3", "result": "6", "ok": True})
+        )
+        self.assertEqual(responses[1][1]["result"], Const.ERROR_DIVIDE_BY_ZERO)
+        self.assertFalse(responses[1][1]["ok"])
+
+    def test_batch(self):
+        """Тестирование пакета формул: порядок результатов и дорогие формулы"""
+        formulas = [f"{i} + 1" for i in range(300)] + ["9**9**9", "7**10**6"]
+        [(status, payload)] = self.exchange([self.post({"formulas": formulas})])
+        self.assertEqual(status, 200)
+        results = [item["result"] for item in payload["results"]]
+        self.assertEqual(results[:300], [str(i + 1) for i in range(300)])
+        self.assertEqual(results[300:], [Const.ERROR_TOO_EXPENSIVE] * 2)
+
+    def test_bad_requests(self):
+        """Тестирование ошибок запроса"""
+        responses = self.exchange(
+            [
+                self.post(b"{not json"),
+                self.post({"formula": 1}),
+                self.post({"formula": "1"}, path="/other"),
+            ]
+        )
+        self.assertEqual([status for status, _ in responses], [400, 400, 404])
+        # Нечитаемый запрос: ответ с ошибкой, затем соединение закрывается
+        request = b"POST / HTTP/1.1\r\nContent-Length: x\r\n\r\n"
+        [(status, payload)] = self.exchange([request])
+        self.assertEqual((status, payload), (400, {"error": Const.SERVER_BAD_REQUEST}))
+
+
+if __name__ == "__main__":
+    unittest.main()
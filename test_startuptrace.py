@@ -0,0 +1,40 @@
+import builtins
+import os
+import sys
+import tempfile
+import unittest
+
+from startuptrace import StartupTrace
+
+
+class TestStartupTrace(unittest.TestCase):
+
+    def test_report(self):
+        """Тестирование записи этапов запуска и импортов в отчёт"""
+        with tempfile.TemporaryDirectory() as work_dir:
+            report_path = os.path.join(work_dir, "trace.txt")
+            original_import = builtins.__import__
+            trace = StartupTrace(True, report_path)
+            sys.modules.pop("wave", None)  # Импорт должен быть первым
+            with trace.phase("Этап"):
+                import wave  # noqa: F401 — модуль, не загружаемый программой
+            trace.finish("Первая отрисовка окна")
+            trace.finish("Повторный вызов не пишет отчёт")
+
+            self.assertIs(builtins.__import__, original_import)
+            with open(report_path, encoding="utf-8") as file:
+                report = file.read()
+        self.assertIn("Этап", report)
+        self.assertIn("Первая отрисовка окна", report)
+        self.assertNotIn("Повторный вызов", report)
+        self.assertIn("wave", report)
+
+    def test_disabled(self):
+        """Выключенная трассировка ничего не записывает"""
+        original_import = builtins.__import__
+        trace = StartupTrace(False)
+        with trace.phase("Этап"):
+            pass
+        trace.finish("Конец")
+        self.assertIs(builtins.__import__, original_import)
+        self.assertEqual(trace.phases, [])
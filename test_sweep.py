@@ -0,0 +1,59 @@
+import unittest
+
+from constants import Const
+from sweep import SweepError, evaluate_sweep, format_sweep_rows, parse_sweep
+
+
+class TestSweep(unittest.TestCase):
+
+    def test_sweep_values(self):
+        """Тестирование табулирования формулы по диапазону"""
+        arguments, values = evaluate_sweep(parse_sweep("2^t + abs(-t) | t = 0 .. 2"))
+        self.assertEqual(
+            list(format_sweep_rows(arguments, values)),
+            [("0.0", "1.0"), ("1.0", "3.0"), ("2.0", "6.0")],
+        )
+
+    def test_undefined_point(self):
+        """Тестирование точки, в которой значение не определено"""
+        arguments, values = evaluate_sweep(parse_sweep("1/t | t = -1 .. 1"))
+        rows = list(format_sweep_rows(arguments, values))
+        self.assertEqual(rows[1], ("0.0", Const.ERROR_NO_VALUE))
+
+    def test_errors(self):
+        """Ошибки вычисления — те же, что у обычной формулы"""
+        with self.assertRaises(SweepError) as error:
+            evaluate_sweep(parse_sweep("1//0 + t | t = 0 .. 1"))
+        self.assertEqual(str(error.exception), Const.ERROR_DIVIDE_BY_ZERO)
+        # Граница диапазона вычисляется с оценкой стоимости
+        with self.assertRaises(SweepError) as error:
+            parse_sweep("t | t = 0 .. (7**10**6)**4")
+        self.assertEqual(str(error.exception), Const.ERROR_TOO_EXPENSIVE)
+        with self.assertRaises(SweepError) as error:
+            parse_sweep("t | t = 0 .. 10", max_points=10)
+        self.assertEqual(str(error.exception), Const.ERROR_SWEEP_TOO_MANY_POINTS)
+
+    def test_deep_nesting(self):
+        """Глубина вложенности не ограничена глубиной рекурсии"""
+        depth = 10_000
+        sweep = parse_sweep("abs(" * depth + "-t" + ")" * depth + " | t = 0 .. 1")
+        _, values = evaluate_sweep(sweep)
+        self.assertEqual(values.tolist(), [0.0, 1.0])
+
+    def test_invalid_range(self):
+        """Тестирование неверного диапазона"""
+        for formula in ("t | t = 0 .. 1 .. 0", "t | t = 1 .. 0 .. 1", "t | y = 0 .. 1"):
+            with self.assertRaises(SweepError):
+                parse_sweep(formula)
+        # Частное диапазона и шага переполняется
+        for formula in (
+            "t | t = 0 .. 1 .. 1/10.0**300/10.0**20",
+            "t | t = 0 .. 10.0**300 .. 1/10.0**300",
+        ):
+            with self.assertRaises(SweepError) as error:
+                parse_sweep(formula)
+            self.assertEqual(str(error.exception), Const.ERROR_SWEEP_TOO_MANY_POINTS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+import io
+import unittest
+from pathlib import Path
+
+from PyQt6.uic import compileUi
+
+UI_DIRECTORY = Path(__file__).parent / "_internal"
+
+
+class TestUi(unittest.TestCase):
+
+    def test_generated_form_is_up_to_date(self):
+        """Calc.py должен быть сгенерирован из текущего Calc.ui (ui2py.bat)"""
+        generated = io.StringIO()
+        compileUi(str(UI_DIRECTORY / "Calc.ui"), generated)
+        saved = (UI_DIRECTORY / "Calc.py").read_text(encoding="utf-8")
+        # Заголовок с версией генератора не сравнивается
+        self.assertEqual(
+            [line for line in generated.getvalue().splitlines() if line[:1] != "#"],
+            [line for line in saved.splitlines() if line[:1] != "#"],
+        )
@@ -0,0 +1,94 @@
+import unittest
+
+from constants import Const
+from core import evaluate_formula
+from worksheet import Worksheet, parse_line
+
+SHEET = ["a = 2 * 3", "b = a + 1", "#1 х #2", "", "sqrt(b) + 10"]
+
+
+class TestWorksheet(unittest.TestCase):
+
+    def setUp(self):
+        self.formulas = []  # Формулы, переданные на вычисление
+        self.worksheet = Worksheet(self.evaluate)
+
+    def evaluate(self, formula: str) -> str:
+        self.formulas.append(formula)
+        return evaluate_formula(formula)
+
+    def update(self, lines: list[str]) -> list[int]:
+        return self.worksheet.update("\n".join(lines))
+
+    def test_parse_line(self):
+        """Тестирование разбора строки на имя, формулу и ссылки"""
+        line = parse_line("total = sin(a) + #2 - 2pi")
+        self.assertEqual(line.name, "total")
+        self.assertEqual(line.references, ("a", 1))
+        self.assertEqual(line.parts, (" sin(", ") + ", " - 2pi"))
+        self.assertEqual(parse_line("m2 = 1").error, None)
+        self.assertEqual(parse_line("sin = 1").error, Const.ERROR_WORKSHEET_NAME)
+        self.assertEqual(parse_line("tax = 1").error, Const.ERROR_WORKSHEET_NAME)
+
+    def test_results(self):
+        """Тестирование вычисления строк со ссылками по имени и номеру"""
+        self.assertEqual(self.update(SHEET), [0, 1, 2, 3, 4])
+        self.assertEqual(
+            self.worksheet.results, ["6", "7", "42", "", "12.64575131106459"]
+        )
+        self.assertEqual(self.formulas[2], "(6) х (7)")  # Ссылки заменены результатами
+
+    def test_reference_errors(self):
+        """Ссылки на следующую, пустую строку и строку с ошибкой"""
+        self.update(["#2", "", "#2", "1/0", "a = #4 + 1", "a"])
+        errors = [
+            Const.ERROR_WORKSHEET_FORWARD,
+            "",
+            Const.ERROR_WORKSHEET_REFERENCE,
+            Const.ERROR_DIVIDE_BY_ZERO,
+            Const.ERROR_WORKSHEET_REFERENCE,
+            Const.ERROR_WORKSHEET_REFERENCE,
+        ]
+        self.assertEqual(self.worksheet.results, errors)
+
+    def test_dependents_only(self):
+        """Пересчитываются только изменённая строка и зависящие от неё"""
+        sheet = [f"v{i} = {i}" for i in range(100)] + ["s = v3 + v50", "v99 * 2"]
+        self.update(sheet)
+        sheet[3] = "v3 = 1000"
+        self.assertEqual(self.update(sheet), [3, 100])
+        self.assertEqual(self.worksheet.results[100], "1050")
+
+        # Результат не изменился — зависимые строки не пересчитываются
+        sheet[50] = "v50 = 25 * 2"
+        self.assertEqual(self.update(sheet), [50])
+        self.assertEqual(self.update(sheet), [])
+
+    def test_insert_and_delete_lines(self):
+        """Ссылки по номеру после вставки и удаления строк"""
+        self.update(SHEET)
+        self.assertEqual(self.update(["c = 10"] + SHEET), [0, 3])
+        self.assertEqual(self.worksheet.results[3], "60")  # #1 х #2 = c х a
+        self.assertEqual(self.update(SHEET[1:]), [0, 1, 3])
+        errors = [
+            Const.ERROR_INVALID_SYMBOL,  # Имя a больше не определено
+            Const.ERROR_WORKSHEET_REFERENCE,  # #1 — строка с ошибкой
+            "",
+            Const.ERROR_WORKSHEET_REFERENCE,
+        ]
+        self.assertEqual(self.worksheet.results, errors)
+
+    def test_matches_full_recalculation(self):
+        """Пересчёт после правок совпадает с вычислением листа заново"""
+        sheet = list(SHEET)
+        edits = [(1, "b = a - 1"), (0, "a = 4"), (2, "#2 + #1"), (3, "a = b")]
+        for number, text in edits:
+            sheet[number] = text
+            self.update(sheet)
+            full = Worksheet()
+            full.update("\n".join(sheet))
+            self.assertEqual(self.worksheet.results, full.results)
+
+
+if __name__ == "__main__":
+    unittest.main()
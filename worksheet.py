@@ -0,0 +1,204 @@
+"""Лист вычислений: формулы в нескольких строках со ссылками друг на друга.
+
+Каждая строка листа — формула, перед которой может стоять имя строки:
+    a = 2 * 3
+    b = a + 1
+    #1 х #2
+Формула ссылается на предыдущие строки по имени или по номеру (#1 — первая
+строка листа). Имя означает ближайшую предыдущую строку с этим именем.
+Ссылка заменяется в тексте формулы результатом строки, взятым в скобки,
+и формула вычисляется как обычная формула калькулятора.
+
+Ссылки образуют граф зависимостей строк. Ссылаться можно только на
+предыдущие строки, поэтому циклов в графе нет, а порядок строк — уже
+топологический. При изменении листа пересчитываются только изменённые
+строки и строки, зависящие от них, причём зависимая строка пересчитывается,
+только если результат строки, на которую она ссылается, изменился."""
+
+import re
+from collections.abc import Callable
+from typing import NamedTuple
+
+from constants import Const
+from core import ERRORS, evaluate_formula
+
+# Имя строки: латинские буквы и цифры. Буква 'x' означает умножение
+NAME_PATTERN = re.compile(r"[a-wyz][a-wyz0-9]*")
+# Ссылка по номеру строки или слово, которое может быть именем строки.
+# Слово сразу после цифры или точки не считается именем строки (например, 2pi)
+REFERENCE_PATTERN = re.compile(
+    re.escape(Const.WORKSHEET_LINE_REFERENCE)
+    + r"([0-9]+)"
+    + r"|(?<![0-9.a-z])[a-z][a-z0-9]*"
+)
+
+
+class WorksheetLine(NamedTuple):
+    """Разобранная строка листа"""
+
+    name: str | None  # Имя строки
+    parts: tuple[str, ...]  # Текст формулы между ссылками
+    references: tuple[str | int, ...]  # Имена и номера строк (с 0) в ссылках
+    error: str | None = None  # Ошибка в записи строки
+
+
+def parse_line(text: str) -> WorksheetLine:
+    """Разбор строки листа на имя, текст формулы и ссылки"""
+
+    name = None
+    expression = text
+    if Const.WORKSHEET_ASSIGNMENT in text:
+        name, _, expression = text.partition(Const.WORKSHEET_ASSIGNMENT)
+        name = name.strip()
+        if (
+            NAME_PATTERN.fullmatch(name) is None
+            or name in Const.FORMULA_VALIDATION_LIST
+        ):
+            return WorksheetLine(name, (), (), Const.ERROR_WORKSHEET_NAME)
+
+    parts = []
+    references: list[str | int] = []
+    position = 0
+    for match in REFERENCE_PATTERN.finditer(expression):
+        word = match.group()
+        if word in Const.FORMULA_VALIDATION_LIST:
+            continue  # Имя функции или константы, а не ссылка
+        parts.append(expression[position : match.start()])
+        number = match.group(1)
+        references.append(word if number is None else int(number) - 1)
+        position = match.end()
+    parts.append(expression[position:])
+    return WorksheetLine(name, tuple(parts), tuple(references))
+
+
+class Worksheet:
+    """Лист вычислений с пересчётом только зависимых строк.
+
+    evaluate — функция вычисления формулы, введённой пользователем."""
+
+    def __init__(self, evaluate: Callable[[str], str] = evaluate_formula):
+        self.evaluate = evaluate
+        self.lines: list[str] = []  # Текст строк листа
+        self.results: list[str] = []  # Результаты строк ("" — пустая строка)
+        self._parsed: list[WorksheetLine] = []  # Разобранные строки
+        # Номера строк, на которые ссылается строка (None — слово не ссылка)
+        self._sources: list[tuple[int | None, ...]] = []
+        self.evaluated = 0  # Число формул, вычисленных при последнем пересчёте
+
+    def update(self, text: str) -> list[int]:
+        """Пересчёт листа после изменения его текста.
+
+        Возвращает номера пересчитанных строк (с 0)."""
+
+        self.evaluated = 0
+        lines = text.split("\n")
+        old_lines = self.lines
+        # Правка затрагивает часть строк подряд: совпадающие начало и конец
+        # листа не разбираются заново
+        prefix = 0
+        limit = min(len(lines), len(old_lines))
+        while prefix < limit and lines[prefix] == old_lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and lines[-1 - suffix] == old_lines[-1 - suffix]:
+            suffix += 1
+        shift = len(lines) - len(old_lines)
+        middle = range(prefix, len(lines) - suffix)
+
+        # Новый номер каждой старой строки (-1 — строка заменена или удалена).
+        # Если число строк не изменилось, строки изменены на своих местах
+        new_numbers = list(range(prefix))
+        if shift:
+            new_numbers += [-1] * (len(old_lines) - suffix - prefix)
+        else:
+            new_numbers += middle
+        new_numbers += range(len(lines) - suffix, len(lines))
+
+        parsed = self._parsed[:prefix]
+        parsed += map(parse_line, lines[prefix : len(lines) - suffix])
+        parsed += self._parsed[len(old_lines) - suffix :]
+        sources = self.resolve(parsed)
+
+        old_results = self.results
+        old_sources = self._sources
+        results: list[str] = []
+        changed = set()  # Строки, результат которых изменился
+        recalculated = []
+        for number, line in enumerate(parsed):
+            old_number = number if number < prefix else number - shift
+            if number in middle:
+                dirty = True
+            else:
+                old = tuple(
+                    None if source is None else new_numbers[source]
+                    for source in old_sources[old_number]
+                )
+                # Ссылка стала указывать на другую строку или её результат изменился
+                dirty = old != sources[number] or not changed.isdisjoint(
+                    sources[number]
+                )
+            if not dirty:
+                results.append(old_results[old_number])
+                continue
+            result = self.calculate(line, sources[number], lines[number], results)
+            results.append(result)
+            recalculated.append(number)
+            replaced = number in middle and shift != 0  # Прежней строки нет
+            if replaced or result != old_results[old_number]:
+                changed.add(number)
+
+        self.lines = lines
+        self.results = results
+        self._parsed = parsed
+        self._sources = sources
+        return recalculated
+
+    @staticmethod
+    def resolve(parsed: list[WorksheetLine]) -> list[tuple[int | None, ...]]:
+        """Номера строк, на которые ссылаются строки листа.
+
+        Ссылка на строку, которой нет среди предыдущих, — номер самой строки:
+        такая строка вычисляется с ошибкой"""
+
+        names: dict[str, int] = {}  # Имя -> номер последней строки с этим именем
+        sources = []
+        for number, line in enumerate(parsed):
+            line_sources: list[int | None] = []
+            for reference in line.references:
+                if isinstance(reference, int):
+                    previous = 0 <= reference < number
+                    line_sources.append(reference if previous else number)
+                else:
+                    line_sources.append(names.get(reference))
+            sources.append(tuple(line_sources))
+            if line.name is not None and line.error is None:
+                names[line.name] = number
+        return sources
+
+    def calculate(
+        self,
+        line: WorksheetLine,
+        sources: tuple[int | None, ...],
+        text: str,
+        results: list[str],
+    ) -> str:
+        """Результат строки листа. results — результаты предыдущих строк"""
+
+        if line.error is not None:
+            return line.error
+        if not text.strip():
+            return ""  # Пустая строка
+
+        formula = [line.parts[0]]
+        for reference, source, part in zip(line.references, sources, line.parts[1:]):
+            if source is None:
+                formula.append(reference)  # Слово не ссылка, а часть формулы
+            elif source >= len(results):
+                return Const.ERROR_WORKSHEET_FORWARD  # Ссылка не на предыдущую
+            elif not results[source] or results[source] in ERRORS:
+                return Const.ERROR_WORKSHEET_REFERENCE
+            else:
+                formula.append(f"({results[source]})")
+            formula.append(part)
+        self.evaluated += 1
+        return self.evaluate("".join(formula))